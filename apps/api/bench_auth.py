@@ -0,0 +1,82 @@
+"""
+Benchmark: requests/sec of get_current_user in "remote" vs "local" (JWKS) verification mode.
+
+Runs against a stub Supabase (auth + PostgREST) served from this process, so no real
+project or network is needed. The stub adds an artificial delay per request to mimic the
+round-trip to Supabase.
+
+Usage (from apps/api):
+    python bench_auth.py --requests 500 --concurrency 50 --latency-ms 25
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+
+import jwt
+from jwt.algorithms import RSAAlgorithm
+from cryptography.hazmat.primitives.asymmetric import rsa
+from bench_stub import StubSupabase
+
+KID = "bench-key-1"
+PRIVATE_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+JWKS = {"keys": [{**json.loads(RSAAlgorithm.to_jwk(PRIVATE_KEY.public_key())), "kid": KID, "alg": "RS256", "use": "sig"}]}
+USER_ID = str(uuid.uuid4())
+EMAIL = "bench@talentflow.ai"
+
+def make_token() -> str:
+    now = int(time.time())
+    claims = {"sub": USER_ID, "email": EMAIL, "aud": "authenticated", "role": "authenticated", "iat": now, "exp": now + 3600}
+    return jwt.encode(claims, PRIVATE_KEY, algorithm="RS256", headers={"kid": KID})
+
+STUB_ROUTES = {
+    "/auth/v1/.well-known/jwks.json": JWKS,
+    "/auth/v1/user": {
+        "id": USER_ID, "email": EMAIL, "aud": "authenticated", "role": "authenticated",
+        "app_metadata": {}, "user_metadata": {}, "created_at": "2026-01-01T00:00:00Z"
+    },
+    "/rest/v1/users": [{"role": "candidate"}],
+}
+
+async def run_mode(mode: str, total: int, concurrency: int) -> float:
+    from src.core import auth
+    from src.core.role_cache import role_cache
+    from src.core.dependencies import get_current_user
+
+    auth.AUTH_VERIFY_MODE = mode
+    role_cache.clear()
+    header = f"Bearer {make_token()}"
+    await get_current_user(authorization=header) # Warm-up (JWKS fetch, connection pool)
+
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with sem:
+            await get_current_user(authorization=header)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return total / (time.perf_counter() - start)
+
+async def main(args):
+    for mode in ("remote", "local"):
+        rps = await run_mode(mode, args.requests, args.concurrency)
+        print(f"{mode:>6}: {rps:8.1f} req/s ({args.requests} requests, concurrency {args.concurrency})", file=sys.stderr)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=25.0)
+    args = parser.parse_args()
+
+    stub = StubSupabase(STUB_ROUTES, latency_ms=args.latency_ms)
+    stub.start()
+    stub.configure_env()
+
+    # Silence the per-request DEBUG prints so they don't dominate the timing
+    sys.stdout = open(os.devnull, "w")
+    asyncio.run(main(args))
@@ -0,0 +1,69 @@
+"""
+Benchmark: bulk application status transitions at 10, 100 and 1000 application IDs.
+
+Reports wall time and the number of Supabase round-trips per call (counted by the stub),
+which should stay constant as the selection grows.
+
+Usage (from apps/api):
+    python bench_bulk_status.py --latency-ms 25
+"""
+import os
+import sys
+import time
+import uuid
+import asyncio
+import argparse
+
+from bench_stub import StubSupabase
+
+RECRUITER_ID = str(uuid.uuid4())
+APPS = {}
+
+def _ids(query, key="id"):
+    raw = (query.get(key) or [""])[0]
+    return raw[len("in.("):-1].split(",") if raw.startswith("in.(") else []
+
+def job_applications(method, query, body):
+    rows = [APPS[i] for i in _ids(query) if i in APPS]
+    if method == "GET":
+        return [{**r, "jobs": {"recruiter_id": RECRUITER_ID}} for r in rows]
+    return [{**r, **(body or {})} for r in rows]
+
+ROUTES = {
+    "/rest/v1/job_applications": job_applications,
+    "/rest/v1/job_application_status_history": lambda m, q, b: b,
+    "/rest/v1/chat_threads": lambda m, q, b: b if isinstance(b, list) else [],
+    "/rest/v1/notifications": lambda m, q, b: b,
+}
+
+async def main(args, stub: StubSupabase):
+    from src.services.recruiter_service import recruiter_service
+    from src.services.notification_service import notification_outbox
+
+    for status in ("shortlisted", "rejected"):
+        for n in (10, 100, 1000):
+            APPS.clear()
+            for _ in range(n):
+                app_id = str(uuid.uuid4())
+                APPS[app_id] = {"id": app_id, "status": "applied", "candidate_id": str(uuid.uuid4())}
+
+            stub.hits.clear()
+            start = time.perf_counter()
+            await recruiter_service.bulk_update_application_status(RECRUITER_ID, list(APPS), status, "bench")
+            elapsed = (time.perf_counter() - start) * 1000
+            await notification_outbox.stop() # Flush so notification batches are counted too
+
+            trips = sum(stub.hits.values())
+            print(f"{status:>11} x {n:>4}: {elapsed:8.1f} ms, {trips} round-trips {dict(stub.hits)}", file=sys.stderr)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency-ms", type=float, default=25.0)
+    args = parser.parse_args()
+
+    stub = StubSupabase(ROUTES, latency_ms=args.latency_ms)
+    stub.start()
+    stub.configure_env()
+
+    sys.stdout = open(os.devnull, "w")
+    asyncio.run(main(args, stub))
@@ -0,0 +1,195 @@
+"""
+LLM calls and tokens per completed assessment: one scoring request per answer vs batch scoring.
+
+A local stub speaks the Gemini and OpenAI-style APIs and scores whatever it is sent. It
+reports token usage as roughly 4/3 tokens per word, so the prompt-token totals are
+comparable between modes but not exact. With `--bad-rate`, that share of the items in
+every batch reply comes back unusable, which exercises the single-item fallback.
+
+Candidate: `--answers` answers go through an EvaluationQueue in "single" mode, then in
+"batch" mode with `--batch-size`, and are settled as complete_assessment does.
+Recruiter: `--recruiter-answers` stored answers are scored one request each (the
+synchronous path), then with the batch scorer that complete_recruiter_assessment runs.
+
+Usage (from apps/api):
+    python bench_eval_batch.py --answers 12 --batch-size 6 --bad-rate 0.1
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bench_stub import StubSupabase
+
+WORDS = ("we", "shipped", "the", "migration", "in", "two", "weeks", "by", "splitting", "ownership", "across",
+         "teams", "and", "measuring", "latency", "which", "dropped", "forty", "percent", "after", "rollout")
+
+def tokens(text: str) -> int:
+    return len(text.split()) * 4 // 3
+
+def answer_text(rng: random.Random, words: int = 120) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+class ScoringStub:
+    def __init__(self, latency_ms: float, bad_rate: float):
+        self.latency = latency_ms / 1000
+        self.bad_rate = bad_rate
+        self.rng = random.Random(7)
+        self._lock = threading.Lock()
+
+    def reply(self, prompt: str) -> str:
+        recruiter = '"relevance"' in prompt
+        def item(item_id=None):
+            out = {"id": item_id} if item_id else {}
+            if recruiter:
+                out.update({"relevance": 4.5, "specificity": 4.0, "clarity": 5.0, "ownership": 4.0, "reasoning": "Concrete and owned."})
+            else:
+                out.update({"score": 4, "explanation": "Clear workflow with measured outcome.", "detected_framework": "STAR"})
+            return out
+
+        ids = re.findall(r"^\[(item_\d+)\]$", prompt, flags=re.M)
+        if not ids:
+            return json.dumps(item())
+        results = []
+        for item_id in ids:
+            entry = item(item_id)
+            with self._lock:
+                bad = self.rng.random() < self.bad_rate
+            if bad:
+                entry["score" if not recruiter else "relevance"] = "high"
+            results.append(entry)
+        return json.dumps({"results": results})
+
+    def start(self) -> str:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)))
+                time.sleep(stub.latency)
+                if self.path.startswith("/v1beta"):
+                    prompt = body["contents"][0]["parts"][0]["text"]
+                    system = ((body.get("systemInstruction") or {}).get("parts") or [{}])[0].get("text", "")
+                    text = stub.reply(prompt)
+                    payload = {"candidates": [{"content": {"parts": [{"text": text}]}}],
+                               "usageMetadata": {"promptTokenCount": tokens(system + " " + prompt), "candidatesTokenCount": tokens(text)}}
+                else:
+                    prompt = body["messages"][-1]["content"]
+                    text = stub.reply(prompt)
+                    payload = {"choices": [{"message": {"content": text}}],
+                               "usage": {"prompt_tokens": tokens(" ".join(m["content"] for m in body["messages"])), "completion_tokens": tokens(text)}}
+                raw = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+def usage_totals() -> dict:
+    from src.core.llm_metrics import llm_metrics
+    calls = prompt = completion = 0
+    for sites in llm_metrics.snapshot()["providers"].values():
+        for m in sites.values():
+            calls += m["ok"]
+            prompt += m["prompt_tokens"]
+            completion += m["completion_tokens"]
+    return {"calls": calls, "prompt": prompt, "completion": completion}
+
+def report(label: str, before: dict, after: dict, scored: int, wall: float):
+    calls = after["calls"] - before["calls"]
+    prompt = after["prompt"] - before["prompt"]
+    completion = after["completion"] - before["completion"]
+    print(f"{label:<28}: {calls:3d} LLM calls  {prompt:6d} prompt + {completion:5d} completion tokens  "
+          f"({scored} answers scored, {1000 * wall:5.0f} ms)", file=sys.stderr)
+
+async def candidate(args):
+    from src.services.assessment_service import assessment_service
+    from src.services.evaluation_queue import EvaluationQueue
+
+    rng = random.Random(1)
+    answers = [(answer_text(rng), rng.choice(["resume", "skill", "behavioral", "psychometric"]),
+                {"text": "Describe a time you improved a system under pressure.",
+                 "evaluation_rubric": "Look for ownership, measurable outcome and structured reasoning."})
+               for _ in range(args.answers)]
+
+    for mode in ("single", "batch"):
+        queue = EvaluationQueue(
+            assessment_service._evaluate_ai,
+            workers=4,
+            batch_evaluator=assessment_service._evaluate_ai_batch if mode == "batch" else None,
+            batch_size=args.batch_size
+        )
+        before = usage_totals()
+        start = time.perf_counter()
+        for i, (answer, category, meta) in enumerate(answers):
+            await queue.enqueue(f"resp-{mode}-{i}", "candidate-1", answer, category, meta)
+        await queue.settle("candidate-1")
+        wall = time.perf_counter() - start
+        await queue.stop()
+        label = "candidate, single" if mode == "single" else f"candidate, batch of {args.batch_size}"
+        report(label, before, usage_totals(), queue.metrics["completed"], wall)
+
+async def recruiter(args, rows):
+    from src.services.recruiter_service import recruiter_service
+
+    before = usage_totals()
+    start = time.perf_counter()
+    await asyncio.gather(*(recruiter_service._score_recruiter_answer(r["question_text"], r["answer_text"], r["category"]) for r in rows))
+    report("recruiter, single", before, usage_totals(), len(rows), time.perf_counter() - start)
+
+    before = usage_totals()
+    start = time.perf_counter()
+    scored = await recruiter_service._score_pending_answers("recruiter-1")
+    report("recruiter, batch", before, usage_totals(), scored, time.perf_counter() - start)
+
+async def main(args, rows):
+    from src.services.batch_evaluator import batch_evaluator
+    await candidate(args)
+    await recruiter(args, rows)
+    s = batch_evaluator.stats()
+    print(f"batch items {s['items']}, re-scored one by one {s['invalid_items']} "
+          f"(fallback rate {s['item_fallback_rate']:.0%})", file=sys.stderr)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--answers", type=int, default=12)
+    parser.add_argument("--recruiter-answers", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=6)
+    parser.add_argument("--bad-rate", type=float, default=0.0)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(2)
+    rows = [{"id": f"rec-{i}", "question_text": "How do you define a high performer beyond technical skills?",
+             "answer_text": answer_text(rng, 80), "category": rng.choice(["recruiter_intent", "recruiter_icp", "recruiter_ethics"])}
+            for i in range(args.recruiter_answers)]
+
+    base = ScoringStub(args.latency_ms, args.bad_rate).start()
+    supabase = StubSupabase({
+        # Write-backs succeed; settle() finds nothing left unscored
+        "/rest/v1/assessment_responses": lambda method, query, body: [],
+        "/rest/v1/recruiter_assessment_responses": lambda method, query, body: rows if method == "GET" else []
+    }, latency_ms=5)
+    supabase.start()
+    supabase.configure_env(
+        GOOGLE_API_KEY="stub", OPENROUTER_API_KEY="stub", GROQ_API_KEY="",
+        GEMINI_API_BASE=base, OPENROUTER_API_BASE=f"{base}/openrouter"
+    )
+    sys.stdout = open(os.devnull, "w") # Mute DEBUG logging
+    asyncio.run(main(args, rows))
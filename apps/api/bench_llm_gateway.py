@@ -0,0 +1,125 @@
+"""
+Checks the shared LLM gateway against local stubs that speak each provider's HTTP API
+(Gemini generateContent, OpenAI-style /chat/completions for OpenRouter and Groq).
+
+Scenarios:
+  1. healthy primary          -> answered by gemini, no hedge, exactly one upstream call per request
+  2. slow primary             -> openrouter hedge wins well before the primary would have answered
+  3. failing primary          -> fallback starts immediately, breaker opens, later calls skip gemini
+  4. request deadline         -> a call inside deadline_scope() gives up on time
+
+Usage (from apps/api):
+    python bench_llm_gateway.py
+"""
+import os
+import sys
+import time
+import asyncio
+
+from bench_stub import StubSupabase
+
+GEMINI = {"delay": 0.05, "status": 200}
+OPENROUTER = {"delay": 0.05, "status": 200}
+
+def gemini_route(method, query, body):
+    time.sleep(GEMINI["delay"])
+    if GEMINI["status"] != 200:
+        return {"error": {"code": GEMINI["status"], "message": "stub failure"}}
+    return {"candidates": [{"content": {"role": "model", "parts": [{"text": "from-gemini"}]}}]}
+
+def chat_route(name):
+    def route(method, query, body):
+        time.sleep(OPENROUTER["delay"])
+        return {"choices": [{"message": {"role": "assistant", "content": f"from-{name}"}}]}
+    return route
+
+class StatusStub(StubSupabase):
+    """StubSupabase answers 200/201 only; the Gemini stub needs to return errors too."""
+    def _handler(self):
+        base = super()._handler()
+
+        class Handler(base):
+            def send_response(self, code, message=None):
+                if self.path.startswith("/v1beta") and GEMINI["status"] != 200:
+                    code = GEMINI["status"]
+                elif code == 201:
+                    code = 200
+                super().send_response(code, message)
+
+        return Handler
+
+def check(label: str, ok: bool, detail: str):
+    print(f"[{'PASS' if ok else 'FAIL'}] {label}: {detail}", file=sys.stderr)
+    return ok
+
+GEMINI_PATH = "/v1beta/models/gemini-3-flash-preview:generateContent"
+OPENROUTER_PATH = "/openrouter/chat/completions"
+
+async def main(stub: StubSupabase) -> bool:
+    from src.core.llm_gateway import llm_gateway, deadline_scope, LLMUnavailable
+
+    gemini = llm_gateway.providers["gemini"]
+    results = []
+
+    # 1. Healthy primary
+    res = await llm_gateway.generate("hi", route=("gemini", "openrouter"))
+    results.append(check("healthy primary", res.provider == "gemini" and not res.hedged, f"{res.provider} in {res.latency_ms}ms"))
+
+    # 1b. ...and the fallback provider is never called while the primary is healthy
+    before = (stub.hits.get(GEMINI_PATH, 0), stub.hits.get(OPENROUTER_PATH, 0))
+    for _ in range(10):
+        await llm_gateway.generate("hi", route=("gemini", "openrouter"))
+    await asyncio.sleep(0.2) # Let any stray hedge request reach the stub
+    gemini_calls = stub.hits.get(GEMINI_PATH, 0) - before[0]
+    openrouter_calls = stub.hits.get(OPENROUTER_PATH, 0) - before[1]
+    results.append(check("one upstream call per request", gemini_calls == 10 and openrouter_calls == 0,
+                         f"10 calls -> gemini {gemini_calls}, openrouter {openrouter_calls}"))
+
+    # 2. Slow primary: warm the latency window so the hedge fires at ~p95 of normal traffic
+    for _ in range(25):
+        await llm_gateway.generate("warm", route=("gemini",))
+    GEMINI["delay"] = 3.0
+    res = await llm_gateway.generate("hi", route=("gemini", "openrouter"))
+    results.append(check("slow primary hedged", res.provider == "openrouter" and res.hedged and res.latency_ms < 2500,
+                         f"{res.provider} in {res.latency_ms}ms (hedge after {llm_gateway.stats()['gemini']['hedge_after_ms']}ms)"))
+
+    # 3. Failing primary opens the breaker
+    GEMINI["delay"], GEMINI["status"] = 0.01, 503
+    for _ in range(gemini.breaker.failure_threshold):
+        await llm_gateway.generate("hi", route=("gemini", "openrouter"), retry_primary=False)
+    calls_before = llm_gateway.metrics["gemini"]["calls"]
+    res = await llm_gateway.generate("hi", route=("gemini", "openrouter"))
+    results.append(check("breaker skips failing primary",
+                         gemini.breaker.state == "open" and llm_gateway.metrics["gemini"]["calls"] == calls_before and res.provider == "openrouter",
+                         f"breaker={gemini.breaker.state}, answered by {res.provider}"))
+
+    # 4. Deadline propagation
+    OPENROUTER["delay"] = 5.0
+    start = time.monotonic()
+    try:
+        with deadline_scope(0.5):
+            await llm_gateway.generate("hi", route=("openrouter",))
+        ok = False
+    except LLMUnavailable:
+        ok = True
+    elapsed = time.monotonic() - start
+    results.append(check("deadline respected", ok and elapsed < 1.0, f"gave up after {elapsed * 1000:.0f}ms"))
+
+    await llm_gateway.close()
+    return all(results)
+
+if __name__ == "__main__":
+    stub = StatusStub({
+        GEMINI_PATH: gemini_route,
+        OPENROUTER_PATH: chat_route("openrouter"),
+        "/groq/chat/completions": chat_route("groq"),
+    }, latency_ms=0)
+    base = stub.start()
+    stub.configure_env(
+        GOOGLE_API_KEY="stub", OPENROUTER_API_KEY="stub", GROQ_API_KEY="stub",
+        GEMINI_API_BASE=base, OPENROUTER_API_BASE=f"{base}/openrouter", GROQ_API_BASE=f"{base}/groq",
+        LLM_HEDGE_MIN_MS="200", LLM_BREAKER_RESET_S="60"
+    )
+
+    sys.stdout = open(os.devnull, "w")
+    sys.exit(0 if asyncio.run(main(stub)) else 1)
@@ -0,0 +1,165 @@
+"""
+Overload simulation for the per-provider adaptive concurrency limit in the LLM gateway.
+
+Two local stubs speak the Gemini and OpenAI-style APIs. Each serves at most `--capacity`
+concurrent requests and answers 429 to anything beyond that, like a provider rate limit.
+Requests arrive at `--rate` per second for `--seconds`, well above what both stubs can serve.
+Every request runs inside a deadline_scope of `--deadline` seconds.
+
+The same load runs twice: without the limiter (every caller goes straight to the provider)
+and with AIMD starting from `--initial`, deliberately above the stubs' capacity. Goodput is
+answered requests per second of wall time; the answered share shows how many callers got a
+reply within their deadline instead of a 429 cascade.
+
+Usage (from apps/api):
+    python bench_llm_limiter.py --capacity 8 --rate 150 --seconds 3
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import threading
+import statistics
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bench_stub import StubSupabase
+
+class RateLimitedStub:
+    def __init__(self, capacity: int, service_ms: float):
+        self.capacity = capacity
+        self.service = service_ms / 1000
+        self.active = {"gemini": 0, "openrouter": 0}
+        self.served = {"gemini": 0, "openrouter": 0}
+        self.rejected = {"gemini": 0, "openrouter": 0}
+        self._lock = threading.Lock()
+
+    def reset(self):
+        for counter in (self.served, self.rejected):
+            for name in counter:
+                counter[name] = 0
+
+    def start(self) -> str:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, code: int, payload: dict):
+                raw = json.dumps(payload).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                name = "gemini" if self.path.startswith("/v1beta") else "openrouter"
+                with stub._lock:
+                    if stub.active[name] >= stub.capacity:
+                        stub.rejected[name] += 1
+                        over = True
+                    else:
+                        stub.active[name] += 1
+                        over = False
+                if over:
+                    self._reply(429, {"error": {"code": 429, "message": "rate limited"}})
+                    return
+                try:
+                    time.sleep(stub.service * random.uniform(0.8, 1.2))
+                finally:
+                    with stub._lock:
+                        stub.active[name] -= 1
+                        stub.served[name] += 1
+                if name == "gemini":
+                    self._reply(200, {"candidates": [{"content": {"parts": [{"text": "ok"}]}}],
+                                      "usageMetadata": {"promptTokenCount": 400, "candidatesTokenCount": 60}})
+                else:
+                    self._reply(200, {"choices": [{"message": {"content": "ok"}}],
+                                      "usage": {"prompt_tokens": 400, "completion_tokens": 60}})
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+async def run(label: str, limited: bool, stub: RateLimitedStub, args):
+    from src.core.config import GOOGLE_API_KEY, OPENROUTER_API_KEY, GEMINI_API_BASE, OPENROUTER_API_BASE
+    from src.core.llm_gateway import LLMGateway, GeminiProvider, OpenAIChatProvider, LLMUnavailable, deadline_scope
+    from src.core.adaptive_limiter import AdaptiveLimiter
+
+    gateway = LLMGateway(providers=[
+        GeminiProvider(GOOGLE_API_KEY, GEMINI_API_BASE, "gemini-3-flash-preview", timeout=15.0),
+        OpenAIChatProvider("openrouter", OPENROUTER_API_KEY, OPENROUTER_API_BASE, "openai/gpt-4o-mini", timeout=30.0)
+    ])
+    for provider in gateway.providers.values():
+        provider.limiter = AdaptiveLimiter(initial=args.initial, max_limit=64, cooldown=args.service_ms / 1000, enabled=limited)
+    stub.reset()
+
+    latencies, failures = [], 0
+
+    async def one():
+        nonlocal failures
+        start = time.monotonic()
+        try:
+            with deadline_scope(args.deadline):
+                await gateway.generate("Score this answer", site="bench")
+            latencies.append(time.monotonic() - start)
+        except LLMUnavailable:
+            failures += 1
+
+    tasks = []
+    start = time.monotonic()
+    for _ in range(int(args.rate * args.seconds)):
+        tasks.append(asyncio.create_task(one()))
+        await asyncio.sleep(1 / args.rate)
+    await asyncio.gather(*tasks)
+    wall = time.monotonic() - start
+
+    p50 = statistics.median(latencies) * 1000 if latencies else 0.0
+    p95 = statistics.quantiles(latencies, n=20)[18] * 1000 if len(latencies) > 1 else p50
+    limits = {name: p.limiter.stats() for name, p in gateway.providers.items()}
+    offered = len(latencies) + failures
+    print(f"{label:<14}: goodput {len(latencies) / wall:6.1f} req/s  answered {len(latencies):4d}/{offered} "
+          f"({100 * len(latencies) / offered:3.0f}%)  "
+          f"p50 {p50:6.0f} ms  p95 {p95:6.0f} ms  upstream 429s {sum(stub.rejected.values()):5d}  "
+          f"breakers {[p.breaker.state for p in gateway.providers.values()]}", file=sys.stderr)
+    if limited:
+        for name, s in limits.items():
+            print(f"{'':<16}{name}: limit {s['limit']} (peak {s['peak_limit']}), -{s['decreases']}/+{s['increases']}, "
+                  f"queued {s['queued']}, queue timeouts {s['queue_timeouts']}", file=sys.stderr)
+    await gateway.close()
+
+async def main(args, stub: RateLimitedStub):
+    print(f"capacity {args.capacity} concurrent x 2 providers, ~{args.service_ms:.0f} ms per call "
+          f"(max ~{2 * args.capacity * 1000 / args.service_ms:.0f} req/s); offered {args.rate} req/s for {args.seconds}s",
+          file=sys.stderr)
+    await run("no limiter", False, stub, args)
+    await run("AIMD limiter", True, stub, args)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--capacity", type=int, default=8)
+    parser.add_argument("--service-ms", type=float, default=200)
+    parser.add_argument("--rate", type=float, default=150)
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--deadline", type=float, default=10)
+    parser.add_argument("--initial", type=int, default=24)
+    args = parser.parse_args()
+
+    providers = RateLimitedStub(args.capacity, args.service_ms)
+    base = providers.start()
+    supabase = StubSupabase({})
+    supabase.start()
+    supabase.configure_env( # src.core.config refuses to import without Supabase settings
+        GOOGLE_API_KEY="stub", OPENROUTER_API_KEY="stub", GROQ_API_KEY="",
+        GEMINI_API_BASE=base, OPENROUTER_API_BASE=f"{base}/openrouter"
+    )
+    sys.stdout = open(os.devnull, "w") # Mute DEBUG logging
+    asyncio.run(main(args, providers))
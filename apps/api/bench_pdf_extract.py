@@ -0,0 +1,114 @@
+"""
+Resume PDF text extraction: on the event loop (old parse_resume path, every page) vs the
+process-pool extractor (page stream with the RESUME_TEXT_MAX_CHARS cut-off).
+
+A corpus of synthetic text PDFs (1-30 pages) is extracted with N documents in flight while a
+heartbeat task ticks every 5 ms; any tick that arrives late means the loop was blocked.
+
+Usage (from apps/api):
+    python bench_pdf_extract.py --documents 40 --concurrency 8 --workers 2
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import statistics
+
+from bench_stub import StubSupabase
+
+WORDS = ("pipeline quota enterprise saas salesforce meddpicc prospecting negotiation forecast "
+         "territory account executive renewal expansion churn discovery onboarding").split()
+
+def make_pdf(pages: int, lines_per_page: int = 48) -> bytes:
+    """Minimal valid PDF with one Helvetica text stream per page."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for _ in range(pages):
+        lines = [" ".join(random.choice(WORDS) for _ in range(12)) for _ in range(lines_per_page)]
+        stream = "BT /F1 9 Tf 40 800 Td 11 TL " + " ".join(f"({line}) '" for line in lines) + " ET"
+        content = f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode()
+        objects.append(content)
+        content_ref = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> /Contents {content_ref} 0 R >>".encode())
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for off in offsets:
+        out += f"{off:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+async def heartbeat(stop: asyncio.Event, lags: list, interval: float = 0.005):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, (loop.time() - start - interval) * 1000))
+
+async def run(label: str, extract, corpus: list, concurrency: int):
+    sem = asyncio.Semaphore(concurrency)
+    stop, lags = asyncio.Event(), []
+    chars = 0
+
+    async def one(pdf: bytes):
+        nonlocal chars
+        async with sem:
+            chars += len(await extract(pdf))
+
+    beat = asyncio.create_task(heartbeat(stop, lags))
+    start = time.perf_counter()
+    await asyncio.gather(*(one(pdf) for pdf in corpus))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+
+    blocked = sum(l for l in lags if l > 1.0)
+    p99 = statistics.quantiles(lags, n=100)[98] if len(lags) > 1 else (lags[0] if lags else 0.0)
+    print(f"{label:<22}: {len(corpus) / elapsed:6.1f} docs/s  wall {elapsed * 1000:7.0f} ms  "
+          f"loop blocked {blocked:7.0f} ms  max stall {max(lags or [0]):6.1f} ms  p99 tick lag {p99:6.1f} ms  "
+          f"({chars} chars)", file=sys.stderr)
+
+async def main(args):
+    from src.utils.pdf_text import extract_pdf_text
+    from src.services.pdf_extractor import PdfTextExtractor
+
+    random.seed(7)
+    corpus = [make_pdf(random.randint(1, args.max_pages)) for _ in range(args.documents)]
+    print(f"corpus: {len(corpus)} PDFs, {sum(len(p) for p in corpus) // 1024} KiB", file=sys.stderr)
+
+    async def inline(pdf: bytes) -> str:
+        # What parse_resume used to do: every page, on the event loop
+        return extract_pdf_text(pdf, max_chars=10 ** 9)["text"]
+
+    extractor = PdfTextExtractor(workers=args.workers, max_pending=args.workers * 2, max_chars=args.max_chars)
+    await extractor.extract(corpus[0]) # Spawn the workers outside the timed run
+
+    await run("inline (old)", inline, corpus, args.concurrency)
+    await run(f"process pool x{args.workers}", extractor.extract, corpus, args.concurrency)
+    print(f"pages skipped by cut-off: {extractor.stats()['pages_skipped']}", file=sys.stderr)
+    extractor.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=40)
+    parser.add_argument("--max-pages", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--max-chars", type=int, default=12000)
+    args = parser.parse_args()
+
+    stub = StubSupabase({})
+    stub.start()
+    stub.configure_env() # src.core.config refuses to import without Supabase settings
+
+    sys.stdout = open(os.devnull, "w") # Mute DEBUG logging
+    asyncio.run(main(args))
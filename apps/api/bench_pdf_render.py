@@ -0,0 +1,108 @@
+"""
+Resume PDF rendering throughput: the old /generate-resume path (fresh Jinja2 environment and
+template compile per request, xhtml2pdf on the event loop) vs PdfRenderService at 1, 4 and 8
+workers, plus a repeat pass over the same payloads served from the output cache.
+
+Every payload is distinct, so the pool runs measure real renders, not cache hits.
+
+Usage (from apps/api):
+    python bench_pdf_render.py --documents 48 --concurrency 16
+"""
+import io
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+
+from bench_stub import StubSupabase
+
+WORDS = ("pipeline quota enterprise saas salesforce meddpicc prospecting negotiation forecast "
+         "territory account executive renewal expansion churn discovery onboarding").split()
+
+def make_payload(i: int) -> dict:
+    sentence = lambda n: " ".join(random.choice(WORDS) for _ in range(n)).capitalize()
+    return {
+        "full_name": f"Candidate {i}",
+        "phone": f"+1 555 {i:04d}",
+        "location": "Bengaluru",
+        "bio": sentence(60),
+        "education": [{"degree": "MBA", "institution": "IIM", "year": "2016"}],
+        "timeline": [
+            {"role": "Account Executive", "company": f"Company {j}", "start": "2019", "end": "2023",
+             "description": "\n".join(sentence(14) for _ in range(5))}
+            for j in range(random.randint(2, 5))
+        ],
+        "skills": random.sample(WORDS, 8),
+        "linkedin": f"linkedin.com/in/candidate-{i}",
+        "portfolio": None,
+        "template": random.choice(["professional", "modern"])
+    }
+
+def render_old(data: dict) -> bytes:
+    # What PDFGenerator did before: new environment (and template compile) on every call
+    from jinja2 import Environment, FileSystemLoader
+    from xhtml2pdf import pisa
+    from src.utils.pdf_generator import TEMPLATE_DIR
+
+    env = Environment(loader=FileSystemLoader(TEMPLATE_DIR))
+    html = env.get_template(f"{data['template']}.html").render(**data)
+    buf = io.BytesIO()
+    pisa.CreatePDF(io.StringIO(html), dest=buf)
+    return buf.getvalue()
+
+async def run(label: str, render, payloads: list, concurrency: int):
+    sem = asyncio.Semaphore(concurrency)
+    total = 0
+
+    async def one(data: dict):
+        nonlocal total
+        async with sem:
+            n = len(await render(data))
+        total += n # Outside the await, so concurrent renders can't drop each other's sizes
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(d) for d in payloads))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22}: {len(payloads) / elapsed:7.1f} PDFs/s  wall {elapsed * 1000:7.0f} ms  "
+          f"({total // 1024} KiB)", file=sys.stderr)
+
+async def main(args):
+    from src.services.pdf_renderer import PdfRenderService
+
+    random.seed(11)
+    payloads = [make_payload(i) for i in range(args.documents)]
+    bytecode_dir = tempfile.mkdtemp(prefix="bench-jinja-")
+    # Renders are CPU-bound: pools larger than the core count can't add throughput
+    print(f"{os.cpu_count()} CPU cores, {args.documents} documents, concurrency {args.concurrency}", file=sys.stderr)
+
+    async def inline(data: dict) -> bytes:
+        return render_old(data)
+
+    await run("inline (old)", inline, payloads, args.concurrency)
+
+    for workers in (1, 4, 8):
+        renderer = PdfRenderService(workers=workers, max_pending=workers * 2, max_queue=args.documents,
+                                    bytecode_dir=bytecode_dir)
+        await renderer.render(make_payload(-1)) # Spawn the workers outside the timed run
+        await run(f"pool x{workers}", lambda d: renderer.render(d, d["template"]), payloads, args.concurrency)
+        if workers == 8:
+            await run("pool x8 (cached)", lambda d: renderer.render(d, d["template"]), payloads, args.concurrency)
+            print(f"cache: {renderer.stats()['cache_entries']} entries, {renderer.stats()['cache_bytes'] // 1024} KiB",
+                  file=sys.stderr)
+        renderer.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=48)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    stub = StubSupabase({})
+    stub.start()
+    stub.configure_env() # src.core.config refuses to import without Supabase settings
+
+    sys.stdout = open(os.devnull, "w") # Mute DEBUG logging
+    asyncio.run(main(args))
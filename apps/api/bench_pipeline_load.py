@@ -0,0 +1,114 @@
+"""
+Load test: p50/p99 latency of GET /recruiter/applications/pipeline while concurrent
+GET /notifications requests hammer the same worker.
+
+The app runs in-process (ASGI transport, one event loop - like a single uvicorn worker) against
+a stub Supabase that answers every call after a fixed delay. If any request path blocks the
+event loop on a sync Supabase call, pipeline p99 climbs with the background load.
+
+Usage (from apps/api):
+    python bench_pipeline_load.py --pipeline-requests 50 --background 100 --latency-ms 25
+"""
+import os
+import sys
+import time
+import uuid
+import asyncio
+import argparse
+import statistics
+
+import httpx
+from bench_stub import StubSupabase
+
+RECRUITER_ID = str(uuid.uuid4())
+COMPANY_ID = str(uuid.uuid4())
+
+def make_routes(n_apps: int):
+    job = {"id": str(uuid.uuid4()), "title": "Enterprise AE", "status": "active", "company_id": COMPANY_ID,
+           "skills_required": ["Salesforce", "MEDDPICC", "Prospecting"], "requirements": [], "location": "Remote",
+           "created_at": "2026-01-01T00:00:00Z"}
+    apps = []
+    for i in range(n_apps):
+        cid = str(uuid.uuid4())
+        apps.append({
+            "id": str(uuid.uuid4()), "status": "applied", "feedback": None, "created_at": "2026-01-02T00:00:00Z",
+            "job_id": job["id"], "candidate_id": cid, "jobs": job,
+            "candidate_profiles": {"user_id": cid, "full_name": f"Candidate {i}", "skills": ["salesforce", "Negotiation"],
+                                   "resume_path": f"{cid}/resume.pdf", "users": {"email": f"c{i}@talentflow.ai"}},
+            "interviews": []
+        })
+
+    def sign(method, query, body):
+        return [{"path": p, "signedURL": f"/object/sign/resumes/{p}?token=x", "error": None} for p in (body or {}).get("paths", [])]
+
+    notifications = [{"id": str(uuid.uuid4()), "user_id": RECRUITER_ID, "type": "SYSTEM", "title": "t", "message": "m",
+                      "metadata": {}, "is_read": False, "created_at": "2026-01-01T00:00:00Z"} for _ in range(50)]
+
+    return {
+        "/rest/v1/recruiter_profiles": [{"user_id": RECRUITER_ID, "company_id": COMPANY_ID, "companies": {"id": COMPANY_ID}}],
+        "/rest/v1/job_applications": apps,
+        "/rest/v1/profile_scores": [],
+        "/rest/v1/resume_data": [],
+        "/rest/v1/notifications": notifications,
+        "/storage/v1/object/sign/resumes": sign,
+    }
+
+async def measure(client: httpx.AsyncClient, n: int) -> list:
+    latencies = []
+    for _ in range(n):
+        start = time.perf_counter()
+        res = await client.get("/recruiter/applications/pipeline")
+        res.raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+def p(values: list, pct: float) -> float:
+    return statistics.quantiles(values, n=100)[int(pct) - 1] if len(values) > 1 else values[0]
+
+async def main(args):
+    from src.main import app
+    from src.core.dependencies import get_current_user
+
+    app.dependency_overrides[get_current_user] = lambda: {"sub": RECRUITER_ID, "email": "r@corp.com", "role": "recruiter"}
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await measure(client, 3) # Warm-up
+
+        baseline = await measure(client, args.pipeline_requests)
+
+        stop = asyncio.Event()
+        served = 0
+
+        async def hammer():
+            nonlocal served
+            while not stop.is_set():
+                await client.get("/notifications")
+                served += 1
+
+        workers = [asyncio.create_task(hammer()) for _ in range(args.background)]
+        start = time.perf_counter()
+        loaded = await measure(client, args.pipeline_requests)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await asyncio.gather(*workers)
+
+    out = sys.stderr
+    print(f"pipeline idle      : p50 {p(baseline, 50):7.1f} ms  p99 {p(baseline, 99):7.1f} ms", file=out)
+    print(f"pipeline + {args.background:>3} bg : p50 {p(loaded, 50):7.1f} ms  p99 {p(loaded, 99):7.1f} ms", file=out)
+    print(f"/notifications served concurrently: {served} ({served / elapsed:.1f} req/s)", file=out)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pipeline-requests", type=int, default=50)
+    parser.add_argument("--background", type=int, default=100, help="concurrent /notifications loops")
+    parser.add_argument("--applications", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=25.0)
+    args = parser.parse_args()
+
+    stub = StubSupabase(make_routes(args.applications), latency_ms=args.latency_ms)
+    stub.start()
+    stub.configure_env()
+
+    sys.stdout = open(os.devnull, "w") # Mute DEBUG request logging
+    asyncio.run(main(args))
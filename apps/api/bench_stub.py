@@ -0,0 +1,77 @@
+"""
+Tiny in-process stand-in for a Supabase project (Auth, PostgREST, Storage) used by the bench_*.py scripts.
+Every request sleeps for a fixed latency to mimic the network round-trip, then answers from a route table.
+"""
+import os
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from typing import Callable, Dict, Any
+
+import jwt
+
+class StubSupabase:
+    def __init__(self, routes: Dict[str, Any], latency_ms: float = 25.0):
+        """
+        routes: path -> payload, or path -> callable(method, query, body) returning a payload.
+        """
+        self.routes = routes
+        self.latency = latency_ms / 1000
+        self.hits: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.base_url = None
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _handle(self):
+                time.sleep(stub.latency)
+                parsed = urlparse(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"null") if length else None
+
+                with stub._lock:
+                    stub.hits[parsed.path] = stub.hits.get(parsed.path, 0) + 1
+
+                route = stub.routes.get(parsed.path)
+                if route is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                payload = route(self.command, parse_qs(parsed.query), body) if callable(route) else route
+                raw = json.dumps(payload).encode()
+                self.send_response(200 if self.command == "GET" else 201)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            do_GET = _handle
+            do_POST = _handle
+            do_PATCH = _handle
+            do_DELETE = _handle
+
+        return Handler
+
+    def start(self) -> str:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        return self.base_url
+
+    def configure_env(self, **extra: str):
+        """Point src.core.config at this stub. Must run before anything under src/ is imported."""
+        service_key = jwt.encode({"role": "service_role"}, "bench", algorithm="HS256")
+        os.environ["SUPABASE_URL"] = self.base_url
+        os.environ["SUPABASE_ANON_KEY"] = service_key
+        os.environ["SUPABASE_SERVICE_ROLE_KEY"] = service_key
+        os.environ.update(extra)
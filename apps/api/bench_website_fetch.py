@@ -0,0 +1,146 @@
+"""
+Company website scraping for bio generation: the old path (download the whole page with a
+throwaway httpx client, BeautifulSoup html.parser, keep 2 000 chars) vs WebsiteTextFetcher
+(streamed body, byte budget, incremental extractor with early stop, per-domain cache).
+
+A local server serves large landing pages (a 192 KiB inline <script> followed by megabytes of
+body text) with ETag / Last-Modified and answers conditional requests with 304. Each site is
+fetched cold, again inside the fresh window (cache hit) and once more with revalidation (304).
+
+Usage (from apps/api):
+    python bench_website_fetch.py --sites 20 --page-kib 4096
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bench_stub import StubSupabase
+
+WORDS = ("pipeline quota enterprise saas platform revenue customers teams cloud security "
+         "analytics automation partners growth mission global").split()
+
+def make_page(site: int, size_kib: int) -> bytes:
+    random.seed(site)
+    script = "var bundle=" + "".join(random.choice("abcdef0123456789") for _ in range(192 * 1024)) + ";"
+    paragraphs = "".join(
+        f"<p>{' '.join(random.choice(WORDS) for _ in range(40))}</p>\n"
+        for _ in range(size_kib * 1024 // 300)
+    )
+    return (f"<!doctype html><html><head><title>Site {site}</title>"
+            f"<meta name=\"description\" content=\"Site {site} builds revenue software for sales teams.\">"
+            f"<script>{script}</script></head><body><h1>Site {site}</h1>{paragraphs}</body></html>").encode()
+
+class PageServer:
+    def __init__(self, sites: int, size_kib: int):
+        self.pages = {f"/site{i}": make_page(i, size_kib) for i in range(sites)}
+        self.etags = {path: '"' + hashlib.md5(body).hexdigest() + '"' for path, body in self.pages.items()}
+        self.bytes_sent = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+
+    def start(self) -> str:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                body = server.pages.get(self.path)
+                if body is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                etag = server.etags[self.path]
+                if self.headers.get("If-None-Match") == etag:
+                    with server._lock:
+                        server.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", "Mon, 05 Oct 2026 08:00:00 GMT")
+                self.end_headers()
+                try:
+                    for i in range(0, len(body), 64 * 1024):
+                        self.wfile.write(body[i:i + 64 * 1024])
+                        with server._lock:
+                            server.bytes_sent += min(64 * 1024, len(body) - i)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass # Client stopped reading early
+
+        http = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        http.daemon_threads = True
+        threading.Thread(target=http.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{http.server_address[1]}"
+
+async def scrape_old(url: str) -> str:
+    import httpx
+    from bs4 import BeautifulSoup
+
+    async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as client:
+        response = await client.get(url)
+        response.raise_for_status()
+    soup = BeautifulSoup(response.text, "html.parser")
+    for script in soup(["script", "style"]):
+        script.decompose()
+    text = soup.get_text()
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    return "\n".join(chunk for chunk in chunks if chunk)[:2000]
+
+async def run(label: str, fetch, urls: list, server: PageServer):
+    sent_before = server.bytes_sent
+    start = time.perf_counter()
+    texts = [await fetch(url) for url in urls]
+    elapsed = time.perf_counter() - start
+    assert all(len(t) > 200 for t in texts), f"{label}: empty extraction"
+    print(f"{label:<24}: {elapsed * 1000 / len(urls):7.1f} ms/site  "
+          f"server sent {(server.bytes_sent - sent_before) // 1024:8d} KiB  "
+          f"avg text {sum(map(len, texts)) // len(texts)} chars", file=sys.stderr)
+
+async def main(args):
+    from src.services.website_fetcher import WebsiteTextFetcher
+
+    server = PageServer(args.sites, args.page_kib)
+    base = server.start()
+    urls = [f"{base}/site{i}" for i in range(args.sites)]
+    print(f"{args.sites} sites, {args.page_kib} KiB per page", file=sys.stderr)
+
+    try:
+        await run("old (bs4, full page)", scrape_old, urls, server)
+    except ImportError:
+        print("old (bs4, full page)    : skipped, beautifulsoup4 not installed", file=sys.stderr)
+
+    fetcher = WebsiteTextFetcher(max_bytes=args.max_kib * 1024, max_chars=2000, fresh_ttl=3600)
+    await run("streamed (cold)", fetcher.fetch_text, urls, server)
+    await run("streamed (fresh cache)", fetcher.fetch_text, urls, server)
+    await run("streamed (revalidate)", lambda u: fetcher.fetch_text(u, revalidate=True), urls, server)
+    assert server.not_modified == args.sites, "expected one 304 per site"
+    print(f"fetcher: {fetcher.stats()}", file=sys.stderr)
+    await fetcher.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sites", type=int, default=20)
+    parser.add_argument("--page-kib", type=int, default=4096)
+    parser.add_argument("--max-kib", type=int, default=512)
+    args = parser.parse_args()
+
+    stub = StubSupabase({})
+    stub.start()
+    stub.configure_env() # src.core.config refuses to import without Supabase settings
+
+    sys.stdout = open(os.devnull, "w") # Mute DEBUG logging
+    asyncio.run(main(args))
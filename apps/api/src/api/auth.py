@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Body
 from src.core.dependencies import get_current_user
-from src.core.supabase import supabase
+from src.core.supabase import async_supabase as supabase
+from src.core.role_cache import role_cache
 from pydantic import BaseModel, EmailStr
 
 router = APIRouter(tags=["auth"])
@@ -34,7 +35,7 @@ def validate_email(request: EmailValidationRequest):
     return {"status": "valid"}
 
 @router.post("/initialize")
-def initialize_profile(
+async def initialize_profile(
     request: ProfileInitializeRequest,
     user: dict = Depends(get_current_user)
 ):
@@ -43,20 +44,21 @@ def initialize_profile(
     
     # 1. Create user in public.users
     try:
-        supabase.table("users").upsert({
+        await supabase.table("users").upsert({
             "id": user_id,
             "email": email,
             "role": request.role
         }).execute()
+        role_cache.invalidate(user_id)
         
         # 2. Create profile based on role
         if request.role == "candidate":
-            supabase.table("candidate_profiles").upsert({
+            await supabase.table("candidate_profiles").upsert({
                 "user_id": user_id,
                 "experience": "fresher" # Default, will be updated in workflow
             }).execute()
         elif request.role == "recruiter":
-            supabase.table("recruiter_profiles").upsert({
+            await supabase.table("recruiter_profiles").upsert({
                 "user_id": user_id
             }).execute()
             
@@ -72,14 +74,14 @@ async def post_login(user: dict = Depends(get_current_user)):
     print(f"HANDSHAKE START: User {user_id} ({email})")
     
     # Check if blocked
-    blocked = supabase.table("blocked_users").select("*").eq("user_id", user_id).execute()
+    blocked = await supabase.table("blocked_users").select("*").eq("user_id", user_id).execute()
     if blocked.data:
         print(f"HANDSHAKE BLOCKED: User {user_id} is in blocked_users")
         raise HTTPException(status_code=403, detail="Your account has been permanently blocked due to security violations.")
 
     try:
         # 1. Fetch user role
-        user_res = supabase.table("users").select("role").eq("id", user_id).execute()
+        user_res = await supabase.table("users").select("role").eq("id", user_id).execute()
         
         if not user_res.data:
             print(f"HANDSHAKE: User {user_id} not found in users table. Initializing recovery...")
@@ -88,14 +90,15 @@ async def post_login(user: dict = Depends(get_current_user)):
             recovered_role = "candidate" if is_personal_email(email) else "recruiter"
             
             # Initialize them now
-            supabase.table("users").upsert({
+            await supabase.table("users").upsert({
                 "id": user_id,
                 "email": email,
                 "role": recovered_role
             }).execute()
+            role_cache.invalidate(user_id)
             
             if recovered_role == "candidate":
-                supabase.table("candidate_profiles").upsert({
+                await supabase.table("candidate_profiles").upsert({
                     "user_id": user_id,
                     "experience": "fresher"
                 }).execute()
@@ -112,13 +115,15 @@ async def post_login(user: dict = Depends(get_current_user)):
             }
         
         role = user_res.data[0]["role"]
+        # Login is the natural refresh point: replace whatever get_current_user cached
+        role_cache.set(user_id, role)
         print(f"HANDSHAKE: Found role '{role}' for user {user_id}")
         
         # 2. Check assessment status
         if role == "candidate":
-            profile_res = supabase.table("candidate_profiles").select("*").eq("user_id", user_id).execute()
+            profile_res = await supabase.table("candidate_profiles").select("*").eq("user_id", user_id).execute()
         else:
-            profile_res = supabase.table("recruiter_profiles").select("*").eq("user_id", user_id).execute()
+            profile_res = await supabase.table("recruiter_profiles").select("*").eq("user_id", user_id).execute()
             
         # Safe access to profile data
         status = "not_started"
@@ -1,11 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException
 from src.core.dependencies import get_current_user
 from src.core.supabase import async_supabase as supabase
+from src.core.signed_url_cache import signed_url_cache
+from src.services.skill_index import skill_index
+from src.services.market_insights import market_insights
+from src.services.question_prefetch import question_prefetcher
+from src.services.assessment_state import assessment_state
+from src.services.assessment_service import question_pool
 from pydantic import BaseModel
 from src.services.resume_service import ResumeService
 from src.services.candidate_service import CandidateService
 from src.services.notification_service import NotificationService
-from src.utils.pdf_generator import PDFGenerator
+from src.services.pdf_renderer import pdf_renderer, RendererBusy
 from src.schemas.candidate import CandidateProfileUpdate, CandidateStats, CandidateJobResponse, JobApplicationResponse
 from src.core.config import GOOGLE_API_KEY
 from typing import List, Optional
@@ -70,14 +76,11 @@ async def get_profile(user: dict = Depends(get_current_user)):
             
         # Add Signed URL for Profile Photo
         if profile.get("profile_photo_url") and not profile["profile_photo_url"].startswith("http"):
-            try:
-                # Use sync supabase for storage until async is fully vetted for storage.create_signed_url
-                from src.core.supabase import supabase as sync_supabase
-                signed_url_res = sync_supabase.storage.from_("avatars").create_signed_url(profile["profile_photo_url"], 3600)
-                if signed_url_res and "signedURL" in signed_url_res:
-                    profile["profile_photo_url"] = signed_url_res["signedURL"]
-            except Exception as e:
-                print(f"FAILED TO SIGN PROFILE PHOTO: {e}")
+            signed_photo = await signed_url_cache.get("avatars", profile["profile_photo_url"])
+            if signed_photo:
+                profile["profile_photo_url"] = signed_photo
+            else:
+                print(f"FAILED TO SIGN PROFILE PHOTO: {profile['profile_photo_url']}")
                 
         return profile
     except Exception as e:
@@ -238,8 +241,8 @@ async def generate_resume(
         # 1. Prepare data for PDF
         resume_data_dict = request.model_dump()
         
-        # 2. Generate PDF using our utility
-        pdf_content = PDFGenerator.generate_resume_pdf(resume_data_dict, request.template)
+        # 2. Render the PDF in the worker pool (identical data + template is served from cache)
+        pdf_content = await pdf_renderer.render(resume_data_dict, request.template)
         
         # 3. Upload to Supabase Storage
         file_path = f"resumes/{user_id}-generated.pdf"
@@ -250,6 +253,7 @@ async def generate_resume(
             pdf_content, 
             {"content-type": "application/pdf", "x-upsert": "true"}
         )
+        signed_url_cache.invalidate("resumes", file_path)
         
         # 4. Update Profile (High-Fidelity Sync)
         await supabase.table("candidate_profiles").update({
@@ -280,8 +284,13 @@ async def generate_resume(
             "skills": request.skills,
             "parsed_at": "now()"
         }).execute()
+        question_prefetcher.invalidate(user_id)
+        assessment_state.invalidate(user_id)
+        question_pool.schedule(user_id) # After both writes: the build reads profile skills and resume_data
         
         return {"status": "resume_generated", "path": file_path}
+    except RendererBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         print(f"Resume Generation Error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -299,6 +308,11 @@ async def update_skills(
             "skills": request.skills,
             "onboarding_step": "AWAITING_ID"
         }).eq("user_id", user_id).execute()
+        skill_index.update_candidate(user_id, request.skills)
+        market_insights.candidate_skills_changed(user_id, request.skills)
+        question_prefetcher.invalidate(user_id)
+        assessment_state.invalidate(user_id)
+        question_pool.schedule(user_id)
         
         return {"status": "skills_updated", "next": "id_verification"}
     except Exception as e:
@@ -335,7 +349,7 @@ async def accept_tc(
             "assessment_status": "not_started"
         }).eq("user_id", user_id).execute()
 
-        NotificationService.create_notification(
+        await NotificationService.create_notification(
             user_id=user_id,
             type="ONBOARDING_COMPLETED",
             title="Profile Synchronized",
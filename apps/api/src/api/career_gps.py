@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 from src.core.dependencies import get_current_user
-from src.core.supabase import supabase
+from src.core.supabase import async_supabase as supabase
 from pydantic import BaseModel
 from src.services.career_gps_service import CareerGPSService
 from src.services.notification_service import NotificationService
@@ -12,22 +12,23 @@ class GPSInput(BaseModel):
     target_role: str
     career_interests: Union[str, List[str]]
     long_term_goal: str
+    regenerate: bool = False # Skip the generation cache
 
 class MilestoneUpdate(BaseModel):
     status: str
 
 @router.get("/")
-def get_gps_path(user: dict = Depends(get_current_user)):
+async def get_gps_path(user: dict = Depends(get_current_user)):
     user_id = user["sub"]
     try:
         # Fetch GPS parent and milestones
-        gps_res = supabase.table("career_gps").select("*").eq("candidate_id", user_id).execute()
+        gps_res = await supabase.table("career_gps").select("*").eq("candidate_id", user_id).execute()
         
         if not gps_res.data:
             return {"status": "no_gps_found"}
             
         gps_id = gps_res.data[0]["id"]
-        milestones_res = supabase.table("career_milestones").select("*").eq("gps_id", gps_id).order("step_order", desc=False).execute()
+        milestones_res = await supabase.table("career_milestones").select("*").eq("gps_id", gps_id).order("step_order", desc=False).execute()
         
         return {
             "status": "active",
@@ -41,7 +42,11 @@ def get_gps_path(user: dict = Depends(get_current_user)):
 async def generate_gps(request: GPSInput, user: dict = Depends(get_current_user)):
     user_id = user["sub"]
     try:
-        result = await CareerGPSService.generate_gps(user_id, request.model_dump())
+        result = await CareerGPSService.generate_gps(
+            user_id,
+            request.model_dump(exclude={"regenerate"}),
+            regenerate=request.regenerate
+        )
         # The result now contains 'source' identifying which AI was used
         return result
     except Exception as e:
@@ -57,7 +62,7 @@ async def generate_gps(request: GPSInput, user: dict = Depends(get_current_user)
         raise HTTPException(status_code=500, detail=err_msg)
 
 @router.patch("/milestone/{milestone_id}")
-def update_milestone_status(
+async def update_milestone_status(
     milestone_id: str, 
     request: MilestoneUpdate, 
     user: dict = Depends(get_current_user)
@@ -65,7 +70,7 @@ def update_milestone_status(
     user_id = user["sub"]
     try:
         # Verify ownership (via GPS ID and candidate ID relation)
-        check = supabase.table("career_milestones")\
+        check = await supabase.table("career_milestones")\
             .select("gps_id")\
             .eq("id", milestone_id)\
             .execute()
@@ -74,7 +79,7 @@ def update_milestone_status(
             raise HTTPException(status_code=404, detail="Milestone not found")
             
         gps_id = check.data[0]["gps_id"]
-        owner_check = supabase.table("career_gps")\
+        owner_check = await supabase.table("career_gps")\
             .select("candidate_id")\
             .eq("id", gps_id)\
             .execute()
@@ -87,9 +92,9 @@ def update_milestone_status(
             updates["completed_at"] = "now()"
             
             # 3. Trigger Notification
-            milestone_res = supabase.table("career_milestones").select("title").eq("id", milestone_id).single().execute()
+            milestone_res = await supabase.table("career_milestones").select("title").eq("id", milestone_id).single().execute()
             if milestone_res.data:
-                NotificationService.create_notification(
+                await NotificationService.create_notification(
                     user_id=user_id,
                     type="system",
                     title="Milestone Completed! 🚀",
@@ -99,7 +104,7 @@ def update_milestone_status(
         else:
             updates["completed_at"] = None
             
-        supabase.table("career_milestones").update(updates).eq("id", milestone_id).execute()
+        await supabase.table("career_milestones").update(updates).eq("id", milestone_id).execute()
         
         return {"status": "updated", "new_status": request.status}
     except Exception as e:
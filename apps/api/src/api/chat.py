@@ -4,7 +4,7 @@ from src.core.dependencies import get_current_user
 from ..services.chat_service import ChatService
 from ..services.notification_service import NotificationService
 
-from src.core.supabase import supabase
+from src.core.supabase import async_supabase as supabase
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
 
@@ -14,7 +14,7 @@ async def check_chat_permission(recruiter_id: str, candidate_id: str):
     Messaging is only allowed if the candidate is Shortlisted, Interviewing, or Offered.
     """
     # Check if recruiter has ANY application for this candidate in an advanced stage
-    res = supabase.table("job_applications")\
+    res = await supabase.table("job_applications")\
         .select("status")\
         .eq("candidate_id", candidate_id)\
         .in_("status", ["shortlisted", "interview_scheduled", "offered"])\
@@ -42,7 +42,7 @@ async def send_message(
         # Identify candidate_id even if thread_id is provided
         target_candidate_id = candidate_id
         if not target_candidate_id and thread_id:
-            thread_res = supabase.table("chat_threads").select("candidate_id").eq("id", thread_id).execute()
+            thread_res = await supabase.table("chat_threads").select("candidate_id").eq("id", thread_id).execute()
             if thread_res.data:
                 target_candidate_id = thread_res.data[0]["candidate_id"]
         
@@ -61,7 +61,7 @@ async def send_message(
             raise HTTPException(status_code=400, detail="Recruiters must provide a candidate_id to initiate chat.")
         
         # Get/Create thread for recruiter
-        thread = ChatService.get_or_create_thread(user_id, candidate_id)
+        thread = await ChatService.get_or_create_thread(user_id, candidate_id)
         target_thread_id = thread["id"]
 
     # 2. Authorization Check (Ensure user belongs to thread)
@@ -69,11 +69,11 @@ async def send_message(
     
     # 3. Send Message
     try:
-        message = ChatService.send_message(target_thread_id, user_id, content)
+        message = await ChatService.send_message(target_thread_id, user_id, content)
         
         # 4. Trigger Notification for recipient
         # Determine recipient_id
-        thread_info = ChatService.get_or_create_thread(user_id, candidate_id) if not thread_id else None # Optimization needed
+        thread_info = await ChatService.get_or_create_thread(user_id, candidate_id) if not thread_id else None # Optimization needed
         # For now, keep it simple
         
         return {"status": "success", "message": message}
@@ -87,7 +87,7 @@ async def get_threads(current_user: dict = Depends(get_current_user)):
     """
     user_id = current_user["id"]
     role = current_user.get("role")
-    threads = ChatService.get_user_threads(user_id, role)
+    threads = await ChatService.get_user_threads(user_id, role)
     return threads
 
 @router.get("/messages/{thread_id}")
@@ -95,7 +95,7 @@ async def get_messages(thread_id: str, limit: int = 50, current_user: dict = Dep
     """
     Returns message history for a thread.
     """
-    messages = ChatService.get_thread_messages(thread_id, limit)
+    messages = await ChatService.get_thread_messages(thread_id, limit)
     return messages
 
 @router.post("/report")
@@ -108,5 +108,5 @@ async def report_message(
     Reports a message for abuse.
     """
     user_id = current_user["id"]
-    report = ChatService.report_message(message_id, user_id, reason)
+    report = await ChatService.report_message(message_id, user_id, reason)
     return {"status": "reported", "report_id": report["id"]}
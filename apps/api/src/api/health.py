@@ -1,14 +1,73 @@
 from fastapi import APIRouter
-from src.core.supabase import supabase
+from fastapi.responses import PlainTextResponse
+from src.core.supabase import async_supabase as supabase
+from src.core.role_cache import role_cache
+from src.core.signed_url_cache import signed_url_cache
+from src.services.notification_service import notification_outbox
+from src.services.skill_index import skill_index
+from src.services.market_insights import market_insights
+from src.services.recruiter_stats import recruiter_stats
+from src.core.llm_gateway import llm_gateway
+from src.core.llm_metrics import llm_metrics
+from src.core.generation_cache import generation_cache
+from src.services.question_prefetch import question_prefetcher
+from src.services.assessment_state import assessment_state
+from src.services.question_bank import question_bank
+from src.services.pdf_extractor import pdf_extractor
+from src.services.pdf_renderer import pdf_renderer
+from src.services.website_fetcher import website_fetcher
+from src.services.assessment_service import evaluation_queue, question_pool
+from src.services.batch_evaluator import batch_evaluator
 
 router = APIRouter()
 
 @router.get("/db")
-def db_health():
+async def db_health():
     # Simple read to confirm connectivity
-    response = supabase.table("users").select("id").limit(1).execute()
+    response = await supabase.table("users").select("id").limit(1).execute()
     return {
         "status": "ok",
         "db": "reachable",
         "rows_checked": len(response.data or [])
     }
+
+@router.get("/cache")
+async def cache_stats():
+    # Hit/miss counters for the in-process caches
+    return {
+        "role_cache": role_cache.stats(),
+        "signed_url_cache": signed_url_cache.stats(),
+        "skill_index": skill_index.stats(),
+        "market_insights": market_insights.stats(),
+        "recruiter_stats": recruiter_stats.stats(),
+        "generation_cache": generation_cache.stats(),
+        "question_prefetch": question_prefetcher.stats(),
+        "assessment_state": assessment_state.stats(),
+        "question_bank": question_bank.stats(),
+        "question_pool": question_pool.stats(),
+        "pdf_extractor": pdf_extractor.stats(),
+        "pdf_renderer": pdf_renderer.stats(),
+        "website_fetcher": website_fetcher.stats()
+    }
+
+@router.get("/outbox")
+async def outbox_stats():
+    # Queue depth and flush counters for the notification outbox
+    return notification_outbox.stats()
+
+@router.get("/evaluations")
+async def evaluation_stats():
+    # Answer-scoring queue depth, worker activity and per-job latency, plus batch scoring counters
+    return {**evaluation_queue.stats(), "batch": batch_evaluator.stats()}
+
+@router.get("/llm")
+async def llm_stats():
+    # Per-provider breaker state, latency percentiles and hedge counters
+    return llm_gateway.stats()
+
+@router.get("/llm/metrics")
+async def llm_call_metrics(format: str = "json"):
+    # Latency histograms, tokens, fallbacks, timeouts and JSON failures per provider and call site
+    if format == "prometheus":
+        return PlainTextResponse(llm_metrics.prometheus())
+    return llm_metrics.snapshot()
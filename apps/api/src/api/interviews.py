@@ -9,7 +9,7 @@ from src.schemas.interview import (
     InterviewFeedbackRequest,
     InterviewResponse
 )
-from src.core.supabase import supabase
+from src.core.supabase import async_supabase as supabase
 
 router = APIRouter(prefix="/interviews", tags=["interviews"])
 
@@ -101,8 +101,7 @@ async def get_my_interviews(user: dict = Depends(get_current_user)):
     user_id = user["sub"]
     role = user.get("role")
     
-    from src.core.supabase import async_supabase
-    query = async_supabase.table("interviews").select("*, slots:interview_slots(*)")
+    query = supabase.table("interviews").select("*, slots:interview_slots(*)")
     
     if role == "recruiter":
         query = query.eq("recruiter_id", user_id)
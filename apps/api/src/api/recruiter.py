@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from src.core.dependencies import get_current_user
 from src.services.recruiter_service import recruiter_service
-from src.core.supabase import supabase
+from src.core.supabase import async_supabase as supabase
 from src.schemas.recruiter import (
     RecruiterProfileUpdate, 
     CompanyProfileUpdate, 
@@ -18,7 +18,7 @@ from src.schemas.recruiter import (
     RecruiterAccountSettingsUpdate
 )
 from pydantic import BaseModel
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 router = APIRouter(prefix="/recruiter", tags=["recruiter"])
 
@@ -27,6 +27,7 @@ class RegistrationUpdate(BaseModel):
 
 class BioRequest(BaseModel):
     website: str
+    regenerate: bool = False # Skip the generation cache
 
 class CompanyDetailsUpdate(BaseModel):
     company_id: str
@@ -44,7 +45,7 @@ class RecruiterAnswerSubmission(BaseModel):
 async def get_profile(user: dict = Depends(get_current_user)):
     user_id = user["sub"]
     # Check if blocked
-    blocked = supabase.table("blocked_users").select("*").eq("user_id", user_id).execute()
+    blocked = await supabase.table("blocked_users").select("*").eq("user_id", user_id).execute()
     if blocked.data:
         raise HTTPException(status_code=403, detail="Account blocked")
         
@@ -60,7 +61,7 @@ async def get_company_status(user: dict = Depends(get_current_user)):
     if not company_id:
         return {"has_score": False, "score": 0}
         
-    res = supabase.table("companies").select("profile_score").eq("id", company_id).execute()
+    res = await supabase.table("companies").select("profile_score").eq("id", company_id).execute()
     if res.data and res.data[0].get("profile_score", 0) > 0:
         return {
             "has_score": True, 
@@ -73,7 +74,7 @@ async def get_company_status(user: dict = Depends(get_current_user)):
 @router.post("/generate-bio")
 async def generate_bio(data: BioRequest, user: dict = Depends(get_current_user)):
     """Scrapes the company website and generates a bio."""
-    bio = await recruiter_service.generate_company_bio(data.website)
+    bio = await recruiter_service.generate_company_bio(data.website, regenerate=data.regenerate)
     if not bio:
         raise HTTPException(status_code=500, detail="Failed to generate bio from website")
     return {"bio": bio}
@@ -85,7 +86,7 @@ async def update_profile(data: RecruiterProfileUpdate, user: dict = Depends(get_
     
     try:
         # Update profile
-        supabase.table("recruiter_profiles").update(update_data).eq("user_id", user_id).execute()
+        await supabase.table("recruiter_profiles").update(update_data).eq("user_id", user_id).execute()
         
         # Recalculate completion score
         new_score = await recruiter_service.sync_completion_score(user_id)
@@ -105,7 +106,7 @@ async def update_company(data: CompanyProfileUpdate, user: dict = Depends(get_cu
             raise HTTPException(status_code=400, detail="No company linked to profile")
             
         update_data = data.model_dump(exclude_unset=True)
-        supabase.table("companies").update(update_data).eq("id", company_id).execute()
+        await supabase.table("companies").update(update_data).eq("id", company_id).execute()
         
         # Recalculate completion score
         new_score = await recruiter_service.sync_completion_score(user_id)
@@ -123,7 +124,7 @@ async def get_team(user: dict = Depends(get_current_user)):
         if not company_id:
             return []
             
-        res = supabase.table("recruiter_profiles").select("*, users(email)").eq("company_id", company_id).execute()
+        res = await supabase.table("recruiter_profiles").select("*, users(email)").eq("company_id", company_id).execute()
         return res.data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -146,13 +147,13 @@ async def invite_member(data: TeamInviteRequest, user: dict = Depends(get_curren
             "email": data.email
         }
         
-        supabase.table("team_invitations").insert(invite_data).execute()
+        await supabase.table("team_invitations").insert(invite_data).execute()
         
         # Notify user if they already exist
-        res = supabase.table("users").select("id").eq("email", data.email).execute()
+        res = await supabase.table("users").select("id").eq("email", data.email).execute()
         if res.data:
             from src.services.notification_service import NotificationService
-            NotificationService.create_notification(
+            await NotificationService.create_notification(
                 user_id=res.data[0]["id"],
                 type="TEAM_INVITATION",
                 title="New Team Invite",
@@ -181,7 +182,7 @@ async def remove_member(member_id: str, user: dict = Depends(get_current_user)):
         if member_prof.get("company_id") != current_prof.get("company_id"):
             raise HTTPException(status_code=403, detail="Member does not belong to your company")
             
-        supabase.table("recruiter_profiles").update({"company_id": None, "is_admin": False}).eq("user_id", member_id).execute()
+        await supabase.table("recruiter_profiles").update({"company_id": None, "is_admin": False}).eq("user_id", member_id).execute()
         
         return {"status": "removed"}
     except Exception as e:
@@ -203,7 +204,7 @@ async def update_member_role(member_id: str, data: TeamMemberUpdate, user: dict
         if member_prof.get("company_id") != current_prof.get("company_id"):
             raise HTTPException(status_code=403, detail="Member does not belong to your company")
             
-        supabase.table("recruiter_profiles").update({"is_admin": data.is_admin}).eq("user_id", member_id).execute()
+        await supabase.table("recruiter_profiles").update({"is_admin": data.is_admin}).eq("user_id", member_id).execute()
         
         return {"status": "success", "is_admin": data.is_admin}
     except Exception as e:
@@ -230,11 +231,11 @@ async def get_settings(user: dict = Depends(get_current_user)):
     }
     
     try:
-        res = supabase.table("recruiter_settings").select("*").eq("user_id", user_id).execute()
+        res = await supabase.table("recruiter_settings").select("*").eq("user_id", user_id).execute()
         if not res.data:
             # Initialize if not exists
             try:
-                res = supabase.table("recruiter_settings").insert(DEFAULT_SETTINGS).execute()
+                res = await supabase.table("recruiter_settings").insert(DEFAULT_SETTINGS).execute()
                 return res.data[0]
             except:
                 # If insert fails, just return defaults (maybe table is missing)
@@ -255,11 +256,11 @@ async def update_settings(data: RecruiterAccountSettingsUpdate, user: dict = Dep
         return await get_settings(user)
         
     try:
-        res = supabase.table("recruiter_settings").update(update_data).eq("user_id", user_id).execute()
+        res = await supabase.table("recruiter_settings").update(update_data).eq("user_id", user_id).execute()
         if not res.data:
              # Try insert (initial setting update)
              full_data = {**data.model_dump(), "user_id": user_id}
-             res = supabase.table("recruiter_settings").insert(full_data).execute()
+             res = await supabase.table("recruiter_settings").insert(full_data).execute()
              return {"status": "success", "data": res.data[0]}
         return {"status": "success", "data": res.data[0]}
     except Exception as e:
@@ -336,7 +337,7 @@ async def get_candidate_application_status(candidate_id: str, user: dict = Depen
     company_id = profile.get("company_id")
     
     # Fetch all apps for this candidate and company
-    res = supabase.table("job_applications")\
+    res = await supabase.table("job_applications")\
         .select("*, jobs!inner(*)")\
         .eq("candidate_id", candidate_id)\
         .eq("jobs.company_id", company_id)\
@@ -349,6 +350,31 @@ async def get_applications_pipeline(user: dict = Depends(get_current_user)):
     """Fetch all applications grouped by job for the pipeline view."""
     return await recruiter_service.get_applications_pipeline(user["sub"])
 
+@router.get("/applications/pipeline/page")
+async def get_applications_pipeline_page(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    job_id: Optional[str] = None,
+    status: Optional[str] = None,
+    user: dict = Depends(get_current_user)
+):
+    """Keyset-paginated pipeline. `status` accepts a comma-separated list."""
+    statuses = [s.strip() for s in status.split(",") if s.strip()] if status else None
+    try:
+        return await recruiter_service.get_applications_pipeline_page(user["sub"], limit, cursor, job_id, statuses)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/applications/{application_id}/detail")
+async def get_application_detail(application_id: str, user: dict = Depends(get_current_user)):
+    """Heavy per-application fields (full resume text) left out of pipeline pages."""
+    try:
+        return await recruiter_service.get_application_detail(user["sub"], application_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+
 @router.post("/applications/bulk-status")
 async def bulk_update_status(data: BulkApplicationStatusUpdate, user: dict = Depends(get_current_user)):
     """Bulk update application statuses."""
@@ -399,7 +425,8 @@ async def generate_job_ai(data: JobAIPrompt, user: dict = Depends(get_current_us
     return await recruiter_service.generate_job_description(
         data.prompt, 
         data.experience_band, 
-        data.location
+        data.location,
+        regenerate=data.regenerate
     )
 
 @router.post("/details")
@@ -445,14 +472,14 @@ async def skip_assessment(user: dict = Depends(get_current_user)):
     # Check if company already has a score
     has_score = False
     if company_id:
-        res = supabase.table("companies").select("profile_score").eq("id", company_id).execute()
+        res = await supabase.table("companies").select("profile_score").eq("id", company_id).execute()
         if res.data and res.data[0].get("profile_score", 0) > 0:
             has_score = True
 
     # If company has score, they are fully COMPLETED
     # If not, they are marked as COMPLETED but assessment_status is not_started 
     # (The dashboard should check assessment_status for feature locking)
-    supabase.table("recruiter_profiles").update({
+    await supabase.table("recruiter_profiles").update({
         "onboarding_step": "COMPLETED",
         "assessment_status": "completed" if has_score else "not_started"
     }).eq("user_id", user_id).execute()
@@ -464,23 +491,23 @@ async def handle_tab_switch(user: dict = Depends(get_current_user)):
     user_id = user["sub"]
     
     # 1. Increment switch count (Safe execute)
-    profile_res = supabase.table("recruiter_profiles").select("warning_count").eq("user_id", user_id).execute()
+    profile_res = await supabase.table("recruiter_profiles").select("warning_count").eq("user_id", user_id).execute()
     
     current_count = profile_res.data[0].get("warning_count", 0) if profile_res.data else 0
     new_count = current_count + 1
     
     # Update count
-    supabase.table("recruiter_profiles").update({"warning_count": new_count}).eq("user_id", user_id).execute()
+    await supabase.table("recruiter_profiles").update({"warning_count": new_count}).eq("user_id", user_id).execute()
     
     if new_count >= 2:
         # BAN USER
-        supabase.table("blocked_users").insert({
+        await supabase.table("blocked_users").insert({
             "user_id": user_id,
             "reason": "Security violation: Multiple tab switches during recruiter assessment."
         }).execute()
         
         # Update assessment status
-        supabase.table("recruiter_profiles").update({"assessment_status": "disqualified"}).eq("user_id", user_id).execute()
+        await supabase.table("recruiter_profiles").update({"assessment_status": "disqualified"}).eq("user_id", user_id).execute()
         
         return {"status": "blocked", "message": "Security violation detected. You have been permanently blocked."}
     
@@ -490,7 +517,7 @@ async def handle_tab_switch(user: dict = Depends(get_current_user)):
 async def get_talent_pool(user: dict = Depends(get_current_user)):
     user_id = user["sub"]
     # Check if blocked
-    blocked = supabase.table("blocked_users").select("*").eq("user_id", user_id).execute()
+    blocked = await supabase.table("blocked_users").select("*").eq("user_id", user_id).execute()
     if blocked.data:
         raise HTTPException(status_code=403, detail="Account blocked")
         
@@ -0,0 +1,125 @@
+import time
+import asyncio
+from collections import deque
+from typing import Deque, Optional
+
+class LimiterTimeout(Exception):
+    """No slot freed up before the caller's deadline (or the wait queue was full)."""
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit for one upstream provider.
+
+    - Additive increase: once `limit` calls in a row have come back with healthy latency
+      (under `latency_tolerance` x the fastest recent call), the limit grows by one.
+    - Multiplicative decrease: a 429 or a timeout multiplies the limit by `backoff`. Further
+      overload signals within `cooldown` seconds are ignored, since they usually come from
+      calls already in flight when the first one landed.
+    - Callers over the limit wait in a FIFO queue until a slot frees up or their deadline
+      passes. At most `max_queue` callers can wait; anyone beyond that is rejected at once.
+    """
+    def __init__(self, initial: int = 8, min_limit: int = 1, max_limit: int = 64, backoff: float = 0.5,
+                 latency_tolerance: float = 2.0, cooldown: float = 1.0, max_queue: int = 200, enabled: bool = True):
+        self.limit = initial
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+        self.max_queue = max_queue
+        self.enabled = enabled
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._healthy_streak = 0
+        self._recent: Deque[float] = deque(maxlen=100)
+        self._last_drop = 0.0
+        self.metrics = {"increases": 0, "decreases": 0, "queued": 0, "queue_timeouts": 0, "rejected": 0, "peak_limit": initial}
+
+    # --- Slots ---
+
+    @property
+    def available(self) -> bool:
+        """True if acquire() would get a slot without queueing."""
+        return not self.enabled or (self.in_flight < self.limit and not self._waiters)
+
+    async def acquire(self, timeout: Optional[float] = None) -> float:
+        """Takes a slot, waiting up to `timeout` seconds. Returns the time spent queued."""
+        if self.available:
+            self.in_flight += 1
+            return 0.0
+        if len(self._waiters) >= self.max_queue:
+            self.metrics["rejected"] += 1
+            raise LimiterTimeout("concurrency queue full")
+
+        self.metrics["queued"] += 1
+        start = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                return time.monotonic() - start # Granted just as we gave up; keep the slot
+            self._drop(waiter)
+            self.metrics["queue_timeouts"] += 1
+            raise LimiterTimeout(f"no slot within {timeout:.1f}s (limit {self.limit})")
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release() # Slot was handed to us; pass it on
+            self._drop(waiter)
+            raise
+        return time.monotonic() - start
+
+    def _drop(self, waiter: asyncio.Future):
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self):
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        # Slots are handed over directly (in_flight is counted here) so a newcomer can't jump the queue
+        while self._waiters and self.in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    # --- Feedback ---
+
+    def on_success(self, latency: float):
+        self._recent.append(latency)
+        if latency > min(self._recent) * self.latency_tolerance:
+            self._healthy_streak = 0
+            return
+        self._healthy_streak += 1
+        if self._healthy_streak >= self.limit and self.limit < self.max_limit:
+            self._healthy_streak = 0
+            self.limit += 1
+            self.metrics["increases"] += 1
+            self.metrics["peak_limit"] = max(self.metrics["peak_limit"], self.limit)
+            self._wake()
+
+    def on_overload(self):
+        now = time.monotonic()
+        self._healthy_streak = 0
+        if now - self._last_drop < self.cooldown:
+            return
+        self._last_drop = now
+        new_limit = max(self.min_limit, int(self.limit * self.backoff))
+        if new_limit < self.limit:
+            self.limit = new_limit
+            self.metrics["decreases"] += 1
+
+    def stats(self) -> dict:
+        return {
+            **self.metrics,
+            "enabled": self.enabled,
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters)
+        }
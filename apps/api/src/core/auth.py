@@ -1,5 +1,8 @@
 from fastapi import HTTPException, status
 from .supabase import async_supabase as supabase
+from .config import AUTH_VERIFY_MODE
+from .jwks import decode_supabase_jwt_locally
+from .role_cache import role_cache
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 import asyncio
 
@@ -13,6 +16,28 @@ async def _get_user_with_retry(token: str):
     # Using async client for significantly higher reliability on SSL/TLS connections
     return await supabase.auth.get_user(token)
 
+async def _verify_remote(token: str):
+    # Use retry logic ONLY for network-flaky SSL handshakes/timeouts
+    try:
+        user_res = await _get_user_with_retry(token)
+    except ValueError as ve:
+         # Don't try to retry on value errors from within the library if it gives them
+         raise ve
+    except Exception as e:
+        # Re-wrap known Supabase segment/parsing errors to avoid retry
+        err_msg = str(e).lower()
+        if "invalid" in err_msg or "segments" in err_msg or "malformed" in err_msg:
+             raise ValueError(f"Identity Auth Error: {str(e)}")
+        raise e
+    
+    if not user_res or not user_res.user:
+        print(f"DEBUG AUTH: Verification failed for token starting with {token[:10]}...")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication token",
+        )
+    return user_res.user
+
 async def verify_supabase_jwt(token: str) -> dict:
     try:
         if not token or len(token) < 80: # Real Supabase JWTs are much longer
@@ -22,39 +47,38 @@ async def verify_supabase_jwt(token: str) -> dict:
         # Debugging timeout issues
         print(f"DEBUG AUTH: Verifying token (length: {len(token)})")
         
-        # Use retry logic ONLY for network-flaky SSL handshakes/timeouts
-        try:
-            user_res = await _get_user_with_retry(token)
-        except ValueError as ve:
-             # Don't try to retry on value errors from within the library if it gives them
-             raise ve
-        except Exception as e:
-            # Re-wrap known Supabase segment/parsing errors to avoid retry
-            err_msg = str(e).lower()
-            if "invalid" in err_msg or "segments" in err_msg or "malformed" in err_msg:
-                 raise ValueError(f"Identity Auth Error: {str(e)}")
-            raise e
-        
-        if not user_res or not user_res.user:
-            print(f"DEBUG AUTH: Verification failed for token starting with {token[:10]}...")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication token",
-            )
-        
-        # payload structure similar to what we had before
-        # 'sub' is the user_id in Supabase JWTs
-        user = user_res.user
-        print(f"DEBUG AUTH: SUCCESS - {user.email} verified.")
+        user_id, email = None, None
+
+        # 1. LOCAL MODE: verify the signature in-process against cached JWKS
+        if AUTH_VERIFY_MODE == "local":
+            claims = await decode_supabase_jwt_locally(token)
+            if claims:
+                user_id, email = claims.get("sub"), claims.get("email")
+            else:
+                print("DEBUG AUTH: Signing key unknown locally, falling back to remote verification")
+
+        # 2. REMOTE MODE (or local fallback): ask Supabase Auth
+        if not user_id:
+            user = await _verify_remote(token)
+            user_id, email = user.id, user.email
+
+        print(f"DEBUG AUTH: SUCCESS - {email} verified.")
         
         # We MUST fetch the actual role from our public.users table 
-        # using the async client for safety in high-concurrency loops
-        public_user_res = await supabase.table("users").select("role").eq("id", user.id).execute()
-        actual_role = public_user_res.data[0].get("role", "candidate") if public_user_res.data else "candidate"
+        # using the async client for safety in high-concurrency loops (cached, see role_cache)
+        actual_role = role_cache.get(user_id)
+        if actual_role is None:
+            public_user_res = await supabase.table("users").select("role").eq("id", user_id).execute()
+            if public_user_res.data:
+                actual_role = public_user_res.data[0].get("role", "candidate")
+                role_cache.set(user_id, actual_role)
+            else:
+                # Don't cache the default: the row is created moments later by /auth/initialize
+                actual_role = "candidate"
         
         return {
-            "sub": user.id,
-            "email": user.email,
+            "sub": user_id,
+            "email": email,
             "role": actual_role
         }
 
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -26,6 +27,119 @@ SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY", "").strip()
 SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "").strip()
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY", "").strip()
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY", "").strip()
+GROQ_API_KEY = os.getenv("GROQ_API_KEY", "").strip()
+
+# Auth verification: "remote" asks Supabase on every request, "local" checks
+# the JWT signature in-process against cached signing keys (JWKS).
+AUTH_VERIFY_MODE = os.getenv("AUTH_VERIFY_MODE", "remote").strip().lower()
+SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET", "").strip() # Legacy HS256 projects only
+JWKS_CACHE_TTL = int(os.getenv("JWKS_CACHE_TTL", "600"))
+JWKS_MIN_REFRESH_INTERVAL = int(os.getenv("JWKS_MIN_REFRESH_INTERVAL", "30"))
+
+# In-process user -> role cache used by get_current_user
+ROLE_CACHE_TTL = int(os.getenv("ROLE_CACHE_TTL", "300"))
+ROLE_CACHE_MAXSIZE = int(os.getenv("ROLE_CACHE_MAXSIZE", "10000"))
+
+# Notification outbox (batched background inserts)
+NOTIFICATION_BATCH_SIZE = int(os.getenv("NOTIFICATION_BATCH_SIZE", "100"))
+NOTIFICATION_LINGER_MS = int(os.getenv("NOTIFICATION_LINGER_MS", "50"))
+NOTIFICATION_MAX_RETRIES = int(os.getenv("NOTIFICATION_MAX_RETRIES", "3"))
+NOTIFICATION_QUEUE_SIZE = int(os.getenv("NOTIFICATION_QUEUE_SIZE", "10000"))
+
+# Storage signed-URL cache (reused until REFRESH_MARGIN seconds before expiry)
+SIGNED_URL_EXPIRES_IN = int(os.getenv("SIGNED_URL_EXPIRES_IN", "3600"))
+SIGNED_URL_REFRESH_MARGIN = int(os.getenv("SIGNED_URL_REFRESH_MARGIN", "300"))
+SIGNED_URL_CACHE_MAXSIZE = int(os.getenv("SIGNED_URL_CACHE_MAXSIZE", "20000"))
+SIGNED_URL_BATCH_SIZE = int(os.getenv("SIGNED_URL_BATCH_SIZE", "100"))
+
+# Market insights aggregates: background full rebuild interval and max age served to a reader
+MARKET_INSIGHTS_REBUILD_INTERVAL = int(os.getenv("MARKET_INSIGHTS_REBUILD_INTERVAL", "900"))
+MARKET_INSIGHTS_MAX_STALENESS = int(os.getenv("MARKET_INSIGHTS_MAX_STALENESS", "1800"))
+
+# Per-company recruiter dashboard funnel cache
+RECRUITER_STATS_CACHE_TTL = int(os.getenv("RECRUITER_STATS_CACHE_TTL", "30"))
+RECRUITER_STATS_CACHE_MAXSIZE = int(os.getenv("RECRUITER_STATS_CACHE_MAXSIZE", "5000"))
+
+# LLM gateway (shared provider pool, circuit breakers, hedged fallbacks)
+GEMINI_API_BASE = os.getenv("GEMINI_API_BASE", "https://generativelanguage.googleapis.com").strip()
+OPENROUTER_API_BASE = os.getenv("OPENROUTER_API_BASE", "https://openrouter.ai/api/v1").strip()
+GROQ_API_BASE = os.getenv("GROQ_API_BASE", "https://api.groq.com/openai/v1").strip()
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "true").strip().lower() == "true"
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95"))
+LLM_HEDGE_DEFAULT_MS = int(os.getenv("LLM_HEDGE_DEFAULT_MS", "4000")) # Until enough latency samples exist
+LLM_HEDGE_MIN_MS = int(os.getenv("LLM_HEDGE_MIN_MS", "1500"))
+LLM_HEDGE_MAX_MS = int(os.getenv("LLM_HEDGE_MAX_MS", "8000"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET_S = int(os.getenv("LLM_BREAKER_RESET_S", "30"))
+
+# LLM gateway: per-provider adaptive (AIMD) concurrency limit; excess callers queue until their deadline
+LLM_LIMIT_ENABLED = os.getenv("LLM_LIMIT_ENABLED", "true").strip().lower() == "true"
+LLM_LIMIT_INITIAL = int(os.getenv("LLM_LIMIT_INITIAL", "8"))
+LLM_LIMIT_MIN = int(os.getenv("LLM_LIMIT_MIN", "1"))
+LLM_LIMIT_MAX = int(os.getenv("LLM_LIMIT_MAX", "64"))
+LLM_LIMIT_BACKOFF = float(os.getenv("LLM_LIMIT_BACKOFF", "0.5")) # Limit multiplier on a 429 / timeout
+LLM_LIMIT_LATENCY_TOLERANCE = float(os.getenv("LLM_LIMIT_LATENCY_TOLERANCE", "2.0")) # x fastest recent call = still healthy
+LLM_LIMIT_COOLDOWN_S = float(os.getenv("LLM_LIMIT_COOLDOWN_S", "1.0"))
+LLM_LIMIT_MAX_QUEUE = int(os.getenv("LLM_LIMIT_MAX_QUEUE", "200"))
+LLM_REQUEST_BUDGET_S = int(os.getenv("LLM_REQUEST_BUDGET_S", "60")) # Deadline for all LLM work in one HTTP request
+
+# Content-addressed AI generation cache (bio / job description / career GPS)
+GENERATION_CACHE_TTL = int(os.getenv("GENERATION_CACHE_TTL", "604800"))
+GENERATION_CACHE_LOCAL_MAXSIZE = int(os.getenv("GENERATION_CACHE_LOCAL_MAXSIZE", "1000"))
+GENERATION_CACHE_MAX_ROWS = int(os.getenv("GENERATION_CACHE_MAX_ROWS", "50000"))
+GENERATION_CACHE_PRUNE_EVERY = int(os.getenv("GENERATION_CACHE_PRUNE_EVERY", "100")) # Writes between table prunes
+
+# Assessment: speculative generation of the next question while the current one is answered
+QUESTION_PREFETCH_ENABLED = os.getenv("QUESTION_PREFETCH_ENABLED", "true").strip().lower() == "true"
+QUESTION_PREFETCH_TTL = int(os.getenv("QUESTION_PREFETCH_TTL", "1800"))
+QUESTION_PREFETCH_MAXSIZE = int(os.getenv("QUESTION_PREFETCH_MAXSIZE", "10000"))
+
+# Assessment: per-candidate resume/skill question pool generated after resume parse or skills update
+QUESTION_POOL_ENABLED = os.getenv("QUESTION_POOL_ENABLED", "true").strip().lower() == "true"
+QUESTION_POOL_MAX_SKILLS = int(os.getenv("QUESTION_POOL_MAX_SKILLS", "8")) # One case-study question per skill
+QUESTION_POOL_MAX_ACHIEVEMENTS = int(os.getenv("QUESTION_POOL_MAX_ACHIEVEMENTS", "3"))
+QUESTION_POOL_CONCURRENT_BUILDS = int(os.getenv("QUESTION_POOL_CONCURRENT_BUILDS", "4"))
+
+# Assessment: background answer evaluation (worker pool scoring submitted answers)
+EVALUATION_WORKERS = int(os.getenv("EVALUATION_WORKERS", "4"))
+EVALUATION_QUEUE_SIZE = int(os.getenv("EVALUATION_QUEUE_SIZE", "1000"))
+EVALUATION_JOB_TIMEOUT_S = int(os.getenv("EVALUATION_JOB_TIMEOUT_S", "45"))
+EVALUATION_SETTLE_TIMEOUT_S = int(os.getenv("EVALUATION_SETTLE_TIMEOUT_S", "30")) # Max wait for queued jobs before scoring inline
+EVALUATION_MAX_RETRIES = int(os.getenv("EVALUATION_MAX_RETRIES", "2"))
+
+# Assessment: answer scoring mode ("single" = one LLM call per answer, "batch" = several answers per call)
+EVALUATION_MODE = os.getenv("EVALUATION_MODE", "single").strip().lower()
+EVALUATION_BATCH_SIZE = int(os.getenv("EVALUATION_BATCH_SIZE", "6"))
+EVALUATION_BATCH_HOLD_S = int(os.getenv("EVALUATION_BATCH_HOLD_S", "300")) # Max time a candidate's answers wait for a full batch
+
+# Assessment: per-candidate session snapshots reused between /next calls
+ASSESSMENT_STATE_TTL = int(os.getenv("ASSESSMENT_STATE_TTL", "3600"))
+ASSESSMENT_STATE_MAXSIZE = int(os.getenv("ASSESSMENT_STATE_MAXSIZE", "10000"))
+
+# Assessment: in-memory seeded question bank (change check / forced full reload, seconds)
+QUESTION_BANK_CHECK_INTERVAL = int(os.getenv("QUESTION_BANK_CHECK_INTERVAL", "60"))
+QUESTION_BANK_RELOAD_INTERVAL = int(os.getenv("QUESTION_BANK_RELOAD_INTERVAL", "1800"))
+
+# Resume PDF text extraction (process pool)
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", "2"))
+PDF_EXTRACT_MAX_PENDING = int(os.getenv("PDF_EXTRACT_MAX_PENDING", "8")) # Documents handed to the pool at once
+RESUME_TEXT_MAX_CHARS = int(os.getenv("RESUME_TEXT_MAX_CHARS", "12000")) # What the parse prompt uses
+RESUME_PARSE_CACHE_TTL = int(os.getenv("RESUME_PARSE_CACHE_TTL", "2592000")) # Parses reused by PDF content hash
+
+# Resume PDF rendering (process pool, bounded wait queue, output cache keyed by template + data hash)
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", "2"))
+PDF_RENDER_MAX_PENDING = int(os.getenv("PDF_RENDER_MAX_PENDING", "4")) # Renders handed to the pool at once
+PDF_RENDER_MAX_QUEUE = int(os.getenv("PDF_RENDER_MAX_QUEUE", "32")) # Callers allowed to wait before 503
+PDF_RENDER_CACHE_MAX_BYTES = int(os.getenv("PDF_RENDER_CACHE_MAX_BYTES", "67108864"))
+PDF_TEMPLATE_CACHE_DIR = os.getenv("PDF_TEMPLATE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "talentflow-jinja"))
+
+# Company website text for bio generation (streamed, size-capped, cached per page)
+WEBSITE_FETCH_MAX_BYTES = int(os.getenv("WEBSITE_FETCH_MAX_BYTES", "524288")) # Stop reading the body after this
+WEBSITE_TEXT_MAX_CHARS = int(os.getenv("WEBSITE_TEXT_MAX_CHARS", "2000")) # What the bio prompt uses
+WEBSITE_FETCH_TIMEOUT_S = float(os.getenv("WEBSITE_FETCH_TIMEOUT_S", "10"))
+WEBSITE_CACHE_FRESH_S = int(os.getenv("WEBSITE_CACHE_FRESH_S", "3600")) # Served without revalidating
+WEBSITE_CACHE_TTL = int(os.getenv("WEBSITE_CACHE_TTL", "604800"))
+WEBSITE_CACHE_MAXSIZE = int(os.getenv("WEBSITE_CACHE_MAXSIZE", "2000"))
 
 if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY or not SUPABASE_ANON_KEY:
     raise RuntimeError("Supabase environment variables are not set")
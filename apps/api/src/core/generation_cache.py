@@ -0,0 +1,168 @@
+import re
+import time
+import asyncio
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+from cachetools import LRUCache
+from .supabase import async_supabase as supabase
+from .config import (
+    GENERATION_CACHE_TTL,
+    GENERATION_CACHE_LOCAL_MAXSIZE,
+    GENERATION_CACHE_MAX_ROWS,
+    GENERATION_CACHE_PRUNE_EVERY
+)
+
+_WHITESPACE = re.compile(r"\s+")
+
+class GenerationCache:
+    """
+    Content-addressed cache for deterministic AI generations.
+
+    Key = sha256(normalized prompt + system message + model ID), so the same inputs sent to
+    the same model route reuse the stored answer. Entries live in the `ai_generation_cache`
+    table (infra/scripts/ai_generation_cache.sql) with a small in-process LRU in front.
+    The table is pruned to `max_rows` every `prune_every` writes. Concurrent misses for the
+    same key share a single generation.
+    """
+    def __init__(self, ttl: int = 604800, local_maxsize: int = 1000, max_rows: int = 50000, prune_every: int = 100):
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.prune_every = prune_every
+        # key -> (response, expires_at)
+        self._local: LRUCache = LRUCache(maxsize=local_maxsize)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._tasks: Set[asyncio.Task] = set() # Background prunes; referenced so they aren't garbage-collected mid-run
+        self._writes = 0
+        self.metrics = {"hits": 0, "local_hits": 0, "misses": 0, "bypassed": 0, "store_errors": 0}
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return _WHITESPACE.sub(" ", text or "").strip()
+
+    def key(self, prompt: str, model_id: str, system: Optional[str] = None) -> str:
+        raw = "\x00".join([self.normalize(prompt), self.normalize(system or ""), model_id])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._local.get(key)
+        if entry and entry[1] > time.time():
+            self.metrics["local_hits"] += 1
+            return entry[0]
+
+        try:
+            res = await supabase.table("ai_generation_cache")\
+                .select("response, expires_at")\
+                .eq("key", key)\
+                .gt("expires_at", datetime.now(timezone.utc).isoformat())\
+                .execute()
+        except Exception as e:
+            self.metrics["store_errors"] += 1
+            print(f"DEBUG: Generation cache read failed: {str(e)}")
+            return None
+        if not res.data:
+            return None
+
+        row = res.data[0]
+        expires_at = datetime.fromisoformat(row["expires_at"].replace("Z", "+00:00")).timestamp()
+        self._local[key] = (row["response"], expires_at)
+        return row["response"]
+
+    async def set(self, key: str, model_id: str, response: Any, ttl: Optional[int] = None):
+        ttl = ttl or self.ttl
+        self._local[key] = (response, time.time() + ttl)
+        try:
+            await supabase.table("ai_generation_cache").upsert({
+                "key": key,
+                "model_id": model_id,
+                "response": response,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "expires_at": (datetime.now(timezone.utc) + timedelta(seconds=ttl)).isoformat()
+            }).execute()
+        except Exception as e:
+            self.metrics["store_errors"] += 1
+            print(f"DEBUG: Generation cache write failed: {str(e)}")
+            return
+
+        self._writes += 1
+        if self._writes % self.prune_every == 0:
+            task = asyncio.create_task(self._prune())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _prune(self):
+        try:
+            await supabase.rpc("prune_ai_generation_cache", {"p_max_rows": self.max_rows}).execute()
+        except Exception as e:
+            print(f"DEBUG: Generation cache prune failed: {str(e)}")
+
+    async def get_or_generate(
+        self,
+        prompt: str,
+        model_id: str,
+        producer: Callable[[], Awaitable[Any]],
+        system: Optional[str] = None,
+        ttl: Optional[int] = None,
+        bypass: bool = False,
+        should_cache: Callable[[Any], bool] = bool
+    ) -> Any:
+        """
+        Returns the cached response for (prompt, system, model_id), or runs `producer` and stores
+        its result. Results rejected by `should_cache` (by default empty ones: "" / {} / None)
+        are returned but never cached.
+        `bypass=True` skips the lookup (explicit regeneration) and overwrites the entry.
+        """
+        key = self.key(prompt, model_id, system)
+        if bypass:
+            self.metrics["bypassed"] += 1
+        else:
+            cached = await self.get(key)
+            if cached is not None:
+                self.metrics["hits"] += 1
+                return cached
+            while key in self._inflight:
+                inflight = self._inflight[key]
+                try:
+                    response = await asyncio.shield(inflight)
+                except asyncio.CancelledError:
+                    if not inflight.cancelled():
+                        raise # We were cancelled ourselves
+                    # The leader was cancelled (client gone, lost hedge, deadline): take over or follow the next leader
+                    continue
+                self.metrics["hits"] += 1
+                return response
+        self.metrics["misses"] += 1
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            response = await producer()
+            if should_cache(response):
+                await self.set(key, model_id, response, ttl)
+            future.set_result(response)
+            return response
+        except asyncio.CancelledError:
+            future.cancel() # Wakes the waiters; one of them takes over the generation
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception() # Mark retrieved so a future nobody awaited doesn't log a warning
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def stats(self) -> dict:
+        lookups = self.metrics["hits"] + self.metrics["misses"]
+        return {
+            **self.metrics,
+            "local_size": len(self._local),
+            "hit_rate": round(self.metrics["hits"] / lookups, 3) if lookups else 0.0
+        }
+
+generation_cache = GenerationCache(
+    ttl=GENERATION_CACHE_TTL,
+    local_maxsize=GENERATION_CACHE_LOCAL_MAXSIZE,
+    max_rows=GENERATION_CACHE_MAX_ROWS,
+    prune_every=GENERATION_CACHE_PRUNE_EVERY
+)
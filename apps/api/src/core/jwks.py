@@ -0,0 +1,102 @@
+import time
+import asyncio
+import httpx
+import jwt
+from typing import Dict, Optional
+from .config import SUPABASE_URL, SUPABASE_JWT_SECRET, JWKS_CACHE_TTL, JWKS_MIN_REFRESH_INTERVAL
+
+# Only algorithms Supabase actually signs with. Never accept "none".
+ALLOWED_ALGORITHMS = {"RS256", "ES256", "HS256"}
+
+class JWKSCache:
+    """
+    In-process cache of the Supabase signing keys.
+    Keys are re-fetched once the TTL expires, and on demand when a token arrives with an
+    unknown `kid` (key rotation) - but never more often than `min_refresh_interval`.
+    If a refresh fails, the previously known keys keep being served.
+    """
+    def __init__(self, jwks_url: str, ttl: int = 600, min_refresh_interval: int = 30):
+        self.jwks_url = jwks_url
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._fetched_at = 0.0
+        self._last_attempt = 0.0
+        self._lock = asyncio.Lock()
+        self._client = httpx.AsyncClient(timeout=5.0)
+
+    def _is_stale(self) -> bool:
+        return time.monotonic() - self._fetched_at >= self.ttl
+
+    async def refresh(self, force: bool = False):
+        async with self._lock:
+            now = time.monotonic()
+            # Another waiter may have refreshed while we were queued on the lock
+            if not force and not self._is_stale():
+                return
+            if now - self._last_attempt < self.min_refresh_interval:
+                return
+            self._last_attempt = now
+
+            try:
+                res = await self._client.get(self.jwks_url)
+                res.raise_for_status()
+                keys = {}
+                for jwk in res.json().get("keys", []):
+                    try:
+                        keys[jwk.get("kid")] = jwt.PyJWK(jwk)
+                    except Exception as e:
+                        print(f"DEBUG AUTH: Skipping unusable JWK {jwk.get('kid')}: {str(e)}")
+                self._keys = keys
+                self._fetched_at = now
+                print(f"DEBUG AUTH: JWKS refreshed ({len(keys)} keys)")
+            except Exception as e:
+                print(f"DEBUG AUTH: JWKS refresh failed, keeping {len(self._keys)} cached keys: {str(e)}")
+
+    async def get_key(self, kid: Optional[str]) -> Optional[jwt.PyJWK]:
+        if self._is_stale():
+            await self.refresh()
+
+        key = self._keys.get(kid)
+        if key is None:
+            # Unknown kid: the signing key may have just rotated
+            await self.refresh(force=True)
+            key = self._keys.get(kid)
+        return key
+
+jwks_cache = JWKSCache(
+    f"{SUPABASE_URL}/auth/v1/.well-known/jwks.json",
+    ttl=JWKS_CACHE_TTL,
+    min_refresh_interval=JWKS_MIN_REFRESH_INTERVAL
+)
+
+async def decode_supabase_jwt_locally(token: str) -> Optional[dict]:
+    """
+    Verifies a Supabase access token without a network call.
+    Returns the claims, or None when no signing key is known for it (caller should fall back
+    to the remote check). Raises jwt.InvalidTokenError for bad signatures, expiry, etc.
+    """
+    header = jwt.get_unverified_header(token)
+    alg = header.get("alg")
+    if alg not in ALLOWED_ALGORITHMS:
+        raise jwt.InvalidAlgorithmError(f"Unsupported token algorithm: {alg}")
+
+    if alg == "HS256":
+        if not SUPABASE_JWT_SECRET:
+            return None
+        key = SUPABASE_JWT_SECRET
+    else:
+        jwk = await jwks_cache.get_key(header.get("kid"))
+        if jwk is None:
+            return None
+        if jwk.algorithm_name != alg:
+            raise jwt.InvalidAlgorithmError("Token algorithm does not match signing key")
+        key = jwk.key
+
+    return jwt.decode(
+        token,
+        key,
+        algorithms=[alg],
+        audience="authenticated",
+        options={"require": ["exp", "sub"]}
+    )
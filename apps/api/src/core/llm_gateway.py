@@ -0,0 +1,503 @@
+import json
+import time
+import asyncio
+import contextvars
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+import httpx
+from .llm_metrics import llm_metrics
+from .adaptive_limiter import AdaptiveLimiter, LimiterTimeout
+from .config import (
+    GOOGLE_API_KEY,
+    OPENROUTER_API_KEY,
+    GROQ_API_KEY,
+    GEMINI_API_BASE,
+    OPENROUTER_API_BASE,
+    GROQ_API_BASE,
+    LLM_HEDGE_ENABLED,
+    LLM_HEDGE_PERCENTILE,
+    LLM_HEDGE_DEFAULT_MS,
+    LLM_HEDGE_MIN_MS,
+    LLM_HEDGE_MAX_MS,
+    LLM_BREAKER_FAILURES,
+    LLM_BREAKER_RESET_S,
+    LLM_LIMIT_ENABLED,
+    LLM_LIMIT_INITIAL,
+    LLM_LIMIT_MIN,
+    LLM_LIMIT_MAX,
+    LLM_LIMIT_BACKOFF,
+    LLM_LIMIT_LATENCY_TOLERANCE,
+    LLM_LIMIT_COOLDOWN_S,
+    LLM_LIMIT_MAX_QUEUE
+)
+
+# Absolute time.monotonic() deadline of the request currently being served (None = no deadline)
+_request_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("llm_request_deadline", default=None)
+
+@contextmanager
+def deadline_scope(seconds: float):
+    """Caps every LLM call made inside the block (including nested tasks) to `seconds` from now."""
+    deadline = time.monotonic() + seconds
+    current = _request_deadline.get()
+    token = _request_deadline.set(min(deadline, current) if current else deadline)
+    try:
+        yield
+    finally:
+        _request_deadline.reset(token)
+
+def parse_json_response(text: Optional[str]) -> Optional[dict]:
+    """Parses a model reply as JSON, tolerating ```json fences around it."""
+    if not text:
+        return None
+    if "```json" in text:
+        text = text.split("```json")[1].split("```")[0]
+    elif "```" in text:
+        text = text.split("```")[1].split("```")[0]
+    return json.loads(text.strip())
+
+class LLMError(Exception):
+    def __init__(self, provider: str, message: str, status: Optional[int] = None):
+        super().__init__(f"{provider}: {message}")
+        self.provider = provider
+        self.status = status
+
+class LLMUnavailable(Exception):
+    """Every provider on the route failed, was skipped by its breaker, or ran out of time."""
+    def __init__(self, errors: List[Exception]):
+        super().__init__("; ".join(str(e) for e in errors) or "no LLM provider available")
+        self.errors = errors
+
+    @property
+    def quota_exceeded(self) -> bool:
+        return any(getattr(e, "status", None) == 429 for e in self.errors)
+
+class LLMResult:
+    def __init__(self, text: str, provider: str, model: str, latency_ms: float, hedged: bool,
+                 prompt_tokens: int = 0, completion_tokens: int = 0):
+        self.text = text
+        self.provider = provider
+        self.model = model
+        self.latency_ms = latency_ms
+        self.hedged = hedged
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+
+class CircuitBreaker:
+    """
+    Classic closed -> open -> half-open breaker. After `failure_threshold` consecutive failures
+    the provider is skipped for `reset_timeout` seconds, then one probe call is let through.
+    """
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_started: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open":
+            now = time.monotonic()
+            # One probe at a time; a probe that never reported back doesn't block forever
+            if self._probe_started is None or now - self._probe_started >= self.reset_timeout:
+                self._probe_started = now
+                return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probe_started = None
+
+    def record_failure(self):
+        self.failures += 1
+        self._probe_started = None
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+class LatencyTracker:
+    """Sliding window of recent successful call latencies (seconds)."""
+    def __init__(self, window: int = 200):
+        self._samples: deque = deque(maxlen=window)
+
+    def observe(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if len(self._samples) < 20:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+class Provider(ABC):
+    name = ""
+
+    def __init__(self, api_key: str, base_url: str, default_model: str, timeout: float):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.default_model = default_model
+        self.timeout = timeout
+        self.breaker = CircuitBreaker(LLM_BREAKER_FAILURES, LLM_BREAKER_RESET_S)
+        self.latency = LatencyTracker()
+        self.limiter = AdaptiveLimiter(
+            initial=LLM_LIMIT_INITIAL,
+            min_limit=LLM_LIMIT_MIN,
+            max_limit=LLM_LIMIT_MAX,
+            backoff=LLM_LIMIT_BACKOFF,
+            latency_tolerance=LLM_LIMIT_LATENCY_TOLERANCE,
+            cooldown=LLM_LIMIT_COOLDOWN_S,
+            max_queue=LLM_LIMIT_MAX_QUEUE,
+            enabled=LLM_LIMIT_ENABLED
+        )
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key)
+
+    @abstractmethod
+    async def complete(self, client: httpx.AsyncClient, prompt: str, system: Optional[str], model: str,
+                       temperature: Optional[float], json_mode: bool, timeout: float) -> Tuple[str, Tuple[int, int]]:
+        """Returns (text, (prompt_tokens, completion_tokens)); token counts are 0 if the provider doesn't report them."""
+
+    def _check(self, res: httpx.Response):
+        if res.status_code != 200:
+            raise LLMError(self.name, f"HTTP {res.status_code}: {res.text[:200]}", res.status_code)
+
+class GeminiProvider(Provider):
+    """Google Generative Language REST API (generateContent)."""
+    name = "gemini"
+
+    async def complete(self, client, prompt, system, model, temperature, json_mode, timeout):
+        body = {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+        if system:
+            body["systemInstruction"] = {"parts": [{"text": system}]}
+        config = {}
+        if temperature is not None:
+            config["temperature"] = temperature
+        if json_mode:
+            config["responseMimeType"] = "application/json"
+        if config:
+            body["generationConfig"] = config
+
+        res = await client.post(
+            f"{self.base_url}/v1beta/models/{model}:generateContent",
+            params={"key": self.api_key},
+            json=body,
+            timeout=timeout
+        )
+        self._check(res)
+        payload = res.json()
+        candidates = payload.get("candidates") or []
+        parts = (candidates[0].get("content") or {}).get("parts", []) if candidates else []
+        text = "".join(p.get("text", "") for p in parts).strip()
+        if not text:
+            raise LLMError(self.name, "empty response")
+        usage = payload.get("usageMetadata") or {}
+        return text, (usage.get("promptTokenCount") or 0, usage.get("candidatesTokenCount") or 0)
+
+class OpenAIChatProvider(Provider):
+    """OpenAI-compatible /chat/completions (OpenRouter, Groq)."""
+    def __init__(self, name: str, api_key: str, base_url: str, default_model: str, timeout: float, extra_headers: Dict[str, str] = None):
+        super().__init__(api_key, base_url, default_model, timeout)
+        self.name = name
+        self.extra_headers = extra_headers or {}
+
+    async def complete(self, client, prompt, system, model, temperature, json_mode, timeout):
+        messages = [{"role": "system", "content": system}] if system else []
+        messages.append({"role": "user", "content": prompt})
+        body = {"model": model, "messages": messages}
+        if temperature is not None:
+            body["temperature"] = temperature
+        if json_mode:
+            body["response_format"] = {"type": "json_object"}
+
+        res = await client.post(
+            f"{self.base_url}/chat/completions",
+            headers={"Authorization": f"Bearer {self.api_key}", **self.extra_headers},
+            json=body,
+            timeout=timeout
+        )
+        self._check(res)
+        payload = res.json()
+        text = (payload["choices"][0]["message"].get("content") or "").strip()
+        if not text:
+            raise LLMError(self.name, "empty response")
+        usage = payload.get("usage") or {}
+        return text, (usage.get("prompt_tokens") or 0, usage.get("completion_tokens") or 0)
+
+class LLMGateway:
+    """
+    One entry point for every LLM call in the API.
+
+    - A single pooled keep-alive HTTP/2 client is shared by all providers.
+    - Each provider has a circuit breaker; providers known to be failing are skipped.
+    - Hedging: if the current provider hasn't answered within its recent latency percentile,
+      the next provider on the route is started in parallel and the first good answer wins.
+      A provider that errors out hands over immediately instead of waiting.
+    - Every attempt is capped by the caller's deadline (see deadline_scope).
+    - Each provider has an adaptive concurrency limit; attempts over it queue for a slot
+      within their budget (and hedging moves on to the next provider meanwhile).
+    """
+    def __init__(self, providers: Sequence[Provider], hedge_enabled: bool = True, hedge_percentile: float = 0.95,
+                 hedge_default_ms: int = 4000, hedge_min_ms: int = 1500, hedge_max_ms: int = 8000):
+        self.providers: Dict[str, Provider] = {p.name: p for p in providers}
+        self.hedge_enabled = hedge_enabled
+        self.hedge_percentile = hedge_percentile
+        self.hedge_default = hedge_default_ms / 1000
+        self.hedge_min = hedge_min_ms / 1000
+        self.hedge_max = hedge_max_ms / 1000
+        self._client: Optional[httpx.AsyncClient] = None
+        self.metrics = {name: {"calls": 0, "failures": 0, "wins": 0, "hedges_started": 0, "spilled": 0, "skipped_open": 0} for name in self.providers}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60.0)
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _hedge_delay(self, provider: Provider) -> float:
+        observed = provider.latency.percentile(self.hedge_percentile)
+        if observed is None:
+            return self.hedge_default
+        return min(max(observed, self.hedge_min), self.hedge_max)
+
+    async def _attempt(self, provider: Provider, site: str, prompt: str, system: Optional[str], model: str,
+                       temperature: Optional[float], json_mode: bool, timeout: float, state: dict) -> Tuple[str, Tuple[int, int]]:
+        # Wait for a concurrency slot; queueing eats into this attempt's budget
+        state["queued"] = not provider.limiter.available
+        try:
+            waited = await provider.limiter.acquire(timeout)
+        except LimiterTimeout as e:
+            # Our own back-pressure, not a provider failure: the breaker isn't told
+            llm_metrics.record_attempt(provider.name, site, "throttled")
+            raise LLMError(provider.name, str(e))
+        budget = timeout - waited
+        if budget <= 0.05:
+            provider.limiter.release()
+            llm_metrics.record_attempt(provider.name, site, "throttled")
+            raise LLMError(provider.name, "no time left after queueing for a slot")
+
+        state["sent"] = True
+        self.metrics[provider.name]["calls"] += 1
+        start = time.monotonic()
+        try:
+            text, usage = await asyncio.wait_for(
+                provider.complete(self.client, prompt, system, model, temperature, json_mode, budget),
+                timeout=budget
+            )
+        except asyncio.CancelledError:
+            # Lost a hedge race; says nothing about the provider's health
+            llm_metrics.record_attempt(provider.name, site, "cancelled")
+            raise
+        except Exception as e:
+            provider.breaker.record_failure()
+            self.metrics[provider.name]["failures"] += 1
+            if isinstance(e, asyncio.TimeoutError):
+                outcome = "timeout"
+                e = LLMError(provider.name, f"timed out after {budget:.1f}s")
+            else:
+                outcome = "rate_limited" if getattr(e, "status", None) == 429 else "error"
+                if not isinstance(e, LLMError):
+                    e = LLMError(provider.name, str(e) or type(e).__name__)
+            if outcome != "error":
+                provider.limiter.on_overload()
+            llm_metrics.record_attempt(provider.name, site, outcome, (time.monotonic() - start) * 1000)
+            raise e
+        finally:
+            provider.limiter.release()
+        elapsed = time.monotonic() - start
+        provider.breaker.record_success()
+        provider.latency.observe(elapsed)
+        provider.limiter.on_success(elapsed)
+        llm_metrics.record_attempt(provider.name, site, "ok", elapsed * 1000, *usage)
+        return text, usage
+
+    async def generate(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        route: Sequence[str] = ("gemini", "openrouter"),
+        models: Optional[Dict[str, str]] = None,
+        temperature: Optional[float] = None,
+        json_mode: bool = False,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        retry_primary: bool = True,
+        site: str = "unknown"
+    ) -> LLMResult:
+        """
+        Runs `prompt` along `route` (provider names, in preference order).
+        `site` labels the call in llm_metrics (e.g. "assessment.evaluate").
+        `timeout` overrides the per-provider attempt timeout; `deadline` is an absolute
+        time.monotonic() bound and defaults to the request's deadline_scope.
+        Raises LLMUnavailable if nothing answered.
+        """
+        models = models or {}
+        deadline = deadline or _request_deadline.get()
+        errors: List[Exception] = []
+
+        queue = []
+        for name in route:
+            provider = self.providers.get(name)
+            if not provider or not provider.configured:
+                continue
+            if not provider.breaker.allow():
+                self.metrics[name]["skipped_open"] += 1
+                errors.append(LLMError(name, "circuit open"))
+                continue
+            queue.append(provider)
+
+        # One more go at the primary after everything else failed (transient errors)
+        if retry_primary and len(queue) > 1:
+            queue.append(queue[0])
+
+        running: Dict[asyncio.Task, Provider] = {}
+        # {"queued": bool, "sent": bool}: queued = its limiter had no free slot; sent = a slot was granted
+        states: Dict[asyncio.Task, dict] = {}
+        started = 0
+        start = time.monotonic()
+
+        def remaining() -> Optional[float]:
+            return None if deadline is None else deadline - time.monotonic()
+
+        def launch() -> bool:
+            nonlocal started
+            while started < len(queue):
+                provider = queue[started]
+                started += 1
+                if provider in running.values():
+                    continue
+                budget = timeout or provider.timeout
+                left = remaining()
+                if left is not None:
+                    if left <= 0.05:
+                        errors.append(LLMError(provider.name, "request deadline exceeded"))
+                        return False
+                    budget = min(budget, left)
+                model = models.get(provider.name, provider.default_model)
+                state = {"sent": False}
+                task = asyncio.create_task(self._attempt(provider, site, prompt, system, model, temperature, json_mode, budget, state))
+                running[task] = provider
+                states[task] = state
+                return True
+            return False
+
+        try:
+            launch()
+            while running:
+                # Wait for an answer, or until it's time to hedge onto the next provider
+                wait_for = None
+                spill = False
+                if self.hedge_enabled and started < len(queue):
+                    newest = list(running)[-1]
+                    if "queued" not in states[newest]:
+                        await asyncio.sleep(0) # Let a just-launched attempt reach its limiter
+                    # Stuck in a full limiter queue while the next provider has a free slot: move now
+                    spill = states[newest].get("queued", False) and not states[newest]["sent"] and queue[started].limiter.available
+                    wait_for = 0 if spill else self._hedge_delay(running[newest])
+                done, _ = await asyncio.wait(running.keys(), timeout=wait_for, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    if launch():
+                        newest = list(running)[-1]
+                        self.metrics[running[newest].name]["spilled" if spill else "hedges_started"] += 1
+                        # Attempts still queued for a slot never reached their provider; move them, don't duplicate
+                        for task in [t for t in running if t is not newest and states[t].get("queued") and not states[t]["sent"]]:
+                            task.cancel()
+                            running.pop(task)
+                    continue
+
+                for task in done:
+                    provider = running.pop(task)
+                    try:
+                        text, (prompt_tokens, completion_tokens) = task.result()
+                    except Exception as e:
+                        errors.append(e)
+                        print(f"DEBUG: LLM {provider.name} failed: {str(e)}")
+                        continue
+                    self.metrics[provider.name]["wins"] += 1
+                    latency_ms = round((time.monotonic() - start) * 1000, 1)
+                    llm_metrics.record_call(site, provider.name, latency_ms, fallback=provider.name != route[0], hedged=started > 1)
+                    return LLMResult(
+                        text=text,
+                        provider=provider.name,
+                        model=models.get(provider.name, provider.default_model),
+                        latency_ms=latency_ms,
+                        hedged=started > 1,
+                        prompt_tokens=prompt_tokens,
+                        completion_tokens=completion_tokens
+                    )
+
+                # Everything in flight failed: move straight to the next provider
+                if not running:
+                    launch()
+        finally:
+            for task in running:
+                task.cancel()
+
+        llm_metrics.record_call(site, None, (time.monotonic() - start) * 1000)
+        raise LLMUnavailable(errors)
+
+    def route_id(self, route: Sequence[str] = ("gemini", "openrouter"), models: Optional[Dict[str, str]] = None) -> str:
+        """Stable ID of the models a route can answer with, e.g. for cache keys."""
+        models = models or {}
+        return ">".join(f"{name}:{models.get(name, self.providers[name].default_model)}" for name in route if name in self.providers)
+
+    async def complete(self, prompt: str, system: Optional[str] = None, **kwargs) -> Optional[str]:
+        """Text of the first successful answer, or None if every provider failed."""
+        try:
+            return (await self.generate(prompt, system, **kwargs)).text
+        except LLMUnavailable as e:
+            print(f"DEBUG: All LLM providers failed: {str(e)}")
+            return None
+
+    def stats(self) -> dict:
+        out = {}
+        for name, provider in self.providers.items():
+            p50 = provider.latency.percentile(0.5)
+            p95 = provider.latency.percentile(0.95)
+            out[name] = {
+                **self.metrics[name],
+                "configured": provider.configured,
+                "breaker": provider.breaker.state,
+                "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+                "hedge_after_ms": round(self._hedge_delay(provider) * 1000, 1),
+                "limiter": provider.limiter.stats()
+            }
+        return out
+
+llm_gateway = LLMGateway(
+    providers=[
+        GeminiProvider(GOOGLE_API_KEY, GEMINI_API_BASE, "gemini-3-flash-preview", timeout=15.0),
+        OpenAIChatProvider("openrouter", OPENROUTER_API_KEY, OPENROUTER_API_BASE, "openai/gpt-4o-mini", timeout=30.0,
+                           extra_headers={"HTTP-Referer": "https://talentflow.ai", "X-Title": "TalentFlow"}),
+        OpenAIChatProvider("groq", GROQ_API_KEY, GROQ_API_BASE, "llama-3.3-70b-versatile", timeout=30.0)
+    ],
+    hedge_enabled=LLM_HEDGE_ENABLED,
+    hedge_percentile=LLM_HEDGE_PERCENTILE,
+    hedge_default_ms=LLM_HEDGE_DEFAULT_MS,
+    hedge_min_ms=LLM_HEDGE_MIN_MS,
+    hedge_max_ms=LLM_HEDGE_MAX_MS
+)
@@ -0,0 +1,171 @@
+import bisect
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (250, 500, 1000, 2000, 4000, 8000, 15000, 30000, 60000)
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (ms). Percentiles are estimated from the bucket bounds."""
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float):
+        self.counts[bisect.bisect_left(self.buckets, ms)] += 1
+        self.count += 1
+        self.sum_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Upper bound of the bucket holding the p-th sample (max_ms for the open bucket)."""
+        if not self.count:
+            return None
+        rank = p * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return float(self.buckets[i]) if i < len(self.buckets) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> dict:
+        bounds = [str(b) for b in self.buckets] + ["+Inf"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.sum_ms / self.count, 1) if self.count else None,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 1),
+            "buckets": dict(zip(bounds, self.counts))
+        }
+
+class LLMMetrics:
+    """
+    Counters and latency histograms for every LLM call, fed by the gateway.
+
+    - Per (provider, call site): attempts by outcome, attempt latency and token usage.
+    - Per call site: end-to-end latency, which provider served it, fallbacks (answered by
+      something other than the route's first provider), outright failures and JSON parse
+      failures reported by the caller.
+
+    A call site is a short dotted label passed by the caller, e.g. "assessment.evaluate".
+    """
+    OUTCOMES = ("ok", "timeout", "rate_limited", "error", "cancelled", "throttled") # throttled = no concurrency slot in time
+
+    def __init__(self):
+        self._providers: Dict[Tuple[str, str], dict] = {}
+        self._sites: Dict[str, dict] = {}
+
+    def _provider(self, provider: str, site: str) -> dict:
+        key = (provider, site)
+        if key not in self._providers:
+            self._providers[key] = {
+                **{outcome: 0 for outcome in self.OUTCOMES},
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "latency": LatencyHistogram()
+            }
+        return self._providers[key]
+
+    def _site(self, site: str) -> dict:
+        if site not in self._sites:
+            self._sites[site] = {
+                "calls": 0,
+                "served_by": {},
+                "fallbacks": 0,
+                "hedged": 0,
+                "unavailable": 0,
+                "json_parse_failures": 0,
+                "latency": LatencyHistogram()
+            }
+        return self._sites[site]
+
+    def record_attempt(self, provider: str, site: str, outcome: str, latency_ms: Optional[float] = None,
+                       prompt_tokens: int = 0, completion_tokens: int = 0):
+        m = self._provider(provider, site)
+        m[outcome] += 1
+        m["prompt_tokens"] += prompt_tokens
+        m["completion_tokens"] += completion_tokens
+        if latency_ms is not None and outcome != "cancelled":
+            m["latency"].observe(latency_ms)
+
+    def record_call(self, site: str, provider: Optional[str], latency_ms: float, fallback: bool = False, hedged: bool = False):
+        m = self._site(site)
+        m["calls"] += 1
+        m["latency"].observe(latency_ms)
+        if provider is None:
+            m["unavailable"] += 1
+            return
+        m["served_by"][provider] = m["served_by"].get(provider, 0) + 1
+        m["fallbacks"] += int(fallback)
+        m["hedged"] += int(hedged)
+
+    def record_json_failure(self, site: str, provider: Optional[str] = None):
+        self._site(site)["json_parse_failures"] += 1
+        print(f"DEBUG: LLM JSON parse failure at {site} ({provider or 'unknown provider'})")
+
+    def snapshot(self) -> dict:
+        providers: Dict[str, dict] = {}
+        for (provider, site), m in sorted(self._providers.items()):
+            providers.setdefault(provider, {})[site] = {**{k: v for k, v in m.items() if k != "latency"}, "latency": m["latency"].snapshot()}
+        sites = {}
+        for site, m in sorted(self._sites.items()):
+            calls = m["calls"]
+            sites[site] = {
+                **{k: v for k, v in m.items() if k != "latency"},
+                "fallback_rate": round(m["fallbacks"] / calls, 3) if calls else 0.0,
+                "latency": m["latency"].snapshot()
+            }
+        return {"providers": providers, "sites": sites}
+
+    def prometheus(self) -> str:
+        """Same data in Prometheus text exposition format, one metric family at a time."""
+        providers = sorted(self._providers.items())
+        sites = sorted(self._sites.items())
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        family("llm_attempts_total", "counter", "Provider attempts by outcome.")
+        for (provider, site), m in providers:
+            for outcome in self.OUTCOMES:
+                lines.append(f'llm_attempts_total{{provider="{provider}",site="{site}",outcome="{outcome}"}} {m[outcome]}')
+
+        family("llm_tokens_total", "counter", "Prompt and completion tokens reported by providers.")
+        for (provider, site), m in providers:
+            lines.append(f'llm_tokens_total{{provider="{provider}",site="{site}",kind="prompt"}} {m["prompt_tokens"]}')
+            lines.append(f'llm_tokens_total{{provider="{provider}",site="{site}",kind="completion"}} {m["completion_tokens"]}')
+
+        family("llm_attempt_latency_ms", "histogram", "Latency of individual provider attempts in milliseconds.")
+        for (provider, site), m in providers:
+            labels = f'provider="{provider}",site="{site}"'
+            hist = m["latency"]
+            cumulative = 0
+            for bound, n in zip([str(b) for b in hist.buckets] + ["+Inf"], hist.counts):
+                cumulative += n
+                lines.append(f'llm_attempt_latency_ms_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"llm_attempt_latency_ms_sum{{{labels}}} {round(hist.sum_ms, 1)}")
+            lines.append(f"llm_attempt_latency_ms_count{{{labels}}} {hist.count}")
+
+        family("llm_calls_total", "counter", "Gateway calls by the provider that served them (none = unavailable).")
+        for site, m in sites:
+            for provider, n in sorted(m["served_by"].items()):
+                lines.append(f'llm_calls_total{{site="{site}",served_by="{provider}"}} {n}')
+            lines.append(f'llm_calls_total{{site="{site}",served_by="none"}} {m["unavailable"]}')
+
+        family("llm_fallbacks_total", "counter", "Calls answered by a provider other than the route's first.")
+        for site, m in sites:
+            lines.append(f'llm_fallbacks_total{{site="{site}"}} {m["fallbacks"]}')
+
+        family("llm_json_parse_failures_total", "counter", "LLM responses the caller could not parse as JSON.")
+        for site, m in sites:
+            lines.append(f'llm_json_parse_failures_total{{site="{site}"}} {m["json_parse_failures"]}')
+        return "\n".join(lines) + "\n"
+
+llm_metrics = LLMMetrics()
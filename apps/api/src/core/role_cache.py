@@ -0,0 +1,55 @@
+import threading
+from typing import Optional
+from cachetools import TTLCache
+from .config import ROLE_CACHE_TTL, ROLE_CACHE_MAXSIZE
+
+class RoleCache:
+    """
+    Bounded user_id -> role cache for get_current_user.
+    Entries expire after `ttl` seconds; when full, the least recently used entry is evicted.
+    Anything that writes public.users.role must call invalidate() for that user.
+    """
+    def __init__(self, maxsize: int = 10000, ttl: int = 300):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        # Sync routes run in the threadpool, so guard the (non thread-safe) cache
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, user_id: str) -> Optional[str]:
+        with self._lock:
+            role = self._cache.get(user_id)
+            if role is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return role
+
+    def set(self, user_id: str, role: str):
+        with self._lock:
+            self._cache[user_id] = role
+
+    def invalidate(self, user_id: str):
+        with self._lock:
+            self._cache.pop(user_id, None)
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._cache),
+                "maxsize": self._cache.maxsize,
+                "ttl": self._cache.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+role_cache = RoleCache(maxsize=ROLE_CACHE_MAXSIZE, ttl=ROLE_CACHE_TTL)
@@ -0,0 +1,128 @@
+import time
+import asyncio
+from typing import Dict, List, Optional, Tuple
+from cachetools import LRUCache
+from .supabase import async_supabase as supabase
+from .config import (
+    SIGNED_URL_EXPIRES_IN,
+    SIGNED_URL_REFRESH_MARGIN,
+    SIGNED_URL_CACHE_MAXSIZE,
+    SIGNED_URL_BATCH_SIZE
+)
+
+class SignedURLCache:
+    """
+    Shared cache of storage signed URLs keyed by (bucket, path).
+    A URL is reused until `margin` seconds before it expires, so callers never hand out a link
+    that is about to die. Misses are signed in bulk (`batch_size` paths per create_signed_urls call)
+    and concurrent requests for the same object wait on a single in-flight signing call.
+    """
+    def __init__(self, expires_in: int = 3600, margin: int = 300, maxsize: int = 20000, batch_size: int = 100):
+        self.expires_in = expires_in
+        self.margin = margin
+        self.batch_size = batch_size
+        # (bucket, path) -> (signed_url, expires_at)
+        self._cache: LRUCache = LRUCache(maxsize=maxsize)
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.sign_calls = 0
+        self.errors = 0
+
+    def _lookup(self, key: Tuple[str, str]) -> Optional[str]:
+        entry = self._cache.get(key)
+        if entry and entry[1] - self.margin > time.time():
+            return entry[0]
+        return None
+
+    async def get(self, bucket: str, path: str) -> Optional[str]:
+        """Signed URL for one object, or None if signing failed."""
+        urls = await self.get_many(bucket, [path])
+        return urls.get(path)
+
+    async def get_many(self, bucket: str, paths: List[str]) -> Dict[str, str]:
+        """
+        Returns {path: signed_url} for every path that could be signed.
+        Paths that fail to sign are simply missing from the result.
+        """
+        result = {}
+        waiting = {}
+        to_sign = []
+
+        for path in dict.fromkeys(p for p in paths if p):
+            key = (bucket, path)
+            url = self._lookup(key)
+            if url:
+                self.hits += 1
+                result[path] = url
+            elif key in self._inflight:
+                self.hits += 1 # Someone else is already signing it
+                waiting[path] = self._inflight[key]
+            else:
+                self.misses += 1
+                to_sign.append(path)
+
+        if to_sign:
+            loop = asyncio.get_running_loop()
+            futures = {p: loop.create_future() for p in to_sign}
+            for p, fut in futures.items():
+                self._inflight[(bucket, p)] = fut
+            waiting.update(futures)
+            try:
+                batches = [to_sign[i:i + self.batch_size] for i in range(0, len(to_sign), self.batch_size)]
+                await asyncio.gather(*(self._sign_batch(bucket, batch, futures) for batch in batches))
+            finally:
+                for p, fut in futures.items():
+                    self._inflight.pop((bucket, p), None)
+                    if not fut.done():
+                        fut.set_result(None)
+
+        for path, fut in waiting.items():
+            url = await asyncio.shield(fut)
+            if url:
+                result[path] = url
+        return result
+
+    async def _sign_batch(self, bucket: str, paths: List[str], futures: Dict[str, asyncio.Future]):
+        self.sign_calls += 1
+        expires_at = time.time() + self.expires_in
+        try:
+            res = await supabase.storage.from_(bucket).create_signed_urls(paths, self.expires_in)
+        except Exception as e:
+            self.errors += 1
+            print(f"Error generating signed URLs for {bucket}: {str(e)}")
+            return
+
+        for item in (res or []):
+            path, url = item.get("path"), item.get("signedURL")
+            if not path or not url or path not in futures:
+                continue
+            self._cache[(bucket, path)] = (url, expires_at)
+            if not futures[path].done():
+                futures[path].set_result(url)
+
+    def invalidate(self, bucket: str, path: str):
+        """Drop a cached URL (call after the object is overwritten or removed)."""
+        self._cache.pop((bucket, path), None)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._cache),
+            "maxsize": self._cache.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "sign_calls": self.sign_calls,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+signed_url_cache = SignedURLCache(
+    expires_in=SIGNED_URL_EXPIRES_IN,
+    margin=SIGNED_URL_REFRESH_MARGIN,
+    maxsize=SIGNED_URL_CACHE_MAXSIZE,
+    batch_size=SIGNED_URL_BATCH_SIZE
+)
@@ -1,7 +1,7 @@
 from supabase import create_client, create_async_client, ClientOptions, AsyncClient
 from .config import SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY
 
-# Sync Client
+# Sync Client (standalone scripts only - blocks the event loop, so request paths use async_supabase)
 supabase = create_client(
     SUPABASE_URL,
     SUPABASE_SERVICE_ROLE_KEY,
@@ -11,9 +11,39 @@ from src.api.notifications import router as notifications_router
 from src.api.chat import router as chat_router
 from src.api.interviews import router as interviews_router
 from src.api.career_gps import router as career_gps_router
+from src.services.notification_service import notification_outbox
+from src.services.market_insights import market_insights
+from src.services.assessment_service import evaluation_queue, question_pool
+from src.services.question_bank import question_bank
+from src.services.pdf_extractor import pdf_extractor
+from src.services.pdf_renderer import pdf_renderer
+from src.services.website_fetcher import website_fetcher
+from src.core.llm_gateway import llm_gateway, deadline_scope
+from src.core.config import LLM_REQUEST_BUDGET_S
+from contextlib import asynccontextmanager
 import time
 
-app = FastAPI(title="TalentFlow API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background workers live for the lifetime of the worker process
+    notification_outbox.start()
+    market_insights.start()
+    evaluation_queue.start()
+    question_bank.start()
+    pdf_renderer.start()
+    yield
+    # Flush anything still queued before the process exits
+    await market_insights.stop()
+    await evaluation_queue.stop()
+    await question_pool.stop()
+    await question_bank.stop()
+    await notification_outbox.stop()
+    await llm_gateway.close()
+    await website_fetcher.close()
+    pdf_extractor.shutdown()
+    pdf_renderer.shutdown()
+
+app = FastAPI(title="TalentFlow API", lifespan=lifespan)
 print(">>> V3 BACKEND ACTIVE - LOCK 403 BYPASS ENABLED <<<")
 
 # Logging middleware for debugging connection issues
@@ -21,7 +51,9 @@ print(">>> V3 BACKEND ACTIVE - LOCK 403 BYPASS ENABLED <<<")
 async def log_requests(request: Request, call_next):
     start_time = time.time()
     try:
-        response = await call_next(request)
+        # Every LLM call made while serving this request shares one deadline
+        with deadline_scope(LLM_REQUEST_BUDGET_S):
+            response = await call_next(request)
         duration = time.time() - start_time
         print(f"DEBUG: {request.method} {request.url.path} - Status: {response.status_code} - Time: {duration:.2f}s")
         return response
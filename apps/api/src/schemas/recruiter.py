@@ -106,6 +106,7 @@ class JobAIPrompt(BaseModel):
     prompt: str
     experience_band: str
     location: Optional[str] = None
+    regenerate: bool = False # Skip the generation cache
 
 class ApplicationStatusUpdate(BaseModel):
     application_id: str
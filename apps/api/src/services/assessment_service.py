@@ -1,68 +1,74 @@
 import json
+import math
 import random
 import asyncio
-import httpx
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 from src.core.supabase import async_supabase as supabase # Switch to Async
 from src.services.notification_service import NotificationService
-import google.generativeai as genai
-from src.core.config import GOOGLE_API_KEY, OPENROUTER_API_KEY
+from src.services.market_insights import market_insights
+from src.core.llm_gateway import llm_gateway
+from src.core.llm_metrics import llm_metrics
+from src.services.question_prefetch import question_prefetcher
+from src.services.assessment_state import assessment_state, AssessmentSessionState
+from src.services.question_bank import question_bank
+from src.services.question_pool import QuestionPool
+from src.services.evaluation_queue import EvaluationQueue
+from src.services.batch_evaluator import batch_evaluator
+from src.core.config import (
+    EVALUATION_WORKERS,
+    EVALUATION_QUEUE_SIZE,
+    EVALUATION_JOB_TIMEOUT_S,
+    EVALUATION_SETTLE_TIMEOUT_S,
+    EVALUATION_MAX_RETRIES,
+    EVALUATION_MODE,
+    EVALUATION_BATCH_SIZE,
+    EVALUATION_BATCH_HOLD_S,
+    QUESTION_POOL_ENABLED,
+    QUESTION_POOL_MAX_SKILLS,
+    QUESTION_POOL_MAX_ACHIEVEMENTS,
+    QUESTION_POOL_CONCURRENT_BUILDS
+)
+
+# Question generation prompts, shared by the background question pool and the lazy fallback
+RESUME_PROMPTS = {
+    "role_clarity": "Candidate History: {data}. Generate ONE professional question about role consistency or reasons for specific transitions. Under 30 words.",
+    "career_gap": "Career Gaps: {data}. Generate ONE question about productivity and growth during these periods. Under 30 words.",
+    "achievement": "Achievements: {data}. Generate ONE question to validate the SPECIFIC logic or ownership of one major milestone. Under 30 words."
+}
+RESUME_DIFFICULTY = {"role_clarity": "medium", "career_gap": "medium", "achievement": "high"}
+SKILL_PROMPT = "Expertise Level: {band}. Candidate Skill: {skill}. Generate a high-pressure Case Study question to test technical logic and sales execution for this skill. End with 'How would you proceed?'. Under 50 words."
+
+# Shared rubric for batch scoring: sent once per request instead of once per answer
+BATCH_AUDIT_INSTRUCTIONS = """
+Role: Lead Psychometric Auditor.
+Goal: Scientific, unbiased high-precision evaluation of each candidate answer below.
+Each item gives its category, the question context, its target rubric and the candidate's answer.
+When an item has no rubric, use the STAR framework.
+
+SCORING (0-6):
+6: Exemplary STAR coverage. Metrics. Outcome focus.
+4: Proficient logical workflow. Demonstrated skill.
+2: Marginal. Vague/theoretical. No evidence.
+0: Non-responsive.
+
+GUARDRAILS: linguistic neutrality. Structure over syntax.
+"""
+BATCH_AUDIT_FIELDS = '"score": int, "explanation": "string", "detected_framework": "string"'
 
 class AssessmentService:
-    def __init__(self):
-        genai.configure(api_key=GOOGLE_API_KEY)
-        # Upgraded to Gemini 3 Flash (Preview) for Elite Performance & Reliability
-        self.model = genai.GenerativeModel('gemini-3-flash-preview')
-        self._client = httpx.AsyncClient(timeout=30.0)
-
-    async def _call_ai_robust(self, prompt: str, system_message: str = "You are a professional assessment auditor.") -> Optional[str]:
+    async def _call_ai_robust(self, prompt: str, system_message: str = "You are a professional assessment auditor.", site: str = "assessment") -> Optional[str]:
         """
-        High-precision AI caller with Gemini primary and OpenRouter (GPT-4o) fallback.
-        Ensures AI generation never fails at any cost as per elite requirements.
+        High-precision AI caller: Gemini primary, OpenRouter (GPT-4o-mini) hedged fallback,
+        via the shared LLM gateway. Returns None only if every provider failed.
         """
-        # 1. PRIMARY: Gemini 3 Flash
-        try:
-            # Use generation_config for more deterministic assessment outputs if needed
-            response = await asyncio.wait_for(self.model.generate_content_async(prompt), timeout=15.0)
-            if response and response.text:
-                return response.text.strip()
-        except Exception as e:
-            print(f"DEBUG: Gemini Primary Failed: {str(e)}. Falling back to OpenRouter...")
-
-        # 2. SECONDARY: OpenRouter (GPT-4o-mini)
-        if OPENROUTER_API_KEY:
-            try:
-                response = await self._client.post(
-                    "https://openrouter.ai/api/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                        "Content-Type": "application/json",
-                        "X-Title": "TalentFlow Business Assessment"
-                    },
-                    json={
-                        "model": "openai/gpt-4o-mini",
-                        "messages": [
-                            {"role": "system", "content": system_message},
-                            {"role": "user", "content": prompt}
-                        ],
-                        "temperature": 0.3 # Lower temperature for assessment consistency
-                    }
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    return data['choices'][0]['message']['content'].strip()
-                else:
-                    print(f"DEBUG: OpenRouter Secondary Failed ({response.status_code}): {response.text}")
-            except Exception as or_e:
-                print(f"DEBUG: OpenRouter Critical Failure: {str(or_e)}")
-
-        # 3. TERTIARY: Extreme Fallback (Retry Gemini one last time if it was a transient error)
-        try:
-             response = await asyncio.wait_for(self.model.generate_content_async(prompt), timeout=10.0)
-             return response.text.strip()
-        except:
-             return None
+        return await llm_gateway.complete(
+            prompt,
+            system_message,
+            route=("gemini", "openrouter"),
+            temperature=0.3, # Lower temperature for assessment consistency
+            site=site
+        )
 
     async def get_or_create_session(self, user_id: str):
         # 1. Fetch profile to get experience band
@@ -86,7 +92,10 @@ class AssessmentService:
                 return session_res.data[0]
         except Exception as e:
             print(f"DEBUG: Session fetch error: {str(e)}")
-            
+
+        return await self._create_session(user_id, band)
+
+    async def _create_session(self, user_id: str, band: str):
         # 3. Define budget based on band
         budgets = {
             "fresher": 8,
@@ -122,9 +131,16 @@ class AssessmentService:
 
     async def get_next_question(self, user_id: str):
         try:
-            session = await self.get_or_create_session(user_id)
+            # Session, profile, resume summary and history in one concurrent pass (cached between steps)
+            state = await assessment_state.get(user_id)
+            if state.session is None:
+                state.session = await self._create_session(user_id, state.band)
+            session = state.session
             if not session or session.get("status") == "completed":
                 return {"status": "completed"}
+            if question_pool.enabled and state.pool is None and (state.resume or state.skills):
+                # Candidate parsed before the pool existed; build it now, seeded questions cover the gap
+                question_pool.ensure(user_id)
 
             band = session.get("experience_band", "fresher")
             budget = session.get("total_budget", 8)
@@ -132,115 +148,173 @@ class AssessmentService:
 
             # 1. Termination Condition
             if current_step > budget:
+                question_prefetcher.invalidate(user_id)
                 return await self.complete_assessment(user_id, session)
 
-            # 2. Get current counts
-            responses_res = await supabase.table("assessment_responses").select("category").eq("candidate_id", user_id).execute()
-            counts = {
-                "resume": 0,
-                "skill": 0,
-                "behavioral": 0,
-                "psychometric": 0
-            }
-            for r in (responses_res.data or []):
-                counts[r["category"]] = counts.get(r["category"], 0) + 1
-            
-            # 3. Calculate Targets (Weighted Model Feb 2026)
-            targets = self._get_target_counts(band, budget)
-            
-            # 4. Data Availability Checks
-            resume_data_exists = False
-            try:
-                rd_res = await supabase.table("resume_data").select("user_id").eq("user_id", user_id).execute()
-                resume_data_exists = len(rd_res.data) > 0
-            except: pass
-
-            skills_exist = False
-            try:
-                sk_res = await supabase.table("candidate_profiles").select("skills").eq("user_id", user_id).execute()
-                skills_exist = bool(sk_res.data and sk_res.data[0].get("skills"))
-            except: pass
-
-            # 4a. DYNAMIC REDISTRIBUTION
-            # If resume or skill data is missing, move their target budget to behavioral/psychometric
-            # to ensure the "Mixed" logic doesn't default to hardcoded behavioral at the end.
-            if not resume_data_exists or not skills_exist:
-                redistribute_sum = 0
-                if not resume_data_exists:
-                    redistribute_sum += targets.get("resume", 0)
-                    targets["resume"] = 0
-                if not skills_exist:
-                    redistribute_sum += targets.get("skill", 0)
-                    targets["skill"] = 0
-                
-                if redistribute_sum > 0:
-                    # Give half to behavioral and half to psychometric
-                    bh_add = redistribute_sum // 2
-                    psy_add = redistribute_sum - bh_add
-                    targets["behavioral"] += bh_add
-                    targets["psychometric"] += psy_add
-
-            # 5. Iterative Selection based on Weights & Priority (UNBIASED MIXING Feb 2026)
-            # Mixed selection based on remaining slots
-            remaining_categories = []
-            for cat, target in targets.items():
-                if counts.get(cat, 0) < target:
-                    remaining_categories.append(cat)
-            
-            # 5a. AVOID CATEGORY REPETITION (for smoother "Mixed" feel)
-            last_cat = None
-            if responses_res.data:
-                # Get category of THE VERY LAST response
-                # Sort by created_at if possible, but they are returned in insert order usually
-                last_cat = responses_res.data[-1]["category"]
-
-            # Randomized shuffle
-            random.shuffle(remaining_categories)
-            
-            # Move the last category to the end of the priority list if it's there
-            if last_cat in remaining_categories and len(remaining_categories) > 1:
-                remaining_categories.remove(last_cat)
-                remaining_categories.append(last_cat)
-
-            # Execution map for dynamic selection
-            for cat in remaining_categories:
-                if cat == "resume" and resume_data_exists:
-                    q = await self._try_generate_resume_question(user_id, counts["resume"])
-                    if q and q.get("text"): return q
-                
-                if cat == "skill" and skills_exist:
-                    q = await self._try_generate_skill_question(user_id, band)
-                    if q and q.get("text"): return q
-                
-                if cat in ["behavioral", "psychometric"]:
-                    q = await self._get_predefined_question(user_id, band, cat)
-                    if q and q.get("text"): return q
-
-            # Final Fallback if all AI/Seeded generation fails
-            # Instead of a hardcoded behavioral, try to fulfill ANY remaining category with a predefined pool
-            if remaining_categories:
-                # Try in order of remaining categories
-                for fallback_cat in remaining_categories:
-                    # If we can't do AI, try the predefined pool for that category or fallback to behavioral
-                    actual_cat = fallback_cat if fallback_cat in ["behavioral", "psychometric"] else "behavioral"
-                    q = await self._get_predefined_question(user_id, band, actual_cat)
-                    if q and q.get("text"):
-                        # Mark it as the intended category so counts increment correctly
-                        q["category"] = fallback_cat
-                        return q
-
-            # Absolute bottom fallback (should rarely be hit)
-            return {
-                "text": "Provide an overview of a situation where you had to manage a complex stakeholder environment. How did you ensure all parties reached consensus?",
-                "category": "behavioral", 
-                "driver": "prioritization", 
-                "difficulty": "medium"
-            }
+            # 2-4. Category plan for this step (counts, targets, data availability)
+            plan = self._build_plan(state, band, budget, current_step)
+
+            # 5. Use the question prefetched while the previous one was answered, if the plan still matches
+            q = await question_prefetcher.take(user_id, session.get("id"), current_step, self._plan_fingerprint(plan))
+            if q is None:
+                q = await self._select_question(state, plan)
+
+            # 6. Speculatively prepare the next one while the candidate answers this one
+            self._schedule_prefetch(state, plan, q)
+            return q
 
         except Exception as e:
             print(f"ERROR calculating next question: {str(e)}")
             return await self._get_predefined_question(user_id, "fresher", "behavioral")
 
+    def _build_plan(self, state: AssessmentSessionState, band: str, budget: int, step: int) -> Dict[str, Any]:
+        # 2. Get current counts
+        counts = state.counts
+        
+        # 3. Calculate Targets (Weighted Model Feb 2026)
+        targets = self._get_target_counts(band, budget)
+        
+        # 4. Data Availability Checks
+        resume_data_exists = state.resume is not None
+        skills_exist = bool(state.skills)
+
+        # 4a. DYNAMIC REDISTRIBUTION
+        # If resume or skill data is missing, move their target budget to behavioral/psychometric
+        # to ensure the "Mixed" logic doesn't default to hardcoded behavioral at the end.
+        if not resume_data_exists or not skills_exist:
+            redistribute_sum = 0
+            if not resume_data_exists:
+                redistribute_sum += targets.get("resume", 0)
+                targets["resume"] = 0
+            if not skills_exist:
+                redistribute_sum += targets.get("skill", 0)
+                targets["skill"] = 0
+            
+            if redistribute_sum > 0:
+                # Give half to behavioral and half to psychometric
+                bh_add = redistribute_sum // 2
+                psy_add = redistribute_sum - bh_add
+                targets["behavioral"] += bh_add
+                targets["psychometric"] += psy_add
+
+        # Get category of THE VERY LAST response (history is ordered by created_at)
+        last_cat = state.last_category
+
+        return {
+            "band": band,
+            "budget": budget,
+            "step": step,
+            "counts": counts,
+            "targets": targets,
+            "resume_data_exists": resume_data_exists,
+            "skills_exist": skills_exist,
+            "last_cat": last_cat
+        }
+
+    @staticmethod
+    def _plan_fingerprint(plan: Dict[str, Any]) -> tuple:
+        """Everything question selection depends on; a prefetch is only valid for an identical plan."""
+        return (
+            plan["band"], plan["budget"], plan["step"],
+            tuple(sorted(plan["counts"].items())),
+            plan["resume_data_exists"], plan["skills_exist"], plan["last_cat"]
+        )
+
+    def _schedule_prefetch(self, state: AssessmentSessionState, plan: Dict[str, Any], served: Dict[str, Any]):
+        """Plans step N+1 as if the question just served is answered, and generates it in the background."""
+        if plan["step"] + 1 > plan["budget"] or not served.get("category"):
+            return
+        cat = served["category"]
+        next_plan = {
+            **plan,
+            "step": plan["step"] + 1,
+            "counts": {**plan["counts"], cat: plan["counts"].get(cat, 0) + 1},
+            "last_cat": cat
+        }
+        # The served question isn't stored yet, so keep it out of the next pick explicitly
+        exclude_ids = {served["id"]} if served.get("id") else set()
+        exclude_skills = {served["driver"]} if cat == "skill" and served.get("driver") else set()
+        exclude_texts = {served["text"]} if served.get("text") else set()
+        question_prefetcher.schedule(
+            state.user_id,
+            state.session.get("id"),
+            next_plan["step"],
+            self._plan_fingerprint(next_plan),
+            lambda: self._select_question(state, next_plan, exclude_ids, exclude_skills, exclude_texts)
+        )
+
+    async def _select_question(self, state: AssessmentSessionState, plan: Dict[str, Any], exclude_ids: Optional[set] = None,
+                               exclude_skills: Optional[set] = None, exclude_texts: Optional[set] = None):
+        user_id = state.user_id
+        band = plan["band"]
+        try:
+            await question_bank.ensure_loaded() # Loaded once per process; bitsets need its indexes
+        except Exception as e:
+            print(f"DEBUG: Question bank unavailable: {str(e)}")
+        excluded = state.excluded_questions() | question_bank.mask(exclude_ids or ())
+        counts = plan["counts"]
+        resume_data_exists = plan["resume_data_exists"]
+        skills_exist = plan["skills_exist"]
+
+        # 5. Iterative Selection based on Weights & Priority (UNBIASED MIXING Feb 2026)
+        # Mixed selection based on remaining slots
+        remaining_categories = []
+        for cat, target in plan["targets"].items():
+            if counts.get(cat, 0) < target:
+                remaining_categories.append(cat)
+        
+        # 5a. AVOID CATEGORY REPETITION (for smoother "Mixed" feel)
+        last_cat = plan["last_cat"]
+
+        # Randomized shuffle
+        random.shuffle(remaining_categories)
+        
+        # Move the last category to the end of the priority list if it's there
+        if last_cat in remaining_categories and len(remaining_categories) > 1:
+            remaining_categories.remove(last_cat)
+            remaining_categories.append(last_cat)
+
+        # Execution map for dynamic selection
+        for cat in remaining_categories:
+            if cat == "resume" and resume_data_exists:
+                if question_pool.enabled:
+                    q = self._draw_resume_question(state, counts["resume"], exclude_texts)
+                else:
+                    q = await self._try_generate_resume_question(state.resume, counts["resume"])
+                if q and q.get("text"): return q
+            
+            if cat == "skill" and skills_exist:
+                if question_pool.enabled:
+                    q = self._draw_skill_question(state, exclude_skills, exclude_texts)
+                else:
+                    q = await self._try_generate_skill_question(state, band, exclude_skills)
+                if q and q.get("text"): return q
+            
+            if cat in ["behavioral", "psychometric"]:
+                q = await self._get_predefined_question(user_id, band, cat, excluded)
+                if q and q.get("text"): return q
+
+        # Final Fallback if all AI/Seeded generation fails
+        # Instead of a hardcoded behavioral, try to fulfill ANY remaining category with a predefined pool
+        if remaining_categories:
+            # Try in order of remaining categories
+            for fallback_cat in remaining_categories:
+                # If we can't do AI, try the predefined pool for that category or fallback to behavioral
+                actual_cat = fallback_cat if fallback_cat in ["behavioral", "psychometric"] else "behavioral"
+                q = await self._get_predefined_question(user_id, band, actual_cat, excluded)
+                if q and q.get("text"):
+                    # Mark it as the intended category so counts increment correctly
+                    q["category"] = fallback_cat
+                    return q
+
+        # Absolute bottom fallback (should rarely be hit)
+        return {
+            "text": "Provide an overview of a situation where you had to manage a complex stakeholder environment. How did you ensure all parties reached consensus?",
+            "category": "behavioral", 
+            "driver": "prioritization", 
+            "difficulty": "medium"
+        }
+
     def _get_target_counts(self, band: str, budget: int) -> Dict[str, int]:
         """Calculates category targets based on mandated weights."""
         weights = {
@@ -263,31 +337,66 @@ class AssessmentService:
             
         return targets
 
-    async def _try_generate_resume_question(self, user_id: str, current_count: int):
+    async def _generate_pool_questions(self, band: str, resume: Optional[dict], skills: List[str]) -> List[Dict[str, Any]]:
+        """Every resume and skill question a candidate's assessment could need, generated concurrently."""
+        specs = []
+        if resume:
+            timeline = resume.get("timeline") or []
+            if len(timeline) > 1:
+                specs.append(("resume", "role_clarity", RESUME_PROMPTS["role_clarity"].format(data=json.dumps(timeline))))
+            gaps = resume.get("career_gaps") or {}
+            if gaps and gaps.get("count", 0) > 0:
+                specs.append(("resume", "career_gap", RESUME_PROMPTS["career_gap"].format(data=json.dumps(gaps))))
+            for achievement in (resume.get("achievements") or [])[:QUESTION_POOL_MAX_ACHIEVEMENTS]:
+                specs.append(("resume", "achievement", RESUME_PROMPTS["achievement"].format(data=json.dumps([achievement]))))
+        for skill in skills[:QUESTION_POOL_MAX_SKILLS]:
+            specs.append(("skill", skill, SKILL_PROMPT.format(band=band, skill=skill)))
+
+        texts = await asyncio.gather(*(self._ai_generate(prompt) for _, _, prompt in specs), return_exceptions=True)
+        return [
+            {
+                "text": text,
+                "category": cat,
+                "driver": driver,
+                "difficulty": RESUME_DIFFICULTY[driver] if cat == "resume" else "high"
+            }
+            for (cat, driver, _), text in zip(specs, texts) if isinstance(text, str) and text
+        ]
+
+    def _draw_resume_question(self, state: AssessmentSessionState, current_count: int, exclude_texts: Optional[set] = None):
+        # Same rotation as the lazy generator: transitions, then gaps, then achievements
+        prefer = (("role_clarity", "achievement"), ("career_gap", "achievement"), ("achievement",))[current_count % 3]
+        return question_pool.draw(state.pool, "resume", state.asked_texts | (exclude_texts or set()), prefer_drivers=prefer)
+
+    def _draw_skill_question(self, state: AssessmentSessionState, exclude_skills: Optional[set] = None, exclude_texts: Optional[set] = None):
+        return question_pool.draw(
+            state.pool, "skill", state.asked_texts | (exclude_texts or set()),
+            exclude_drivers=state.used_skills | (exclude_skills or set())
+        )
+
+    async def _try_generate_resume_question(self, data: Optional[dict], current_count: int):
         try:
-            res = await supabase.table("resume_data").select("*").eq("user_id", user_id).execute()
-            if not res.data or len(res.data) == 0:
+            if not data:
                 return None
-            
-            data = res.data[0]
+
             # More variety in resume prompts based on index
             if current_count % 3 == 0:
                 timeline = data.get("timeline", [])
                 if len(timeline) > 1:
-                    prompt = f"Candidate History: {json.dumps(timeline)}. Generate ONE professional question about role consistency or reasons for specific transitions. Under 30 words."
+                    prompt = RESUME_PROMPTS["role_clarity"].format(data=json.dumps(timeline))
                     q_text = await self._ai_generate(prompt)
                     return {"text": q_text, "category": "resume", "driver": "role_clarity", "difficulty": "medium"}
             
             if current_count % 3 == 1:
                 gaps = data.get("career_gaps", {})
                 if gaps and gaps.get("count", 0) > 0:
-                    prompt = f"Career Gaps: {json.dumps(gaps)}. Generate ONE question about productivity and growth during these periods. Under 30 words."
+                    prompt = RESUME_PROMPTS["career_gap"].format(data=json.dumps(gaps))
                     q_text = await self._ai_generate(prompt)
                     return {"text": q_text, "category": "resume", "driver": "career_gap", "difficulty": "medium"}
 
             achievements = data.get("achievements", [])
             if achievements:
-                prompt = f"Achievements: {json.dumps(achievements)}. Generate ONE question to validate the SPECIFIC logic or ownership of one major milestone. Under 30 words."
+                prompt = RESUME_PROMPTS["achievement"].format(data=json.dumps(achievements))
                 q_text = await self._ai_generate(prompt)
                 return {"text": q_text, "category": "resume", "driver": "achievement", "difficulty": "high"}
             
@@ -296,18 +405,13 @@ class AssessmentService:
             print(f"Error resume question: {str(e)}")
             return None
 
-    async def _try_generate_skill_question(self, user_id: str, band: str):
+    async def _try_generate_skill_question(self, state: AssessmentSessionState, band: str, exclude_skills: Optional[set] = None):
         try:
-            profile_res = await supabase.table("candidate_profiles").select("skills").eq("user_id", user_id).execute()
-            if not profile_res.data or len(profile_res.data) == 0:
-                return None
-            
-            all_skills = profile_res.data[0].get("skills", [])
+            all_skills = state.skills
             if not all_skills: return None
 
-            # Get skills already tested in this session
-            used_res = await supabase.table("assessment_responses").select("driver").eq("candidate_id", user_id).eq("category", "skill").execute()
-            used_skills = [r["driver"] for r in (used_res.data or [])]
+            # Skills already tested in this session
+            used_skills = state.used_skills | (exclude_skills or set())
             
             available_skills = [s for s in all_skills if s not in used_skills]
             # If all skills used, allow recycling or fallback to top 3
@@ -315,48 +419,34 @@ class AssessmentService:
                 available_skills = all_skills
             
             skill = random.choice(available_skills)
-            prompt = f"Expertise Level: {band}. Candidate Skill: {skill}. Generate a high-pressure Case Study question to test technical logic and sales execution for this skill. End with 'How would you proceed?'. Under 50 words."
+            prompt = SKILL_PROMPT.format(band=band, skill=skill)
             q_text = await self._ai_generate(prompt)
             return {"text": q_text, "category": "skill", "driver": skill, "difficulty": "high"}
         except Exception as e:
             print(f"Error skill question: {str(e)}")
             return None
 
-    async def _get_predefined_question(self, user_id: str, band: str, category: str):
+    async def _get_predefined_question(self, user_id: str, band: str, category: str, excluded: Optional[int] = None):
         # Pick category (Behavioral vs Psychometric)
         cat = category
 
-        # Get question IDs already used by this user
-        used_res = await supabase.table("assessment_responses").select("question_id").eq("candidate_id", user_id).execute()
-        used_ids = [r["question_id"] for r in (used_res.data or []) if r.get("question_id")]
+        # Questions already used by this user, as a bitset over the in-memory bank
+        if excluded is None:
+            state = assessment_state.peek(user_id)
+            excluded = state.excluded_questions() if state else 0
 
-        # Query seeded questions
-        query = supabase.table("assessment_questions") \
-            .select("*") \
-            .eq("category", cat) \
-            .eq("experience_band", band)
-        
-        if used_ids:
-            query = query.not_.in_("id", used_ids)
-            
-        res = await query.limit(20).execute()
-        
-        # FIX: CONSISTENT MIXING Fallback to any band for this category if band-specific is exhausted
-        if not res.data:
-            fallback_query = supabase.table("assessment_questions") \
-                .select("*") \
-                .eq("category", cat)
-            
-            if used_ids:
-                fallback_query = fallback_query.not_.in_("id", used_ids)
-            
-            res = await fallback_query.limit(20).execute()
-        
-        if not res.data:
+        # Random unused seeded question for the band, falling back to any band for this category
+        q = None
+        try:
+            await question_bank.ensure_loaded()
+            q = question_bank.pick(cat, band, excluded)
+        except Exception as e:
+            print(f"DEBUG: Question bank unavailable: {str(e)}")
+
+        if not q:
             # Absolute fallback if category is totally empty or exhausted
             return {"text": f"Tell me about a time you handled a difficult challenge in {cat} context. How did you resolve it?", "category": cat, "driver": "generic", "difficulty": "medium"}
 
-        q = random.choice(res.data)
         # Safely handle potential column name differences (trait_driver vs driver, etc)
         return {
             "id": q.get("id"),
@@ -368,10 +458,11 @@ class AssessmentService:
 
     async def _ai_generate(self, prompt: str) -> Optional[str]:
         # Using Robust Caller (Gemini primary + GPT-4o-mini secondary)
-        return await self._call_ai_robust(prompt, "You are a professional assessment question generator.")
+        return await self._call_ai_robust(prompt, "You are a professional assessment question generator.", site="assessment.question")
 
     async def evaluate_answer(self, user_id: str, question_id: Optional[str], category: str, answer: str, difficulty: str, metadata: dict = {}):
         # 1. Update Step Immediately to unlock next question (latency reduction)
+        new_step = None
         session_res = await supabase.table("assessment_sessions").select("current_step").eq("candidate_id", user_id).execute()
         if session_res.data:
             new_step = session_res.data[0]["current_step"] + 1
@@ -379,13 +470,26 @@ class AssessmentService:
 
         # 2. Handle Skip
         if not answer or answer.strip() == "":
-            return await self._store_response(user_id, question_id, category, answer, 0, True, metadata, skip_session_update=True)
-
-        # 3. AI Evaluation
-        score, eval_meta = await self._evaluate_ai(answer, category, metadata)
-        full_metadata = {**metadata, **eval_meta}
-        
-        return await self._store_response(user_id, question_id, category, answer, score, False, full_metadata, skip_session_update=True)
+            res = await self._store_response(user_id, question_id, category, answer, 0, True, metadata, skip_session_update=True)
+            self._record_submit(user_id, new_step, res, question_id, category, metadata)
+            return res
+
+        # 3. Record the raw answer unscored and hand the AI evaluation to the background queue
+        res = await self._store_response(user_id, question_id, category, answer, None, False, metadata, skip_session_update=True)
+        self._record_submit(user_id, new_step, res, question_id, category, metadata)
+        if res.get("id"):
+            await evaluation_queue.enqueue(res["id"], user_id, answer, category, metadata)
+        return {"status": "ok", "score": None, "evaluation": "pending"}
+
+    def _record_submit(self, user_id: str, new_step: Optional[int], stored: dict, question_id: Optional[str], category: str, metadata: dict):
+        # Keep the cached session snapshot in step with the DB so /next needs no reload
+        assessment_state.record_submit(user_id, new_step, {
+            "id": stored.get("id"),
+            "category": category,
+            "question_id": question_id,
+            "question_text": metadata.get("text"),
+            "driver": metadata.get("driver")
+        })
 
     async def _evaluate_ai(self, answer: str, category: str, q_metadata: dict):
         rubric = q_metadata.get('evaluation_rubric')
@@ -410,7 +514,7 @@ class AssessmentService:
         """
         try:
             # Use robust AI caller for high-precision evaluation
-            response_text = await self._call_ai_robust(prompt, "You are a Lead Psychometric Auditor.")
+            response_text = await self._call_ai_robust(prompt, "You are a Lead Psychometric Auditor.", site="assessment.evaluate")
             if not response_text:
                 raise Exception("AI Evaluation null response")
 
@@ -424,10 +528,53 @@ class AssessmentService:
                 "evaluator": "AUDITOR_V3"
             }
         except Exception as e:
+            if isinstance(e, ValueError):
+                llm_metrics.record_json_failure("assessment.evaluate")
             print(f"Auditor Delay/Error: {str(e)}")
             return 3, {"reasoning": "Verification bypassed due to latency.", "evaluator": "FALLBACK"}
 
-    async def _store_response(self, user_id: str, q_id: Optional[str], category: str, answer: str, score: int, is_skipped: bool, metadata: dict, skip_session_update: bool = False):
+    @staticmethod
+    def _valid_batch_score(item: dict) -> Optional[dict]:
+        score = item.get("score")
+        if isinstance(score, bool) or not isinstance(score, (int, float)) or not math.isfinite(score) or score != int(score) or not 0 <= score <= 6:
+            return None
+        explanation = item.get("explanation")
+        if not isinstance(explanation, str) or not explanation.strip():
+            return None
+        return {"score": int(score), "explanation": explanation, "detected_framework": str(item.get("detected_framework") or "N/A")}
+
+    async def _evaluate_ai_batch(self, answers: List[tuple]) -> List[tuple]:
+        """
+        Scores several (answer, category, question metadata) tuples in one request.
+        Items the model skipped or got wrong are re-scored one by one with _evaluate_ai.
+        """
+        items = []
+        for answer, category, q_metadata in answers:
+            rubric = q_metadata.get('evaluation_rubric')
+            items.append(
+                f"Category: {category.upper()}\n"
+                f"Context: {q_metadata.get('text', 'Professional Question')}\n"
+                f"{f'Target Rubric: {rubric}' if rubric else 'Target Rubric: STAR framework'}\n"
+                f"Candidate: \"{answer}\""
+            )
+        results = await batch_evaluator.evaluate(
+            BATCH_AUDIT_INSTRUCTIONS, items, BATCH_AUDIT_FIELDS, self._valid_batch_score,
+            "You are a Lead Psychometric Auditor.", site="assessment.evaluate_batch"
+        )
+
+        retry = [i for i, r in enumerate(results) if r is None]
+        retried = await asyncio.gather(*(self._evaluate_ai(*answers[i]) for i in retry))
+        scored = {i: r for i, r in zip(retry, retried)}
+        for i, r in enumerate(results):
+            if r is not None:
+                scored[i] = (r["score"], {
+                    "reasoning": r["explanation"],
+                    "framework": r["detected_framework"],
+                    "evaluator": "AUDITOR_V3_BATCH"
+                })
+        return [scored[i] for i in range(len(answers))]
+
+    async def _store_response(self, user_id: str, q_id: Optional[str], category: str, answer: str, score: Optional[int], is_skipped: bool, metadata: dict, skip_session_update: bool = False):
         if not skip_session_update:
             session_res = await supabase.table("assessment_sessions").select("*").eq("candidate_id", user_id).execute()
             if session_res.data:
@@ -437,7 +584,7 @@ class AssessmentService:
                 # Confidence tracking
                 driver = metadata.get("driver")
                 confidence = session.get("driver_confidence", {})
-                if driver and score >= 4:
+                if driver and score and score >= 4:
                     confidence[driver] = confidence.get(driver, 0) + 1
                 
                 await supabase.table("assessment_sessions").update({
@@ -459,27 +606,26 @@ class AssessmentService:
             "tab_switches": metadata.get("tab_switches", 0)
         }
         
-        await supabase.table("assessment_responses").insert(res_data).execute()
-        return {"status": "ok", "score": score}
+        res = await supabase.table("assessment_responses").insert(res_data).execute()
+        return {"status": "ok", "score": score, "id": res.data[0]["id"] if res.data else None}
 
     async def complete_assessment(self, user_id: str, session: dict):
-        # 1. Fetch all responses
-        res = await supabase.table("assessment_responses").select("*").eq("candidate_id", user_id).execute()
-        responses = res.data
-        
-        # 2. Group scores by category
-        cat_scores = {}
-        for r in responses:
-            cat = r["category"]
-            if cat not in cat_scores: cat_scores[cat] = []
-            cat_scores[cat].append(r["score"])
+        # 0. Every answer needs its score before the final calculation
+        await evaluation_queue.settle(user_id)
+
+        # 1-2. Per-category score sums and counts, kept on the session as scores land
+        cat_totals = {}
+        for cat, t in (await self._category_totals(user_id)).items():
+            # Unscored only if evaluation and write-back both failed; use the auditor's neutral fallback
+            unscored = int(t.get("unscored", 0))
+            cat_totals[cat] = (float(t.get("sum", 0)) + 3 * unscored, int(t.get("count", 0)) + unscored)
             
         # 3. Calculate Component Scores (Normalized to 0-100)
         # Base is 0-6. Max is 6 * count. Factor = 100 / 6 = 16.66
         comp_scores = {}
-        for cat, scores in cat_scores.items():
-            if not scores: continue
-            avg_base = sum(scores) / len(scores)
+        for cat, (total, count) in cat_totals.items():
+            if not count: continue
+            avg_base = total / count
             comp_scores[cat] = round((avg_base / 6) * 100)
 
         # 4. Final Weighted Scoring (Normalized to present categories)
@@ -496,14 +642,14 @@ class AssessmentService:
         weighted_sum = 0
         
         for cat, weight in weights.items():
-            scores = cat_scores.get(cat, [])
+            total, count = cat_totals.get(cat, (0, 0))
             # Only count a category towards the total weight if:
             # 1. It has a non-zero average score (meaning they succeeded at least once)
             # 2. OR they have answered more than 2 questions in this category (meaning we have enough data to trust a low score)
             
-            if scores:
-                avg = sum(scores) / len(scores)
-                if avg > 0 or len(scores) > 2:
+            if count:
+                avg = total / count
+                if avg > 0 or count > 2:
                     weighted_sum += comp_scores[cat] * weight
                     total_weight_present += weight
                 
@@ -534,7 +680,9 @@ class AssessmentService:
         if should_update_profile or not existing_res.data:
             profile_update["final_profile_score"] = final_score
 
-        await supabase.table("candidate_profiles").update(profile_update).eq("user_id", user_id).execute()
+        profile_res = await supabase.table("candidate_profiles").update(profile_update).eq("user_id", user_id).execute()
+        if profile_res.data:
+            market_insights.candidate_completed(user_id, profile_res.data[0].get("skills"))
 
         if should_update_profile or not existing_res.data:
             # Sync to profile_scores table
@@ -547,7 +695,7 @@ class AssessmentService:
                 "final_score": final_score
             }).execute()
 
-        NotificationService.create_notification(
+        await NotificationService.create_notification(
             user_id=user_id,
             type="ASSESSMENT_COMPLETED",
             title="Assessment Finalized",
@@ -557,6 +705,29 @@ class AssessmentService:
 
         return {"status": "completed", "score": display_score}
 
+    async def _category_totals(self, user_id: str) -> Dict[str, dict]:
+        """
+        {category: {sum, count}} from the session row, maintained by a trigger on
+        assessment_responses. If the counts don't add up to the answers submitted (session
+        predates the totals, or an answer is still unscored) they are rebuilt from history.
+        """
+        res = await supabase.table("assessment_sessions").select("category_totals, current_step").eq("candidate_id", user_id).execute()
+        row = res.data[0] if res.data else {}
+        totals = row.get("category_totals") or {}
+        submitted = (row.get("current_step") or 1) - 1
+        if sum(int(t.get("count", 0)) for t in totals.values()) == submitted:
+            return totals
+        return await self.reconcile_category_totals(user_id)
+
+    async def reconcile_category_totals(self, user_id: str) -> Dict[str, dict]:
+        """
+        Rebuilds the candidate's running category totals from their response history and
+        returns them, with the number of still-unscored answers per category as `unscored`.
+        """
+        print(f"DEBUG: Rebuilding category totals for {user_id}")
+        res = await supabase.rpc("rebuild_assessment_category_totals", {"p_candidate_id": user_id}).execute()
+        return res.data or {}
+
     async def retake_assessment(self, user_id: str):
         """Resets the assessment session but keeps the high score in profile_scores."""
         try:
@@ -570,6 +741,10 @@ class AssessmentService:
             await supabase.table("candidate_profiles").update({
                 "assessment_status": "started"
             }).eq("user_id", user_id).execute()
+            market_insights.candidate_reset(user_id)
+            question_prefetcher.invalidate(user_id)
+            assessment_state.invalidate(user_id)
+            question_pool.schedule(user_id, force=True) # Fresh resume/skill questions for the retake
             
             # Note: We do NOT delete from profile_scores to allow comparison later
             
@@ -579,3 +754,21 @@ class AssessmentService:
             return {"status": "error", "message": str(e)}
 
 assessment_service = AssessmentService()
+
+evaluation_queue = EvaluationQueue(
+    assessment_service._evaluate_ai,
+    workers=EVALUATION_WORKERS,
+    maxsize=EVALUATION_QUEUE_SIZE,
+    job_timeout=EVALUATION_JOB_TIMEOUT_S,
+    settle_timeout=EVALUATION_SETTLE_TIMEOUT_S,
+    max_retries=EVALUATION_MAX_RETRIES,
+    batch_evaluator=assessment_service._evaluate_ai_batch if EVALUATION_MODE == "batch" else None,
+    batch_size=EVALUATION_BATCH_SIZE,
+    batch_hold=EVALUATION_BATCH_HOLD_S
+)
+
+question_pool = QuestionPool(
+    assessment_service._generate_pool_questions,
+    concurrent_builds=QUESTION_POOL_CONCURRENT_BUILDS,
+    enabled=QUESTION_POOL_ENABLED
+)
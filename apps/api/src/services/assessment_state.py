@@ -0,0 +1,146 @@
+import asyncio
+from typing import Dict, List, Optional, Set, Tuple
+from cachetools import TTLCache
+from src.core.supabase import async_supabase as supabase
+from src.core.config import ASSESSMENT_STATE_TTL, ASSESSMENT_STATE_MAXSIZE
+from src.services.question_bank import question_bank
+
+RESPONSE_FIELDS = "id, category, question_id, question_text, driver, created_at"
+
+class AssessmentSessionState:
+    """
+    Everything question selection needs for one candidate, loaded in a single concurrent pass:
+    session row, profile (band + skills), resume summary, pre-generated question pool and
+    response history.
+    """
+    def __init__(self, user_id: str, session: Optional[dict], profile: Optional[dict], resume: Optional[dict], responses: List[dict],
+                 pool: Optional[List[dict]] = None):
+        self.user_id = user_id
+        self.session = session
+        self.profile = profile or {}
+        self.resume = resume
+        self.responses = responses
+        # None = no pool built yet for this candidate
+        self.pool = pool
+        # (question bank version, bitset of used seeded questions)
+        self._excluded: Optional[Tuple[int, int]] = None
+
+    @classmethod
+    async def load(cls, user_id: str) -> "AssessmentSessionState":
+        session_res, profile_res, resume_res, responses_res, pool_res = await asyncio.gather(
+            supabase.table("assessment_sessions").select("*").eq("candidate_id", user_id).execute(),
+            supabase.table("candidate_profiles").select("experience, skills").eq("user_id", user_id).execute(),
+            supabase.table("resume_data").select("timeline, career_gaps, achievements").eq("user_id", user_id).execute(),
+            supabase.table("assessment_responses").select(RESPONSE_FIELDS).eq("candidate_id", user_id).order("created_at").execute(),
+            supabase.table("candidate_question_pool").select("questions").eq("candidate_id", user_id).execute()
+        )
+        return cls(
+            user_id,
+            session_res.data[0] if session_res.data else None,
+            profile_res.data[0] if profile_res.data else None,
+            resume_res.data[0] if resume_res.data else None,
+            responses_res.data or [],
+            pool_res.data[0].get("questions") or [] if pool_res.data else None
+        )
+
+    @property
+    def band(self) -> str:
+        if self.session:
+            return self.session.get("experience_band") or "fresher"
+        return self.profile.get("experience") or "fresher"
+
+    @property
+    def skills(self) -> List[str]:
+        return self.profile.get("skills") or []
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        counts = {"resume": 0, "skill": 0, "behavioral": 0, "psychometric": 0}
+        for r in self.responses:
+            counts[r["category"]] = counts.get(r["category"], 0) + 1
+        return counts
+
+    @property
+    def last_category(self) -> Optional[str]:
+        return self.responses[-1]["category"] if self.responses else None
+
+    @property
+    def used_question_ids(self) -> Set[str]:
+        return {r["question_id"] for r in self.responses if r.get("question_id")}
+
+    @property
+    def asked_texts(self) -> Set[str]:
+        return {r["question_text"] for r in self.responses if r.get("question_text")}
+
+    @property
+    def used_skills(self) -> Set[str]:
+        return {r["driver"] for r in self.responses if r.get("category") == "skill" and r.get("driver")}
+
+    def excluded_questions(self) -> int:
+        """Used seeded questions as a question-bank bitset; rebuilt only after a bank reload."""
+        if self._excluded is None or self._excluded[0] != question_bank.version:
+            self._excluded = (question_bank.version, question_bank.mask(self.used_question_ids))
+        return self._excluded[1]
+
+    def record_response(self, row: dict):
+        self.responses.append({k: row.get(k) for k in ("id", "category", "question_id", "question_text", "driver", "created_at")})
+        if self._excluded is not None and self._excluded[0] == question_bank.version:
+            self._excluded = (self._excluded[0], self._excluded[1] | question_bank.bit(row.get("question_id")))
+
+    def matches(self, row: dict) -> bool:
+        """True if the session row in the DB is still the one this snapshot was built on."""
+        s = self.session or {}
+        return (s.get("id"), s.get("status"), s.get("current_step")) == (row.get("id"), row.get("status"), row.get("current_step"))
+
+class AssessmentStateStore:
+    """
+    Per-candidate snapshots kept between requests and updated in place on submit.
+    A cached snapshot is reused only while the session's (id, status, current_step) in the DB
+    still matches it (one small query), so a submit handled by another worker process or a
+    retake simply triggers a full reload.
+    """
+    def __init__(self, ttl: int = 3600, maxsize: int = 10000):
+        self._states: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, user_id: str) -> AssessmentSessionState:
+        state = self._states.get(user_id)
+        if state is not None and state.session:
+            res = await supabase.table("assessment_sessions").select("id, status, current_step").eq("candidate_id", user_id).execute()
+            if res.data and state.matches(res.data[0]):
+                self.hits += 1
+                return state
+        self.misses += 1
+        state = await AssessmentSessionState.load(user_id)
+        self._states[user_id] = state
+        return state
+
+    def peek(self, user_id: str) -> Optional[AssessmentSessionState]:
+        return self._states.get(user_id)
+
+    def record_submit(self, user_id: str, new_step: Optional[int], row: dict):
+        """Applies a submitted answer to the cached snapshot (if any) so the next read stays in sync."""
+        state = self._states.get(user_id)
+        if state is None or not state.session:
+            return
+        if new_step is None or state.session.get("current_step", 0) + 1 != new_step:
+            # Out of step with what we saw (concurrent submit?); rebuild on next read
+            self._states.pop(user_id, None)
+            return
+        state.session["current_step"] = new_step
+        state.record_response(row)
+
+    def invalidate(self, user_id: str):
+        self._states.pop(user_id, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._states),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+assessment_state = AssessmentStateStore(ttl=ASSESSMENT_STATE_TTL, maxsize=ASSESSMENT_STATE_MAXSIZE)
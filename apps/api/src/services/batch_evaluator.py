@@ -0,0 +1,87 @@
+from typing import Callable, List, Optional, Sequence
+from src.core.llm_gateway import llm_gateway, parse_json_response, LLMUnavailable
+from src.core.llm_metrics import llm_metrics
+
+RESULT_FORMAT = """
+Score every item independently; never compare items with each other.
+Return ONLY a JSON object: {{"results": [{{"id": "<item id>", {fields}}}, ...]}} with exactly one entry per item ID above.
+"""
+
+class BatchEvaluator:
+    """
+    Scores several answers in one structured LLM request.
+
+    The shared rubric is sent once, followed by the items, each tagged with an ID; the model
+    returns one result per ID. Every result is checked by the caller's `validate` (which returns
+    the cleaned result or None), and anything missing or invalid comes back as None so the
+    caller can fall back to its single-item evaluator for just those items.
+    """
+    def __init__(self, route: Sequence[str] = ("gemini", "openrouter"), temperature: float = 0.3):
+        self.route = tuple(route)
+        self.temperature = temperature
+        self.metrics = {"batches": 0, "items": 0, "invalid_items": 0, "failed_batches": 0}
+
+    async def evaluate(self, instructions: str, items: List[str], fields: str,
+                       validate: Callable[[dict], Optional[dict]], system: str, site: str) -> List[Optional[dict]]:
+        """
+        `instructions`: the rubric, sent once. `items`: per-item text (question, answer, context).
+        `fields`: the per-item JSON fields to ask for, e.g. '"score": int, "explanation": "string"'.
+        """
+        ids = [f"item_{i + 1}" for i in range(len(items))]
+        prompt = (
+            instructions
+            + "\n\nITEMS:\n"
+            + "\n\n".join(f"[{item_id}]\n{text}" for item_id, text in zip(ids, items))
+            + "\n"
+            + RESULT_FORMAT.format(fields=fields)
+        )
+        self.metrics["batches"] += 1
+        self.metrics["items"] += len(items)
+
+        try:
+            result = await llm_gateway.generate(prompt, system, route=self.route, temperature=self.temperature,
+                                                json_mode=True, site=site)
+        except LLMUnavailable as e:
+            self.metrics["failed_batches"] += 1
+            print(f"DEBUG: Batch evaluation unavailable ({len(items)} items): {str(e)}")
+            return [None] * len(items)
+
+        try:
+            data = parse_json_response(result.text)
+        except ValueError:
+            self.metrics["failed_batches"] += 1
+            llm_metrics.record_json_failure(site, result.provider)
+            return [None] * len(items)
+
+        rows = data.get("results") if isinstance(data, dict) else data
+        if not isinstance(rows, list):
+            self.metrics["failed_batches"] += 1
+            llm_metrics.record_json_failure(site, result.provider)
+            return [None] * len(items)
+        by_id = {str(r.get("id")): r for r in rows if isinstance(r, dict)}
+
+        out = []
+        for item_id in ids:
+            row = by_id.get(item_id)
+            try:
+                cleaned = validate(row) if row is not None else None
+            except (TypeError, ValueError):
+                cleaned = None
+            if cleaned is None:
+                self.metrics["invalid_items"] += 1
+            out.append(cleaned)
+        invalid = out.count(None)
+        if invalid:
+            llm_metrics.record_json_failure(site, result.provider)
+            print(f"DEBUG: Batch evaluation returned {invalid}/{len(items)} unusable items; falling back for those")
+        return out
+
+    def stats(self) -> dict:
+        items = self.metrics["items"]
+        return {
+            **self.metrics,
+            "avg_batch_size": round(items / self.metrics["batches"], 2) if self.metrics["batches"] else 0.0,
+            "item_fallback_rate": round(self.metrics["invalid_items"] / items, 3) if items else 0.0
+        }
+
+batch_evaluator = BatchEvaluator()
@@ -3,6 +3,7 @@ from typing import Dict, Any, List
 import asyncio
 from datetime import date
 from src.services.notification_service import NotificationService
+from src.services.recruiter_stats import recruiter_stats
 
 class CandidateService:
     @staticmethod
@@ -180,6 +181,7 @@ class CandidateService:
             "job_id": job_id,
             "status": "applied"
         }).execute()
+        recruiter_stats.invalidate_job(job_id)
 
         # 4. Audit Trail: Log initial application
         if res.data:
@@ -205,7 +207,7 @@ class CandidateService:
                 job_title = job_data.data.get("title", "a job")
                 recruiter_id = job_data.data.get("recruiter_id")
 
-            NotificationService.create_notification(
+            await NotificationService.create_notification(
                 user_id=user_id,
                 type="APPLICATION_SUBMITTED",
                 title="Application Sent",
@@ -215,7 +217,7 @@ class CandidateService:
 
             # Notify Recruiter
             if recruiter_id:
-                NotificationService.create_notification(
+                await NotificationService.create_notification(
                     user_id=recruiter_id,
                     type="NEW_APPLICATION",
                     title=f"New Candidate Alert: {job_title}",
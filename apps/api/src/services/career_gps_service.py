@@ -1,10 +1,11 @@
 from typing import Dict, Any, List
-from src.core.supabase import supabase
-import google.generativeai as genai
-from src.core.config import GOOGLE_API_KEY, OPENROUTER_API_KEY
-import json
-import httpx
-from google.api_core import exceptions as google_exceptions
+from src.core.supabase import async_supabase as supabase
+from src.core.llm_gateway import llm_gateway, parse_json_response, LLMUnavailable
+from src.core.llm_metrics import llm_metrics
+from src.core.generation_cache import generation_cache
+
+GPS_ROUTE = ("openrouter", "gemini")
+GPS_SYSTEM = "You are an elite Career Architect for IT Tech Sales. Always output valid JSON only."
 
 class CareerGPSService:
     @staticmethod
@@ -70,10 +71,38 @@ class CareerGPSService:
         """
 
     @staticmethod
-    async def generate_gps(user_id: str, candidate_info: Dict[str, Any]):
-        """Generates and persists the career GPS path using an AI Router (OpenAI/OpenRouter -> Gemini)."""
+    async def _generate_roadmap(prompt: str) -> Dict[str, Any]:
+        """Runs the GPS prompt and returns {"data": roadmap, "source": label}."""
+        try:
+            result = await llm_gateway.generate(
+                prompt,
+                GPS_SYSTEM,
+                route=GPS_ROUTE,
+                json_mode=True,
+                timeout=45.0,
+                site="career_gps.roadmap"
+            )
+            gps_data = parse_json_response(result.text)
+            generation_source = "OpenRouter (OpenAI-Powered)" if result.provider == "openrouter" else "Gemini"
+        except LLMUnavailable as e:
+            if e.quota_exceeded:
+                raise Exception("QUOTA_EXCEEDED: AI daily limit reached on both Router and Gemini. Try again tomorrow.")
+            print(f"GPS AI Route Error: {str(e)}")
+            raise Exception(f"Failed to generate GPS. All AI routes failed.")
+        except ValueError as e:
+            llm_metrics.record_json_failure("career_gps.roadmap", result.provider)
+            print(f"GPS JSON Parse Error: {str(e)}")
+            raise Exception(f"Failed to generate GPS. All AI routes failed.")
+        return {"data": gps_data, "source": generation_source}
+
+    @staticmethod
+    async def generate_gps(user_id: str, candidate_info: Dict[str, Any], regenerate: bool = False):
+        """
+        Generates and persists the career GPS path using an AI Router (OpenAI/OpenRouter -> Gemini).
+        Identical profile + inputs reuse the cached roadmap unless `regenerate` is set.
+        """
         # 1. Fetch current profile
-        profile_res = supabase.table("candidate_profiles").select("*").eq("user_id", user_id).execute()
+        profile_res = await supabase.table("candidate_profiles").select("*").eq("user_id", user_id).execute()
         if not profile_res.data:
             raise Exception("Profile not found")
         
@@ -84,87 +113,42 @@ class CareerGPSService:
         interests = candidate_info.get("career_interests", "")
         interests_list = [i.strip() for i in interests.split(",")] if isinstance(interests, str) else interests
 
-        supabase.table("candidate_profiles").update({
+        await supabase.table("candidate_profiles").update({
             "target_role": candidate_info["target_role"],
             "career_interests": interests_list,
             "long_term_goal": candidate_info["long_term_goal"]
         }).eq("user_id", user_id).execute()
         
         prompt = CareerGPSService.get_prompt(profile, candidate_info)
-        gps_data = None
-        generation_source = "Gemini"
-
-        # 3. AI Router Execution (OpenRouter/OpenAI Priority)
+        # 3. AI Router Execution (OpenRouter/OpenAI priority, Gemini hedged fallback)
         # We use OpenRouter as a primary router because it can access OpenAI (gpt-4o-mini), 
         # Claude (3.5-haiku), or Llama (3.1/3.3-70b) consistently.
-        if OPENROUTER_API_KEY and len(OPENROUTER_API_KEY) > 10:
-            try:
-                print(f"DEBUG: Attempting GPS Generation via OpenRouter (OpenAI Router)...")
-                async with httpx.AsyncClient(timeout=45.0) as client:
-                    response = await client.post(
-                        "https://openrouter.ai/api/v1/chat/completions",
-                        headers={
-                            "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                            "Content-Type": "application/json",
-                            "HTTP-Referer": "https://talentflow.ai", # Optional for OpenRouter
-                            "X-Title": "TalentFlow"
-                        },
-                        json={
-                            "model": "openai/gpt-4o-mini", # Optimized OpenAI model for logic-heavy JSON
-                            "messages": [
-                                {"role": "system", "content": "You are an elite Career Architect for IT Tech Sales. Always output valid JSON only."},
-                                {"role": "user", "content": prompt}
-                            ],
-                            "response_format": {"type": "json_object"}
-                        }
-                    )
-                    
-                    if response.status_code == 200:
-                        res_json = response.json()
-                        content = res_json['choices'][0]['message']['content']
-                        gps_data = json.loads(content)
-                        generation_source = "OpenRouter (OpenAI-Powered)"
-                    else:
-                        print(f"DEBUG: OpenRouter failed ({response.status_code}): {response.text}")
-            except Exception as e:
-                print(f"DEBUG: OpenRouter Route Trace Error: {str(e)}")
-
-        # 4. Fallback to Gemini if Router failed or was unavailable
-        if not gps_data:
-            if not GOOGLE_API_KEY:
-                raise Exception("Neither OpenRouter nor Gemini API keys are configured.")
-                
-            try:
-                print(f"DEBUG: Falling back to Gemini for GPS generation...")
-                genai.configure(api_key=GOOGLE_API_KEY)
-                model = genai.GenerativeModel('gemini-3-flash-preview')
-                
-                response = model.generate_content(prompt)
-                cleaned_text = response.text.strip().replace("```json", "").replace("```", "")
-                gps_data = json.loads(cleaned_text)
-                generation_source = "Gemini"
-                
-            except google_exceptions.ResourceExhausted:
-                raise Exception("QUOTA_EXCEEDED: AI daily limit reached on both Router and Gemini. Try again tomorrow.")
-            except Exception as e:
-                print(f"GPS Gemini Fallback Error: {str(e)}")
-                raise Exception(f"Failed to generate GPS. All AI routes failed.")
+        # 4. Content-addressed cache: the prompt already carries every profile input
+        generated = await generation_cache.get_or_generate(
+            prompt,
+            llm_gateway.route_id(GPS_ROUTE),
+            lambda: CareerGPSService._generate_roadmap(prompt),
+            system=GPS_SYSTEM,
+            bypass=regenerate
+        )
+        gps_data = generated["data"]
+        generation_source = generated["source"]
 
         # 5. Persist to Database (Same as before)
         try:
             # Create the GPS parent entry (upsert)
-            existing_gps = supabase.table("career_gps").select("id").eq("candidate_id", user_id).execute()
+            existing_gps = await supabase.table("career_gps").select("id").eq("candidate_id", user_id).execute()
             
             if existing_gps.data:
                 gps_id = existing_gps.data[0]["id"]
-                supabase.table("career_gps").update({
+                await supabase.table("career_gps").update({
                     "target_role": gps_data["target_role"],
                     "updated_at": "now()"
                 }).eq("id", gps_id).execute()
                 # Clear old milestones for a fresh path
-                supabase.table("career_milestones").delete().eq("gps_id", gps_id).execute()
+                await supabase.table("career_milestones").delete().eq("gps_id", gps_id).execute()
             else:
-                gps_res = supabase.table("career_gps").insert({
+                gps_res = await supabase.table("career_gps").insert({
                     "candidate_id": user_id,
                     "target_role": gps_data["target_role"]
                 }).execute()
@@ -183,7 +167,7 @@ class CareerGPSService:
                     "status": "not-started"
                 })
             
-            supabase.table("career_milestones").insert(milestones).execute()
+            await supabase.table("career_milestones").insert(milestones).execute()
             
             return {
                 "status": "success", 
@@ -0,0 +1,271 @@
+import time
+import asyncio
+import contextvars
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from src.core.supabase import async_supabase as supabase
+from src.core.llm_gateway import deadline_scope
+
+# (answer, category, question metadata) -> (score, evaluation metadata)
+Evaluator = Callable[[str, str, dict], Awaitable[Tuple[int, dict]]]
+# [(answer, category, question metadata), ...] -> [(score, evaluation metadata), ...] in the same order
+BatchEvaluator = Callable[[List[Tuple[str, str, dict]]], Awaitable[List[Tuple[int, dict]]]]
+
+class EvaluationQueue:
+    """
+    Background scoring for assessment answers.
+
+    /assessment/submit stores the raw answer with `score = NULL` (that row is the durable
+    record of pending work) and enqueues it here. A fixed pool of workers runs the AI rubric
+    evaluation with bounded concurrency and writes `score` / `evaluation_metadata` back.
+    Write-backs only touch rows that are still unscored, so the first writer wins.
+
+    settle(user_id) is called before final scoring: it waits for this process's in-flight jobs
+    for the candidate, then evaluates inline any rows still unscored (jobs lost to a restart,
+    queued in another worker process, or still waiting past the timeout).
+
+    Batch mode (`batch_evaluator` set and `batch_size` > 1): a candidate's answers are held
+    until `batch_size` have arrived or the oldest has waited `batch_hold` seconds, then scored
+    together in one LLM request. settle() flushes whatever is still held for the candidate.
+    If the whole batch call fails, each answer falls back to `evaluator`.
+    """
+    def __init__(self, evaluator: Evaluator, workers: int = 4, maxsize: int = 1000, job_timeout: float = 45.0,
+                 settle_timeout: float = 30.0, max_retries: int = 2, batch_evaluator: Optional[BatchEvaluator] = None,
+                 batch_size: int = 1, batch_hold: float = 300.0):
+        self.evaluator = evaluator
+        self.batch_evaluator = batch_evaluator if batch_size > 1 else None
+        self.batch_size = batch_size
+        self.batch_hold = batch_hold
+        self.workers = workers
+        self.job_timeout = job_timeout
+        self.settle_timeout = settle_timeout
+        self.max_retries = max_retries
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._workers: List[asyncio.Task] = []
+        # user_id -> futures of that candidate's queued/running jobs in this process
+        self._pending: Dict[str, Set[asyncio.Future]] = {}
+        # Batch mode: user_id -> jobs waiting for a full batch, and the timer that flushes them early
+        self._held: Dict[str, List[dict]] = {}
+        self._hold_timers: Dict[str, asyncio.TimerHandle] = {}
+        # Batches scored outside the workers (queue full); referenced so they aren't garbage-collected mid-run
+        self._detached: Set[asyncio.Task] = set()
+        self._in_flight = 0
+        self._wait_ms: deque = deque(maxlen=500)
+        self._run_ms: deque = deque(maxlen=500)
+        self.metrics = {
+            "enqueued": 0,
+            "completed": 0,
+            "failed": 0,
+            "inline": 0,        # Queue full; evaluated in the request instead
+            "reconciled": 0,    # Unscored rows picked up by settle()
+            "settle_timeouts": 0,
+            "batches": 0,       # Batch mode: LLM requests that scored several answers
+            "batched_jobs": 0
+        }
+
+    def start(self):
+        self._workers = [w for w in self._workers if not w.done()]
+        while len(self._workers) < self.workers:
+            # Fresh context: workers must not inherit the deadline of the request that started them
+            self._workers.append(asyncio.create_task(self._run(), context=contextvars.Context()))
+
+    async def stop(self, timeout: float = 10.0):
+        """Lets queued jobs finish, then stops the workers. Anything left stays unscored for settle()."""
+        if not self._workers:
+            return
+        for user_id in list(self._held):
+            self._flush(user_id)
+        try:
+            await asyncio.wait_for(asyncio.gather(self._queue.join(), *self._detached), timeout=timeout)
+        except asyncio.TimeoutError:
+            print(f"WARNING: Evaluation queue shutdown timed out with {self._queue.qsize()} jobs pending")
+        for w in self._workers:
+            w.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def enqueue(self, response_id: str, user_id: str, answer: str, category: str, q_metadata: dict):
+        # Started lazily so scripts without the app lifespan still get answers scored
+        self.start()
+        job = {
+            "response_id": response_id,
+            "user_id": user_id,
+            "answer": answer,
+            "category": category,
+            "metadata": q_metadata,
+            "enqueued_at": time.perf_counter(),
+            "done": asyncio.get_running_loop().create_future()
+        }
+        if self.batch_evaluator is not None:
+            self.metrics["enqueued"] += 1
+            self._pending.setdefault(user_id, set()).add(job["done"])
+            held = self._held.setdefault(user_id, [])
+            held.append(job)
+            if len(held) >= self.batch_size:
+                self._flush(user_id)
+            elif user_id not in self._hold_timers:
+                self._hold_timers[user_id] = asyncio.get_running_loop().call_later(self.batch_hold, self._flush, user_id)
+            return
+        try:
+            self._queue.put_nowait([job])
+        except asyncio.QueueFull:
+            # Back-pressure: score in the request rather than drop
+            self.metrics["inline"] += 1
+            await self._process(job)
+            return
+        self.metrics["enqueued"] += 1
+        self._pending.setdefault(user_id, set()).add(job["done"])
+
+    def _take_held(self, user_id: str) -> List[dict]:
+        timer = self._hold_timers.pop(user_id, None)
+        if timer is not None:
+            timer.cancel()
+        return self._held.pop(user_id, [])
+
+    def _flush(self, user_id: str):
+        """Moves a candidate's held answers onto the queue as one batch."""
+        jobs = self._take_held(user_id)
+        if not jobs:
+            return
+        try:
+            self._queue.put_nowait(jobs)
+        except asyncio.QueueFull:
+            # Back-pressure: nobody is awaiting a timer callback, so score on a detached task
+            self.metrics["inline"] += len(jobs)
+            task = asyncio.create_task(self._process_batch(jobs), context=contextvars.Context())
+            self._detached.add(task)
+            task.add_done_callback(self._detached.discard)
+
+    async def _run(self):
+        while True:
+            jobs = await self._queue.get()
+            try:
+                await self._process_batch(jobs)
+            finally:
+                self._queue.task_done()
+
+    def _forget(self, job: dict):
+        futures = self._pending.get(job["user_id"])
+        if futures is not None:
+            futures.discard(job["done"])
+            if not futures:
+                del self._pending[job["user_id"]]
+
+    async def _process_batch(self, jobs: List[dict]):
+        if self.batch_evaluator is None or len(jobs) == 1:
+            await asyncio.gather(*(self._process(job) for job in jobs))
+            return
+
+        start = time.perf_counter()
+        self._in_flight += len(jobs)
+        try:
+            with deadline_scope(self.job_timeout):
+                results = await self.batch_evaluator([(job["answer"], job["category"], job["metadata"]) for job in jobs])
+            if len(results) != len(jobs):
+                raise ValueError(f"batch evaluator returned {len(results)} results for {len(jobs)} answers")
+            self.metrics["batches"] += 1
+            self.metrics["batched_jobs"] += len(jobs)
+        except Exception as e:
+            print(f"DEBUG: Batch evaluation failed, scoring {len(jobs)} answers one by one: {str(e)}")
+            results = [None] * len(jobs)
+        finally:
+            self._in_flight -= len(jobs)
+        await asyncio.gather(*(self._process(job, result, start) for job, result in zip(jobs, results)))
+
+    async def _process(self, job: dict, evaluated: Optional[Tuple[int, dict]] = None, started: Optional[float] = None):
+        """Scores one job (unless a batch already did) and writes the result back."""
+        start = started or time.perf_counter()
+        self._wait_ms.append((start - job["enqueued_at"]) * 1000)
+        self._in_flight += 1
+        try:
+            if evaluated is None:
+                with deadline_scope(self.job_timeout):
+                    evaluated = await self.evaluator(job["answer"], job["category"], job["metadata"])
+            score, eval_meta = evaluated
+            await self._write_back(job["response_id"], score, {**job["metadata"], **eval_meta})
+            self.metrics["completed"] += 1
+        except Exception as e:
+            self.metrics["failed"] += 1
+            print(f"DEBUG: Answer evaluation failed for response {job['response_id']}: {str(e)}")
+        finally:
+            self._in_flight -= 1
+            self._run_ms.append((time.perf_counter() - start) * 1000)
+            if not job["done"].done():
+                job["done"].set_result(None)
+            self._forget(job)
+
+    async def _write_back(self, response_id: str, score: int, metadata: dict):
+        for attempt in range(self.max_retries + 1):
+            try:
+                await supabase.table("assessment_responses").update({
+                    "score": score,
+                    "evaluation_metadata": metadata
+                }).eq("id", response_id).is_("score", "null").execute()
+                return
+            except Exception:
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(min(0.5 * (2 ** attempt), 5))
+
+    async def settle(self, user_id: str) -> int:
+        """
+        Makes sure every answer of `user_id` has a score. Returns how many rows had to be
+        evaluated inline after waiting for the queue.
+        """
+        held = self._take_held(user_id)
+        if held:
+            await self._process_batch(held)
+
+        futures = list(self._pending.get(user_id, ()))
+        if futures:
+            _, still_pending = await asyncio.wait(futures, timeout=self.settle_timeout)
+            if still_pending:
+                self.metrics["settle_timeouts"] += 1
+
+        res = await supabase.table("assessment_responses")\
+            .select("id, raw_answer, category, evaluation_metadata")\
+            .eq("candidate_id", user_id)\
+            .is_("score", "null")\
+            .eq("is_skipped", False)\
+            .execute()
+        rows = res.data or []
+        if not rows:
+            return 0
+
+        jobs = [{
+            "response_id": r["id"],
+            "user_id": user_id,
+            "answer": r.get("raw_answer") or "",
+            "category": r["category"],
+            "metadata": r.get("evaluation_metadata") or {},
+            "enqueued_at": time.perf_counter(),
+            "done": asyncio.get_running_loop().create_future()
+        } for r in rows]
+        size = self.batch_size if self.batch_evaluator is not None else 1
+        await asyncio.gather(*(self._process_batch(jobs[i:i + size]) for i in range(0, len(jobs), size)))
+        self.metrics["reconciled"] += len(rows)
+        return len(rows)
+
+    @staticmethod
+    def _percentiles(samples: deque) -> dict:
+        if not samples:
+            return {"p50": None, "p95": None}
+        ordered = sorted(samples)
+        return {
+            "p50": round(ordered[int(0.5 * (len(ordered) - 1))], 1),
+            "p95": round(ordered[int(0.95 * (len(ordered) - 1))], 1)
+        }
+
+    def stats(self) -> dict:
+        return {
+            **self.metrics,
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "in_flight": self._in_flight,
+            "workers": len([w for w in self._workers if not w.done()]),
+            "candidates_pending": len(self._pending),
+            "mode": "batch" if self.batch_evaluator is not None else "single",
+            "held": sum(len(jobs) for jobs in self._held.values()),
+            "queue_wait_ms": self._percentiles(self._wait_ms),
+            "evaluation_ms": self._percentiles(self._run_ms)
+        }
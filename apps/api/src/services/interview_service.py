@@ -1,7 +1,8 @@
 from typing import List, Dict, Optional
 from datetime import datetime
 import uuid
-from src.core.supabase import supabase
+from src.core.supabase import async_supabase as supabase
+from src.services.recruiter_stats import recruiter_stats
 from src.schemas.interview import (
     InterviewProposeRequest, 
     InterviewStatus, 
@@ -15,7 +16,7 @@ class InterviewService:
         Recruiter proposes an interview with multiple slots.
         """
         # 1. Verify application exists and recruiter owns the job
-        app_res = supabase.table("job_applications").select("*, jobs(*)").eq("id", request.application_id).execute()
+        app_res = await supabase.table("job_applications").select("*, jobs(*)").eq("id", request.application_id).execute()
         if not app_res.data:
             raise ValueError("Application not found")
         
@@ -42,7 +43,7 @@ class InterviewService:
             room_id = f"tf-{uuid.uuid4().hex[:8]}"
             interview_data["meeting_link"] = f"https://meet.jit.si/{room_id}"
 
-        int_res = supabase.table("interviews").insert(interview_data).execute()
+        int_res = await supabase.table("interviews").insert(interview_data).execute()
         if not int_res.data:
             raise Exception("Failed to create interview")
         
@@ -57,11 +58,11 @@ class InterviewService:
                 "end_time": slot.end_time.isoformat()
             })
         
-        supabase.table("interview_slots").insert(slots_data).execute()
+        await supabase.table("interview_slots").insert(slots_data).execute()
 
         # 4. Notify Candidate
         from src.services.notification_service import NotificationService
-        NotificationService.create_notification(
+        await NotificationService.create_notification(
             user_id=app["candidate_id"],
             type="INTERVIEW_PROPOSED",
             title="Interview Invitation",
@@ -81,7 +82,7 @@ class InterviewService:
         Candidate confirms one of the proposed slots.
         """
         # 1. Get slot and verify candidate owns the interview
-        slot_res = supabase.table("interview_slots").select("*, interviews(*)").eq("id", slot_id).execute()
+        slot_res = await supabase.table("interview_slots").select("*, interviews(*)").eq("id", slot_id).execute()
         if not slot_res.data:
             raise ValueError("Slot not found")
         
@@ -92,25 +93,26 @@ class InterviewService:
         interview_id = slot["interview_id"]
 
         # 2. Update Slot selection
-        supabase.table("interview_slots").update({"is_selected": True}).eq("id", slot_id).execute()
+        await supabase.table("interview_slots").update({"is_selected": True}).eq("id", slot_id).execute()
         # Unselect others (optional but good for data integrity)
-        supabase.table("interview_slots").update({"is_selected": False}).eq("interview_id", interview_id).neq("id", slot_id).execute()
+        await supabase.table("interview_slots").update({"is_selected": False}).eq("interview_id", interview_id).neq("id", slot_id).execute()
 
         # 3. Update Interview Status
-        supabase.table("interviews").update({
+        await supabase.table("interviews").update({
             "status": InterviewStatus.SCHEDULED,
             "updated_at": datetime.now().isoformat()
         }).eq("id", interview_id).execute()
 
         # 4. Update Application Status to 'interview_scheduled'
-        supabase.table("job_applications").update({
+        await supabase.table("job_applications").update({
             "status": "interview_scheduled",
             "updated_at": datetime.now().isoformat()
         }).eq("id", slot["interviews"]["application_id"]).execute()
+        recruiter_stats.invalidate_job(slot["interviews"].get("job_id"))
 
         # 5. Notify Recruiter
         from src.services.notification_service import NotificationService
-        NotificationService.create_notification(
+        await NotificationService.create_notification(
             user_id=slot["interviews"]["recruiter_id"],
             type="INTERVIEW_CONFIRMED",
             title="Interview Slot Confirmed",
@@ -129,7 +131,7 @@ class InterviewService:
         Recruiter or Candidate cancels an interview.
         """
         # 1. Fetch interview
-        res = supabase.table("interviews").select("*").eq("id", interview_id).execute()
+        res = await supabase.table("interviews").select("*").eq("id", interview_id).execute()
         if not res.data:
             raise ValueError("Interview not found")
         
@@ -142,7 +144,7 @@ class InterviewService:
             raise ValueError("Unauthorized")
 
         # 3. Update status
-        supabase.table("interviews").update({
+        await supabase.table("interviews").update({
             "status": InterviewStatus.CANCELLED,
             "cancellation_reason": reason,
             "updated_at": datetime.now().isoformat()
@@ -150,15 +152,16 @@ class InterviewService:
 
         # 4. Revert application status if needed? 
         # Usually it stays 'shortlisted' if cancelled before happening
-        supabase.table("job_applications").update({
+        await supabase.table("job_applications").update({
             "status": "shortlisted",
             "updated_at": datetime.now().isoformat()
         }).eq("id", interview["application_id"]).execute()
+        recruiter_stats.invalidate_job(interview.get("job_id"))
 
         # 5. Notify the other party
         from src.services.notification_service import NotificationService
         target_id = interview["candidate_id"] if role == "recruiter" else interview["recruiter_id"]
-        NotificationService.create_notification(
+        await NotificationService.create_notification(
             user_id=target_id,
             type="INTERVIEW_CANCELLED",
             title=f"Interview Cancelled: {interview['round_name']}",
@@ -177,7 +180,7 @@ class InterviewService:
         Recruiter submits feedback and transitions candidate status.
         """
         # 1. Verify recruiter
-        res = supabase.table("interviews").select("*").eq("id", interview_id).execute()
+        res = await supabase.table("interviews").select("*").eq("id", interview_id).execute()
         if not res.data:
             raise ValueError("Interview not found")
         
@@ -186,23 +189,24 @@ class InterviewService:
             raise ValueError("Unauthorized")
 
         # 2. Update Interview
-        supabase.table("interviews").update({
+        await supabase.table("interviews").update({
             "status": InterviewStatus.COMPLETED,
             "feedback": feedback,
             "updated_at": datetime.now().isoformat()
         }).eq("id", interview_id).execute()
 
         # 3. Update Application with Decision
-        supabase.table("job_applications").update({
+        await supabase.table("job_applications").update({
             "status": next_status,
             "feedback": feedback, # High level feedback for candidate
             "updated_at": datetime.now().isoformat()
         }).eq("id", interview["application_id"]).execute()
+        recruiter_stats.invalidate_job(interview.get("job_id"))
 
         # 4. Trigger Notifications based on Decision
         from src.services.notification_service import NotificationService
         if next_status == "offered":
-            NotificationService.create_notification(
+            await NotificationService.create_notification(
                 user_id=interview["candidate_id"],
                 type="OFFER_RECEIVED",
                 title="Job Offer Received!",
@@ -210,7 +214,7 @@ class InterviewService:
                 metadata={"application_id": interview["application_id"]}
             )
         elif next_status == "rejected":
-            NotificationService.create_notification(
+            await NotificationService.create_notification(
                 user_id=interview["candidate_id"],
                 type="APPLICATION_REJECTED",
                 title="Application Update",
@@ -218,7 +222,7 @@ class InterviewService:
                 metadata={"application_id": interview["application_id"]}
             )
         elif next_status == "shortlisted":
-            NotificationService.create_notification(
+            await NotificationService.create_notification(
                 user_id=interview["candidate_id"],
                 type="INTERVIEW_PASSED",
                 title="Interview Feedback Received",
@@ -234,7 +238,7 @@ class InterviewService:
         Notify the other party that someone has joined the meeting.
         """
         # 1. Fetch interview
-        res = supabase.table("interviews").select("*").eq("id", interview_id).execute()
+        res = await supabase.table("interviews").select("*").eq("id", interview_id).execute()
         if not res.data:
             raise ValueError("Interview not found")
         
@@ -256,7 +260,7 @@ class InterviewService:
             message = f"Candidate for {interview['round_name']} has entered the meeting room."
             notif_type = "CANDIDATE_JOINED"
 
-        NotificationService.create_notification(
+        await NotificationService.create_notification(
             user_id=recipient_id,
             type=notif_type,
             title=title,
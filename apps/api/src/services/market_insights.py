@@ -0,0 +1,179 @@
+import time
+import asyncio
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from src.core.supabase import async_supabase as supabase
+from src.core.config import MARKET_INSIGHTS_REBUILD_INTERVAL, MARKET_INSIGHTS_MAX_STALENESS
+from src.services.skill_index import skill_index
+
+class MarketInsightsStore:
+    """
+    Materialized skill -> completed-candidate count and skill -> active-opening count.
+
+    Profiles, assessments and jobs push deltas in as they change, so reading the insights
+    never scans the pool. A background task rebuilds everything from the database every
+    `rebuild_interval` seconds to repair drift (other workers, manual edits), and a read
+    older than `max_staleness` seconds forces a rebuild first.
+    """
+    def __init__(self, rebuild_interval: int = 900, max_staleness: int = 1800):
+        self.rebuild_interval = rebuild_interval
+        self.max_staleness = max_staleness
+        # completed candidate user_id -> skill bitset, active job id -> skill bitset
+        self._candidates: Dict[str, int] = {}
+        self._jobs: Dict[str, int] = {}
+        self._candidate_counts: Dict[int, int] = {}
+        self._opening_counts: Dict[int, int] = {}
+        self._top: Optional[Tuple[List, List]] = None
+        self._built_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        # Deltas seen while a rebuild is reading the DB, replayed on top of the fresh state
+        self._replay: Optional[List[tuple]] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.metrics = {"rebuilds": 0, "rebuild_errors": 0, "deltas": 0, "last_rebuild_ms": 0.0}
+
+    # --- Deltas ---
+
+    @staticmethod
+    def _apply(table: Dict[str, int], counts: Dict[int, int], key: str, mask: Optional[int], only_if_present: bool = False):
+        if only_if_present and key not in table:
+            return
+        old = table.pop(key, None)
+        if old:
+            for skill_id in skill_index.ids(old):
+                counts[skill_id] -= 1
+                if not counts[skill_id]:
+                    del counts[skill_id]
+        if mask is not None:
+            table[key] = mask
+            for skill_id in skill_index.ids(mask):
+                counts[skill_id] = counts.get(skill_id, 0) + 1
+
+    def _delta(self, kind: str, key: str, mask: Optional[int], only_if_present: bool = False):
+        if self._replay is not None:
+            self._replay.append((kind, key, mask, only_if_present))
+        if kind == "candidate":
+            self._apply(self._candidates, self._candidate_counts, key, mask, only_if_present)
+        else:
+            self._apply(self._jobs, self._opening_counts, key, mask, only_if_present)
+        self._top = None
+        self.metrics["deltas"] += 1
+
+    def candidate_completed(self, user_id: str, skills: Optional[List[str]]):
+        """A candidate finished the assessment and now counts toward talent density."""
+        self._delta("candidate", user_id, skill_index.encode(skills))
+
+    def candidate_skills_changed(self, user_id: str, skills: Optional[List[str]]):
+        """Skills edited; only matters if the candidate is already counted."""
+        self._delta("candidate", user_id, skill_index.encode(skills), only_if_present=True)
+
+    def candidate_reset(self, user_id: str):
+        """Assessment reset for a retake; out of the completed pool until they finish again."""
+        self._delta("candidate", user_id, None)
+
+    def job_changed(self, job_id: str, skills: Optional[List[str]], status: Optional[str]):
+        self._delta("job", job_id, skill_index.encode(skills) if status == "active" else None)
+
+    def job_removed(self, job_id: str):
+        self._delta("job", job_id, None)
+
+    # --- Full rebuild ---
+
+    async def rebuild(self):
+        async with self._lock:
+            start = time.perf_counter()
+            self._replay = []
+            try:
+                candidate_res, jobs_res = await asyncio.gather(
+                    supabase.table("candidate_profiles").select("user_id, skills").eq("assessment_status", "completed").execute(),
+                    supabase.table("jobs").select("id, skills_required").eq("status", "active").execute()
+                )
+                candidates, candidate_counts = {}, {}
+                for cand in (candidate_res.data or []):
+                    self._apply(candidates, candidate_counts, cand["user_id"], skill_index.encode(cand.get("skills")))
+                jobs, opening_counts = {}, {}
+                for job in (jobs_res.data or []):
+                    self._apply(jobs, opening_counts, job["id"], skill_index.encode(job.get("skills_required")))
+
+                replay = self._replay
+                self._candidates, self._candidate_counts = candidates, candidate_counts
+                self._jobs, self._opening_counts = jobs, opening_counts
+                for kind, key, mask, only_if_present in replay:
+                    if kind == "candidate":
+                        self._apply(self._candidates, self._candidate_counts, key, mask, only_if_present)
+                    else:
+                        self._apply(self._jobs, self._opening_counts, key, mask, only_if_present)
+
+                self._top = None
+                self._built_at = time.time()
+                self.metrics["rebuilds"] += 1
+                self.metrics["last_rebuild_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            except Exception as e:
+                self.metrics["rebuild_errors"] += 1
+                print(f"Market insights rebuild failed: {str(e)}")
+            finally:
+                self._replay = None
+
+    async def _run(self):
+        while True:
+            await self.rebuild()
+            await asyncio.sleep(self.rebuild_interval)
+
+    def start(self):
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    # --- Reads ---
+
+    def _is_stale(self) -> bool:
+        return self._built_at is None or time.time() - self._built_at > self.max_staleness
+
+    async def snapshot(self) -> Dict:
+        if self._is_stale():
+            if self._lock.locked():
+                # A rebuild is already running; wait for it instead of starting another
+                async with self._lock:
+                    pass
+            if self._is_stale():
+                await self.rebuild()
+
+        if self._top is None:
+            top_skills = sorted(self._candidate_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+            top_job_skills = sorted(self._opening_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+            self._top = (top_skills, top_job_skills)
+        top_skills, top_job_skills = self._top
+
+        total_candidates = len(self._candidates)
+        return {
+            "talent_density": [
+                {"skill": skill_index.label(k), "count": v, "percentage": int((v/total_candidates)*100) if total_candidates > 0 else 0}
+                for k, v in top_skills
+            ],
+            "competition_index": [{"skill": skill_index.label(k), "active_openings": v} for k, v in top_job_skills],
+            "pool_size": total_candidates,
+            "market_state": "High Demand" if total_candidates < (len(self._jobs) * 2) else "Balanced",
+            "as_of": datetime.fromtimestamp(self._built_at, timezone.utc).isoformat() if self._built_at else None
+        }
+
+    def stats(self) -> dict:
+        return {
+            **self.metrics,
+            "candidates": len(self._candidates),
+            "active_jobs": len(self._jobs),
+            "age_seconds": round(time.time() - self._built_at, 1) if self._built_at else None,
+            "worker_running": self._worker is not None and not self._worker.done()
+        }
+
+market_insights = MarketInsightsStore(
+    rebuild_interval=MARKET_INSIGHTS_REBUILD_INTERVAL,
+    max_staleness=MARKET_INSIGHTS_MAX_STALENESS
+)
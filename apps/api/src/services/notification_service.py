@@ -1,16 +1,145 @@
-from src.core.supabase import supabase
+import time
+import asyncio
+from typing import List, Optional
+from src.core.supabase import async_supabase as supabase
+from src.core.config import (
+    NOTIFICATION_BATCH_SIZE,
+    NOTIFICATION_LINGER_MS,
+    NOTIFICATION_MAX_RETRIES,
+    NOTIFICATION_QUEUE_SIZE
+)
+
+class NotificationOutbox:
+    """
+    In-process outbox for notifications.
+    Rows are queued by create_notification() and a background task writes them with
+    multi-row inserts: a batch goes out when it reaches `batch_size` or `linger_ms`
+    after its first row, whichever comes first. Failed batches are retried with backoff.
+    """
+    def __init__(self, batch_size: int = 100, linger_ms: int = 50, max_retries: int = 3, maxsize: int = 10000):
+        self.batch_size = batch_size
+        self.linger = linger_ms / 1000
+        self.max_retries = max_retries
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._worker: Optional[asyncio.Task] = None
+        self.metrics = {
+            "enqueued": 0,
+            "flushed": 0,
+            "batches": 0,
+            "retries": 0,
+            "failed": 0,
+            "direct_writes": 0,
+            "last_flush_ms": 0.0
+        }
+
+    def start(self):
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0):
+        """Flushes everything still queued, then stops the worker (called on shutdown)."""
+        if self._worker is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            print(f"WARNING: Notification outbox shutdown timed out with {self._queue.qsize()} rows pending")
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    async def enqueue(self, row: dict):
+        # Started lazily so scripts and tests without the app lifespan still deliver
+        self.start()
+        try:
+            self._queue.put_nowait(row)
+            self.metrics["enqueued"] += 1
+        except asyncio.QueueFull:
+            # Back-pressure: write inline rather than drop
+            self.metrics["direct_writes"] += 1
+            await self._insert([row])
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.linger
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch: List[dict]):
+        start = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self._insert(batch)
+                self.metrics["flushed"] += len(batch)
+                self.metrics["batches"] += 1
+                self.metrics["last_flush_ms"] = round((time.perf_counter() - start) * 1000, 1)
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self.metrics["failed"] += len(batch)
+                    print(f"Failed to create {len(batch)} notifications after {attempt + 1} attempts: {e}")
+                    return
+                self.metrics["retries"] += 1
+                await asyncio.sleep(min(0.5 * (2 ** attempt), 5))
+
+    async def _insert(self, rows: List[dict]):
+        await supabase.table("notifications").insert(rows).execute()
+
+    def stats(self) -> dict:
+        return {
+            **self.metrics,
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "worker_running": self._worker is not None and not self._worker.done()
+        }
+
+notification_outbox = NotificationOutbox(
+    batch_size=NOTIFICATION_BATCH_SIZE,
+    linger_ms=NOTIFICATION_LINGER_MS,
+    max_retries=NOTIFICATION_MAX_RETRIES,
+    maxsize=NOTIFICATION_QUEUE_SIZE
+)
 
 class NotificationService:
     @staticmethod
-    def create_notification(user_id: str, type: str, title: str, message: str, metadata: dict = None):
-        """Create a notification in the database."""
+    async def create_notification(user_id: str, type: str, title: str, message: str, metadata: dict = None):
+        """Queue a notification for the batched outbox writer."""
         try:
-            supabase.table("notifications").insert({
+            await notification_outbox.enqueue({
                 "user_id": user_id,
                 "type": type,
                 "title": title,
                 "message": message,
                 "metadata": metadata or {}
-            }).execute()
+            })
         except Exception as e:
             print(f"Failed to create notification: {e}")
+
+    @staticmethod
+    async def create_notifications(notifications: List[dict]):
+        """Queue many notifications at once (same fields as create_notification)."""
+        for n in notifications:
+            await NotificationService.create_notification(
+                user_id=n["user_id"],
+                type=n["type"],
+                title=n["title"],
+                message=n["message"],
+                metadata=n.get("metadata")
+            )
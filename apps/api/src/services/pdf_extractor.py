@@ -0,0 +1,94 @@
+import time
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+from src.utils.pdf_text import extract_pdf_text
+from src.core.config import PDF_EXTRACT_WORKERS, PDF_EXTRACT_MAX_PENDING, RESUME_TEXT_MAX_CHARS
+
+class PdfTextExtractor:
+    """
+    Runs pypdf text extraction in a small process pool so a long PDF never blocks the event loop.
+
+    At most `max_pending` documents are handed to the pool at once; further callers wait
+    (asynchronously) for a slot. Pages are extracted in order and extraction stops once
+    `max_chars` of text has been collected, since the parse prompts never use more than that.
+    """
+    def __init__(self, workers: int = 2, max_pending: int = 8, max_chars: int = 12000):
+        self.workers = workers
+        self.max_chars = max_chars
+        self._slots = asyncio.Semaphore(max_pending)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._waiting = 0
+        self._in_flight = 0
+        self.metrics = {
+            "documents": 0,
+            "failed": 0,
+            "pages_read": 0,
+            "pages_skipped": 0, # Pages never parsed thanks to the character cut-off
+            "pool_restarts": 0,
+            "last_ms": 0.0,
+            "total_ms": 0.0
+        }
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: forking a process that already runs an event loop and HTTP clients isn't safe
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    async def extract(self, pdf_bytes: bytes) -> str:
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+        try:
+            self._in_flight += 1
+            start = time.perf_counter()
+            loop = asyncio.get_running_loop()
+            try:
+                result = await loop.run_in_executor(self._get_pool(), extract_pdf_text, pdf_bytes, self.max_chars)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM on a hostile PDF); start a fresh pool for the next caller
+                self.metrics["pool_restarts"] += 1
+                self.metrics["failed"] += 1
+                self._pool = None
+                raise
+            except Exception:
+                self.metrics["failed"] += 1
+                raise
+        finally:
+            self._in_flight -= 1
+            self._slots.release()
+
+        elapsed = (time.perf_counter() - start) * 1000
+        self.metrics["documents"] += 1
+        self.metrics["pages_read"] += result["pages_read"]
+        self.metrics["pages_skipped"] += result["pages_total"] - result["pages_read"]
+        self.metrics["last_ms"] = round(elapsed, 1)
+        self.metrics["total_ms"] += elapsed
+        print(f"DEBUG: PDF extracted {len(result['text'])} chars from {result['pages_read']}/{result['pages_total']} pages in {elapsed:.0f}ms")
+        return result["text"]
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict:
+        docs = self.metrics["documents"]
+        return {
+            **{k: v for k, v in self.metrics.items() if k != "total_ms"},
+            "avg_ms": round(self.metrics["total_ms"] / docs, 1) if docs else 0.0,
+            "workers": self.workers,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting
+        }
+
+pdf_extractor = PdfTextExtractor(
+    workers=PDF_EXTRACT_WORKERS,
+    max_pending=PDF_EXTRACT_MAX_PENDING,
+    max_chars=RESUME_TEXT_MAX_CHARS
+)
@@ -0,0 +1,166 @@
+import json
+import time
+import asyncio
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Tuple
+from cachetools import LRUCache
+from src.utils.pdf_generator import init_templates, render_resume_pdf
+from src.core.config import (
+    PDF_RENDER_WORKERS,
+    PDF_RENDER_MAX_PENDING,
+    PDF_RENDER_MAX_QUEUE,
+    PDF_RENDER_CACHE_MAX_BYTES,
+    PDF_TEMPLATE_CACHE_DIR
+)
+
+class RendererBusy(Exception):
+    """Raised when the render queue is full; callers should answer 503 and let the client retry."""
+
+class PdfRenderService:
+    """
+    Resume PDF rendering off the event loop.
+
+    - Worker processes compile every template once at start-up (with an on-disk bytecode cache)
+      and render with xhtml2pdf; at most `max_pending` renders are in the pool at a time.
+    - Up to `max_queue` further callers wait for a slot; beyond that render() raises RendererBusy.
+    - Output is cached per (template, hash of the data) in an LRU bounded by total bytes, and
+      identical renders already in progress are shared.
+    """
+    def __init__(self, workers: int = 2, max_pending: int = 4, max_queue: int = 32,
+                 cache_max_bytes: int = 64 * 1024 * 1024, bytecode_dir: Optional[str] = None):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.bytecode_dir = bytecode_dir
+        self._slots = asyncio.Semaphore(max_pending)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._cache: LRUCache = LRUCache(maxsize=cache_max_bytes, getsizeof=len)
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._waiting = 0
+        self._in_flight = 0
+        self.metrics = {
+            "renders": 0,
+            "cache_hits": 0,
+            "coalesced": 0,
+            "rejected": 0,
+            "failed": 0,
+            "pool_restarts": 0,
+            "last_ms": 0.0,
+            "total_ms": 0.0
+        }
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_templates,
+                initargs=(self.bytecode_dir,)
+            )
+        return self._pool
+
+    @staticmethod
+    def cache_key(data: dict, template_name: str) -> Tuple[str, str]:
+        blob = json.dumps(data, sort_keys=True, default=str, separators=(",", ":"))
+        return template_name, hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    async def render(self, data: dict, template_name: str = "professional") -> bytes:
+        key = self.cache_key(data, template_name)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self.metrics["cache_hits"] += 1
+            return cached
+        while key in self._inflight:
+            inflight = self._inflight[key]
+            try:
+                pdf = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise # We were cancelled ourselves
+                # The leader's request was cancelled (client gone): take over or follow the next leader
+                continue
+            self.metrics["coalesced"] += 1
+            return pdf
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            pdf = await self._render_in_pool(data, template_name)
+            self._cache[key] = pdf
+            future.set_result(pdf)
+            return pdf
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception() # Mark retrieved so a future nobody awaited doesn't log a warning
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _render_in_pool(self, data: dict, template_name: str) -> bytes:
+        if self._waiting >= self.max_queue:
+            self.metrics["rejected"] += 1
+            raise RendererBusy("PDF renderer is busy, please retry shortly")
+
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+        try:
+            self._in_flight += 1
+            start = time.perf_counter()
+            try:
+                pdf = await asyncio.get_running_loop().run_in_executor(self._get_pool(), render_resume_pdf, data, template_name)
+            except BrokenProcessPool:
+                self.metrics["pool_restarts"] += 1
+                self.metrics["failed"] += 1
+                self._pool = None
+                raise
+            except Exception:
+                self.metrics["failed"] += 1
+                raise
+        finally:
+            self._in_flight -= 1
+            self._slots.release()
+
+        elapsed = (time.perf_counter() - start) * 1000
+        self.metrics["renders"] += 1
+        self.metrics["last_ms"] = round(elapsed, 1)
+        self.metrics["total_ms"] += elapsed
+        return pdf
+
+    def start(self):
+        """Spawns the workers ahead of the first request so nobody pays for start-up."""
+        pool = self._get_pool()
+        for _ in range(self.workers):
+            pool.submit(int) # Trivial task; forces each worker (and its template compile) to start
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict:
+        renders = self.metrics["renders"]
+        return {
+            **{k: v for k, v in self.metrics.items() if k != "total_ms"},
+            "avg_ms": round(self.metrics["total_ms"] / renders, 1) if renders else 0.0,
+            "workers": self.workers,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "cache_entries": len(self._cache),
+            "cache_bytes": self._cache.currsize
+        }
+
+pdf_renderer = PdfRenderService(
+    workers=PDF_RENDER_WORKERS,
+    max_pending=PDF_RENDER_MAX_PENDING,
+    max_queue=PDF_RENDER_MAX_QUEUE,
+    cache_max_bytes=PDF_RENDER_CACHE_MAX_BYTES,
+    bytecode_dir=PDF_TEMPLATE_CACHE_DIR
+)
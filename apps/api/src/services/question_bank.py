@@ -0,0 +1,177 @@
+import time
+import random
+import asyncio
+from typing import Dict, Iterable, List, Optional, Tuple
+from src.core.supabase import async_supabase as supabase
+from src.core.config import QUESTION_BANK_CHECK_INTERVAL, QUESTION_BANK_RELOAD_INTERVAL
+
+PAGE_SIZE = 1000
+MAX_RANDOM_PROBES = 8
+
+class QuestionBank:
+    """
+    In-memory index of the seeded `assessment_questions` bank.
+
+    Every question gets a compact integer index (its position in `self._questions`); pools are
+    lists of indexes keyed by (category, experience_band) plus a per-category pool for the
+    any-band fallback. A session's used questions are an int bitset over those indexes, so a
+    pick is a few random probes into a pool instead of a `not in (...)` query.
+
+    The bank is small and rarely edited, so it is loaded whole. A background loop compares a
+    cheap (row count, newest created_at) fingerprint every `check_interval` seconds and reloads
+    on change; a full reload also runs every `reload_interval` to pick up in-place edits.
+    """
+    def __init__(self, check_interval: int = 60, reload_interval: int = 1800):
+        self.check_interval = check_interval
+        self.reload_interval = reload_interval
+        self._questions: List[dict] = []
+        self._index_of: Dict[str, int] = {}
+        self._pools: Dict[Tuple[str, str], List[int]] = {}
+        self._category_pools: Dict[str, List[int]] = {}
+        self._fingerprint: Optional[Tuple] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.version = 0 # Bumped on every reload; bitsets from an older version must be rebuilt
+        self.loaded_at: Optional[float] = None
+        self.metrics = {"reloads": 0, "picks": 0, "probes": 0, "scans": 0, "exhausted": 0}
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    # --- Loading ---
+
+    async def _fetch_fingerprint(self) -> Tuple:
+        count_res, newest_res = await asyncio.gather(
+            supabase.table("assessment_questions").select("id", count="exact", head=True).execute(),
+            supabase.table("assessment_questions").select("created_at").order("created_at", desc=True).limit(1).execute()
+        )
+        return (count_res.count or 0, newest_res.data[0]["created_at"] if newest_res.data else None)
+
+    async def reload(self):
+        async with self._lock:
+            await self._load()
+
+    async def _load(self):
+        fingerprint = await self._fetch_fingerprint()
+        rows: List[dict] = []
+        offset = 0
+        while True:
+            res = await supabase.table("assessment_questions").select("*").order("id").range(offset, offset + PAGE_SIZE - 1).execute()
+            rows.extend(res.data or [])
+            if len(res.data or []) < PAGE_SIZE:
+                break
+            offset += PAGE_SIZE
+
+        questions, index_of = [], {}
+        pools: Dict[Tuple[str, str], List[int]] = {}
+        category_pools: Dict[str, List[int]] = {}
+        for row in rows:
+            idx = len(questions)
+            questions.append(row)
+            index_of[row["id"]] = idx
+            pools.setdefault((row.get("category"), row.get("experience_band")), []).append(idx)
+            category_pools.setdefault(row.get("category"), []).append(idx)
+
+        # Swap in one go so readers never see a half-built index
+        self._questions, self._index_of = questions, index_of
+        self._pools, self._category_pools = pools, category_pools
+        self._fingerprint = fingerprint
+        self.version += 1
+        self.loaded_at = time.time()
+        self.metrics["reloads"] += 1
+        print(f"DEBUG: Question bank loaded {len(questions)} questions in {len(pools)} pools")
+
+    async def ensure_loaded(self):
+        if not self.loaded:
+            async with self._lock:
+                if not self.loaded: # Another caller may have loaded it while we waited
+                    await self._load()
+
+    async def refresh_if_changed(self):
+        if self.loaded_at and time.time() - self.loaded_at >= self.reload_interval:
+            await self.reload()
+            return
+        if await self._fetch_fingerprint() != self._fingerprint:
+            await self.reload()
+
+    # --- Background loop ---
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                if self.loaded:
+                    await self.refresh_if_changed()
+                else:
+                    await self.reload()
+            except Exception as e:
+                print(f"DEBUG: Question bank refresh failed: {str(e)}")
+            await asyncio.sleep(self.check_interval)
+
+    # --- Exclusion bitsets ---
+
+    def mask(self, question_ids: Iterable[str]) -> int:
+        """Bitset of the given question IDs (unknown IDs, e.g. AI questions, are ignored)."""
+        m = 0
+        for qid in question_ids:
+            idx = self._index_of.get(qid)
+            if idx is not None:
+                m |= 1 << idx
+        return m
+
+    def bit(self, question_id: Optional[str]) -> int:
+        idx = self._index_of.get(question_id)
+        return 1 << idx if idx is not None else 0
+
+    # --- Selection ---
+
+    def _pick_from(self, pool: List[int], excluded: int) -> Optional[int]:
+        # Random probes are O(1) while most of the pool is still unused...
+        for _ in range(MAX_RANDOM_PROBES):
+            self.metrics["probes"] += 1
+            idx = pool[random.randrange(len(pool))]
+            if not (excluded >> idx) & 1:
+                return idx
+        # ...and a single scan settles it once the pool is nearly exhausted
+        self.metrics["scans"] += 1
+        remaining = [idx for idx in pool if not (excluded >> idx) & 1]
+        return random.choice(remaining) if remaining else None
+
+    def pick(self, category: str, band: str, excluded: int = 0) -> Optional[dict]:
+        """
+        Random unused question for (category, band), falling back to any band for the category.
+        Returns None if the category is empty or exhausted.
+        """
+        self.metrics["picks"] += 1
+        for pool in (self._pools.get((category, band)), self._category_pools.get(category)):
+            if pool:
+                idx = self._pick_from(pool, excluded)
+                if idx is not None:
+                    return self._questions[idx]
+        self.metrics["exhausted"] += 1
+        return None
+
+    def stats(self) -> dict:
+        return {
+            **self.metrics,
+            "loaded": self.loaded,
+            "version": self.version,
+            "questions": len(self._questions),
+            "pools": {f"{c}:{b}": len(p) for (c, b), p in self._pools.items()},
+            "loaded_at": self.loaded_at
+        }
+
+question_bank = QuestionBank(check_interval=QUESTION_BANK_CHECK_INTERVAL, reload_interval=QUESTION_BANK_RELOAD_INTERVAL)
@@ -0,0 +1,123 @@
+import json
+import random
+import asyncio
+import hashlib
+import contextvars
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+from src.core.supabase import async_supabase as supabase
+from src.services.assessment_state import assessment_state
+
+# Bump whenever the generation prompts change; pools built by older versions are rebuilt on the next trigger
+QUESTION_POOL_VERSION = "pool-v1"
+
+# (band, resume summary, skills) -> [{"text", "category", "driver", "difficulty"}, ...]
+PoolGenerator = Callable[[str, Optional[dict], List[str]], Awaitable[List[dict]]]
+
+class QuestionPool:
+    """
+    Candidate-specific resume and skill questions, generated before the assessment starts.
+
+    schedule(user_id) is called after a successful resume parse or skills update: a background
+    task reads the candidate's band, skills and resume summary, generates the questions and
+    stores them in `candidate_question_pool`. The assessment session state loads the pool with
+    everything else, and question selection draws from it, so no LLM call sits on the path of
+    /assessment/next. Inputs are fingerprinted; a rebuild with unchanged inputs is skipped.
+
+    One build per candidate at a time (a newer trigger cancels the running one); at most
+    `concurrent_builds` builds run across candidates.
+    """
+    def __init__(self, generator: PoolGenerator, concurrent_builds: int = 4, enabled: bool = True):
+        self.generator = generator
+        self.enabled = enabled
+        self._builds: Dict[str, asyncio.Task] = {}
+        self._slots = asyncio.Semaphore(concurrent_builds)
+        self.metrics = {"scheduled": 0, "built": 0, "unchanged": 0, "failed": 0, "questions": 0, "draws": 0, "empty_draws": 0}
+
+    def schedule(self, user_id: str, force: bool = False):
+        """Starts (or restarts) a background build for `user_id`. `force` rebuilds even if inputs are unchanged."""
+        if not self.enabled:
+            return
+        running = self._builds.get(user_id)
+        if running is not None and not running.done():
+            running.cancel()
+        # Fresh context: the build must not inherit the deadline of the request that triggered it
+        task = asyncio.create_task(self._build(user_id, force), context=contextvars.Context())
+        self._builds[user_id] = task
+        task.add_done_callback(lambda t: self._builds.pop(user_id, None) if self._builds.get(user_id) is t else None)
+        self.metrics["scheduled"] += 1
+
+    def ensure(self, user_id: str):
+        """Schedules a build unless one is already running (candidates whose pool predates this feature)."""
+        if user_id not in self._builds:
+            self.schedule(user_id)
+
+    async def _build(self, user_id: str, force: bool):
+        try:
+            async with self._slots:
+                profile_res, resume_res, pool_res = await asyncio.gather(
+                    supabase.table("candidate_profiles").select("experience, skills").eq("user_id", user_id).execute(),
+                    supabase.table("resume_data").select("timeline, career_gaps, achievements").eq("user_id", user_id).execute(),
+                    supabase.table("candidate_question_pool").select("source_hash").eq("candidate_id", user_id).execute()
+                )
+                profile = profile_res.data[0] if profile_res.data else {}
+                resume = resume_res.data[0] if resume_res.data else None
+                band = profile.get("experience") or "fresher"
+                skills = profile.get("skills") or []
+
+                source_hash = hashlib.sha256(json.dumps(
+                    [QUESTION_POOL_VERSION, band, skills, resume], sort_keys=True, default=str
+                ).encode()).hexdigest()
+                if not force and pool_res.data and pool_res.data[0].get("source_hash") == source_hash:
+                    self.metrics["unchanged"] += 1
+                    return
+
+                questions = [q for q in await self.generator(band, resume, skills) if q and q.get("text")]
+                await supabase.table("candidate_question_pool").upsert({
+                    "candidate_id": user_id,
+                    "questions": questions,
+                    "source_hash": source_hash,
+                    "built_at": "now()"
+                }).execute()
+
+            # Hand the new pool to a live session snapshot so the next question can use it
+            state = assessment_state.peek(user_id)
+            if state is not None:
+                state.pool = questions
+            self.metrics["built"] += 1
+            self.metrics["questions"] += len(questions)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.metrics["failed"] += 1
+            print(f"DEBUG: Question pool build failed for {user_id}: {str(e)}")
+
+    async def stop(self):
+        """Cancels running builds; they are retried by the next trigger or the first /assessment/next."""
+        tasks = list(self._builds.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def draw(self, pool: Optional[List[dict]], category: str, exclude_texts: Set[str],
+             exclude_drivers: Optional[Set[str]] = None, prefer_drivers: tuple = ()) -> Optional[dict]:
+        """
+        Random unasked pool question of `category`. Questions whose driver is in `prefer_drivers`
+        win (in that order), then any whose driver isn't in `exclude_drivers`, then any unasked one.
+        """
+        self.metrics["draws"] += 1
+        fresh = [q for q in pool or () if q.get("category") == category and q.get("text") not in exclude_texts]
+        tiers = [[q for q in fresh if q.get("driver") == d] for d in prefer_drivers]
+        tiers.append([q for q in fresh if q.get("driver") not in (exclude_drivers or set())])
+        tiers.append(fresh)
+        for tier in tiers:
+            if tier:
+                return dict(random.choice(tier))
+        self.metrics["empty_draws"] += 1
+        return None
+
+    def stats(self) -> dict:
+        return {
+            **self.metrics,
+            "enabled": self.enabled,
+            "building": len(self._builds)
+        }
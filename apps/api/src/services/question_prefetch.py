@@ -0,0 +1,108 @@
+import asyncio
+import contextvars
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from cachetools import TTLCache
+from src.core.config import QUESTION_PREFETCH_ENABLED, QUESTION_PREFETCH_TTL, QUESTION_PREFETCH_MAXSIZE
+
+class QuestionPrefetcher:
+    """
+    Speculative next-question pipeline for assessment sessions.
+
+    When question N is served, question N+1 is selected and generated in the background against
+    the plan the session will have once N is answered (category counts, step, last category).
+    That expected plan is stored as a fingerprint next to the task. The next /assessment/next
+    call takes the prefetched question only if the real plan matches; otherwise it's discarded
+    and the caller generates synchronously as before.
+
+    One pending prefetch per candidate; entries expire after `ttl` seconds (abandoned sessions).
+    """
+    def __init__(self, ttl: int = 1800, maxsize: int = 10000, enabled: bool = True):
+        self.enabled = enabled
+        # user_id -> {"session_id", "step", "fingerprint", "task"}
+        self._entries: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.metrics = {
+            "scheduled": 0,
+            "hits": 0,          # Served a prefetched question (ready or still finishing)
+            "hits_ready": 0,    # ...of which were already generated when asked for
+            "misses": 0,        # Nothing usable; question generated synchronously
+            "invalidated": 0,   # Dropped because the plan changed under it
+            "failed": 0
+        }
+
+    def schedule(self, user_id: str, session_id: Any, step: int, fingerprint: Tuple, producer: Callable[[], Awaitable[Optional[Dict]]]):
+        """Starts generating the question for `step`, replacing any older prefetch for this candidate."""
+        if not self.enabled:
+            return
+        self.invalidate(user_id, count=False)
+        self._entries[user_id] = {
+            "session_id": session_id,
+            "step": step,
+            "fingerprint": fingerprint,
+            # Fresh context: generation must not inherit the deadline of the request that scheduled it
+            "task": asyncio.create_task(self._run(user_id, producer), context=contextvars.Context())
+        }
+        self.metrics["scheduled"] += 1
+
+    async def _run(self, user_id: str, producer: Callable[[], Awaitable[Optional[Dict]]]) -> Optional[Dict]:
+        try:
+            return await producer()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"DEBUG: Question prefetch failed for {user_id}: {str(e)}")
+            return None
+
+    async def take(self, user_id: str, session_id: Any, step: int, fingerprint: Tuple) -> Optional[Dict]:
+        """Returns the prefetched question for `step` if it was generated for this exact plan, else None."""
+        entry = self._entries.pop(user_id, None)
+        if entry is None:
+            if self.enabled:
+                self.metrics["misses"] += 1
+            return None
+
+        task: asyncio.Task = entry["task"]
+        if (entry["session_id"], entry["step"], entry["fingerprint"]) != (session_id, step, fingerprint):
+            task.cancel()
+            self.metrics["invalidated"] += 1
+            self.metrics["misses"] += 1
+            return None
+
+        ready = task.done()
+        try:
+            question = await task
+        except asyncio.CancelledError:
+            question = None
+        if not question or not question.get("text"):
+            self.metrics["failed"] += 1
+            self.metrics["misses"] += 1
+            return None
+
+        self.metrics["hits"] += 1
+        if ready:
+            self.metrics["hits_ready"] += 1
+        return question
+
+    def invalidate(self, user_id: str, count: bool = True):
+        """Drops (and cancels) a candidate's pending prefetch, e.g. on retake or profile changes."""
+        entry = self._entries.pop(user_id, None)
+        if entry is None:
+            return
+        if not entry["task"].done():
+            entry["task"].cancel()
+        if count:
+            self.metrics["invalidated"] += 1
+
+    def stats(self) -> dict:
+        lookups = self.metrics["hits"] + self.metrics["misses"]
+        return {
+            **self.metrics,
+            "enabled": self.enabled,
+            "pending": len(self._entries),
+            "hit_rate": round(self.metrics["hits"] / lookups, 3) if lookups else 0.0
+        }
+
+question_prefetcher = QuestionPrefetcher(
+    ttl=QUESTION_PREFETCH_TTL,
+    maxsize=QUESTION_PREFETCH_MAXSIZE,
+    enabled=QUESTION_PREFETCH_ENABLED
+)
@@ -1,73 +1,73 @@
 import json
+import math
+import uuid
+import base64
 import random
-import httpx
 import asyncio
-from bs4 import BeautifulSoup
 from typing import List, Dict, Optional, Any
 from datetime import datetime
-from src.core.supabase import supabase
-import google.generativeai as genai
-from src.core.config import GOOGLE_API_KEY, OPENROUTER_API_KEY
+from src.core.supabase import async_supabase as supabase
+from src.core.role_cache import role_cache
+from src.services.website_fetcher import website_fetcher, normalize_url
+from src.core.signed_url_cache import signed_url_cache
+from src.services.skill_index import skill_index
+from src.services.market_insights import market_insights
+from src.services.recruiter_stats import recruiter_stats
+from src.core.llm_gateway import llm_gateway
+from src.core.llm_metrics import llm_metrics
+from src.core.generation_cache import generation_cache
+from src.services.batch_evaluator import batch_evaluator
+from src.core.config import EVALUATION_MODE, EVALUATION_BATCH_SIZE
+
+# Shared rubric for batch scoring of recruiter answers: sent once per request instead of once per answer
+RECRUITER_BATCH_INSTRUCTIONS = """
+Act as an unbiased Corporate Quality Auditor. Evaluate each recruiter answer below to determine the "Company Profile Score".
+
+STRICT EVALUATION RULES:
+1. PERSPECTIVE: Evaluate based on structural signals, not sentiment. A polite but vague answer scores LOWER than a direct, data-rich answer.
+2. UNBIASED: Disregard company size or flavor. Look for clarity of intent and specificity of the 'Cultural DNA'.
+3. CATEGORY CONTEXT (given per item):
+   - recruiter_intent: Evaluate the clarity of the company's "Soul" and long-term vision. Look for 'Universal DNA' traits that apply to *every* hire.
+   - recruiter_icp: Evaluate how precisely they define high performance beyond technical skills.
+   - recruiter_ethics: Evaluate the commitment to fairness and the elimination of unconscious bias.
+   - recruiter_cvp: Evaluate the strength of the "Employer Brand" and non-monetary value.
+   - recruiter_ownership: Evaluate the recruiter's accountability for the candidate's long-term success.
+
+SCORING RUBRIC (0.0 to 6.0):
+- 0-2 (Weak): Irrelevant, generic platitudes, or non-committal.
+- 3-4 (Moderate): Addresses the prompt with some concrete details.
+- 5-6 (Strong): Exceptional precision, evidence of structured thinking, and clear accountability.
+
+Dimensions to score (0-6 each):
+1. Relevance: Did they answer the specific question?
+2. Specificity: Presence of concrete details (names, traits, timelines, reasons).
+3. Clarity: Is the response logically structured and professional?
+4. Ownership: Does the answer show accountability and serious organizational intent?
+"""
+RECRUITER_BATCH_FIELDS = '"relevance": float, "specificity": float, "clarity": float, "ownership": float, "reasoning": "brief, objective justification (max 20 words)"'
+RECRUITER_DIMENSIONS = ("relevance", "specificity", "clarity", "ownership")
 
 class RecruiterService:
-    def __init__(self):
-        genai.configure(api_key=GOOGLE_API_KEY)
-        # Migrated to Gemini 3 Flash (Preview) for Elite Recruitment Audits
-        self.model = genai.GenerativeModel('gemini-3-flash-preview')
-        self._client = httpx.AsyncClient(timeout=30.0)
+    AI_ROUTE = ("gemini", "openrouter")
 
-    async def _call_ai(self, prompt: str, system_message: str = "You are a helpful recruitment assistant.") -> str:
+    async def _call_ai(self, prompt: str, system_message: str = "You are a helpful recruitment assistant.", site: str = "recruiter") -> str:
         """
-        Unified High-Precision AI Caller (Gemini primary + GPT-4o-mini secondary).
-        Ensures evaluation and generation never fail as per elite requirements.
+        Unified High-Precision AI Caller (Gemini primary + GPT-4o-mini hedged secondary)
+        via the shared LLM gateway. Returns "" if every provider failed.
         """
-        # 1. PRIMARY: Gemini 3 Flash (Async)
-        try:
-            response = await asyncio.wait_for(self.model.generate_content_async(prompt), timeout=15.0)
-            if response and response.text:
-                return response.text.strip()
-        except Exception as e:
-            print(f"DEBUG: Recruiter Gemini Primary Failed: {str(e)}. Falling back to OpenRouter...")
-
-        # 2. SECONDARY: OpenRouter (GPT-4o-mini)
-        if OPENROUTER_API_KEY:
-            try:
-                response = await self._client.post(
-                    "https://openrouter.ai/api/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                        "Content-Type": "application/json",
-                        "X-Title": "TalentFlow"
-                    },
-                    json={
-                        "model": "openai/gpt-4o-mini",
-                        "messages": [
-                            {"role": "system", "content": system_message},
-                            {"role": "user", "content": prompt}
-                        ],
-                        "temperature": 0.4
-                    }
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    return data['choices'][0]['message']['content'].strip()
-                else:
-                    print(f"DEBUG: Recruiter OpenRouter Failed ({response.status_code}): {response.text}")
-            except Exception as or_e:
-                print(f"DEBUG: Recruiter OpenRouter Critical Failure: {str(or_e)}")
-        
-        # 3. TERTIARY: Extreme Fallback (Retry Gemini)
-        try:
-            response = await asyncio.wait_for(self.model.generate_content_async(prompt), timeout=10.0)
-            return response.text.strip()
-        except:
-            return ""
-
-    async def _call_ai_json(self, prompt: str, system_message: str = "You are a helpful recruitment assistant.") -> Dict[str, Any]:
+        return await llm_gateway.complete(
+            prompt,
+            system_message,
+            route=self.AI_ROUTE,
+            temperature=0.4,
+            site=site
+        ) or ""
+
+    async def _call_ai_json(self, prompt: str, system_message: str = "You are a helpful recruitment assistant.", site: str = "recruiter") -> Dict[str, Any]:
         """
         Helper to call AI and return a parsed JSON object.
         """
-        res_text = await self._call_ai(prompt, system_message)
+        res_text = await self._call_ai(prompt, system_message, site)
         if not res_text:
             return {}
         
@@ -82,32 +82,30 @@ class RecruiterService:
             
             return json.loads(text.strip())
         except Exception as e:
+            llm_metrics.record_json_failure(site)
             print(f"DEBUG: Failed to parse AI JSON: {str(e)}\nRaw: {res_text[:200]}")
             return {}
 
-    async def generate_company_bio(self, website_url: str) -> str:
+    async def generate_company_bio(self, website_url: str, regenerate: bool = False) -> str:
         """
         Scrapes a company website and uses Gemini (with OpenRouter fallback) to generate a professional 2-3 sentence bio.
+        Bios are cached per normalized URL (a hit skips the scrape too); `regenerate` forces a fresh one.
         """
-        try:
-            if not website_url.startswith(('http://', 'https://')):
-                website_url = 'https://' + website_url
-
-            async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as client:
-                response = await client.get(website_url)
-                response.raise_for_status()
-
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
+        if not website_url.startswith(('http://', 'https://')):
+            website_url = 'https://' + website_url
+
+        cache_input = "company_bio:v1 " + normalize_url(website_url) # Same key as the website fetcher's page cache
+        return await generation_cache.get_or_generate(
+            cache_input,
+            llm_gateway.route_id(self.AI_ROUTE),
+            lambda: self._bio_from_website(website_url, regenerate),
+            bypass=regenerate
+        )
 
-            # Get text and clean it up
-            text = soup.get_text()
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            clean_text = '\n'.join(chunk for chunk in chunks if chunk)[:2000] # Limit to 2000 chars
+    async def _bio_from_website(self, website_url: str, regenerate: bool = False) -> str:
+        try:
+            # Streams the page and stops once enough text is collected; cached per page
+            clean_text = await website_fetcher.fetch_text(website_url, revalidate=regenerate)
 
             prompt = f"""
             Extract a professional, concise 2-3 sentence company description/bio for a recruitment platform.
@@ -119,7 +117,7 @@ class RecruiterService:
             Return ONLY the bio text. No introduction or conversational filler.
             """
             
-            bio = await self._call_ai(prompt, "You are an elite company biographer for a recruitment platform.")
+            bio = await self._call_ai(prompt, "You are an elite company biographer for a recruitment platform.", site="recruiter.company_bio")
             
             # Basic cleanup if AI returns markdown or quotes
             if bio:
@@ -131,17 +129,18 @@ class RecruiterService:
             return ""
 
     async def get_or_create_profile(self, user_id: str):
-        res = supabase.table("recruiter_profiles").select("*, companies(*)").eq("user_id", user_id).execute()
+        res = await supabase.table("recruiter_profiles").select("*, companies(*)").eq("user_id", user_id).execute()
         if res.data:
             return res.data[0]
         
         # Ensure user entry exists in public.users to avoid FK violation
-        user_check = supabase.table("users").select("id").eq("id", user_id).execute()
+        user_check = await supabase.table("users").select("id").eq("id", user_id).execute()
         if not user_check.data:
             # Note: Fetching email from auth metadata is ideal but requires admin/service_role
             # For now, we use a generic placeholder or assume post-login handles it.
             # However, if we are here, we MUST have a user record.
-            supabase.table("users").upsert({"id": user_id, "role": "recruiter"}).execute()
+            await supabase.table("users").upsert({"id": user_id, "role": "recruiter"}).execute()
+            role_cache.invalidate(user_id)
 
         # Create default profile if not exists
         new_profile = {
@@ -149,12 +148,12 @@ class RecruiterService:
             "onboarding_step": "REGISTRATION",
             "assessment_status": "not_started"
         }
-        res = supabase.table("recruiter_profiles").insert(new_profile).execute()
+        res = await supabase.table("recruiter_profiles").insert(new_profile).execute()
         return res.data[0] if res.data else None
 
     async def update_company_registration(self, user_id: str, registration_number: str):
         # 1. Check if company with this registration exists or create new
-        comp_res = supabase.table("companies").select("*").eq("registration_number", registration_number).execute()
+        comp_res = await supabase.table("companies").select("*").eq("registration_number", registration_number).execute()
         
         has_score = False
         is_first_recruiter = False
@@ -169,7 +168,7 @@ class RecruiterService:
                 "name": "Pending Verification",
                 "registration_number": registration_number
             }
-            ins_res = supabase.table("companies").insert(new_comp).execute()
+            ins_res = await supabase.table("companies").insert(new_comp).execute()
             company_id = ins_res.data[0]["id"]
             is_first_recruiter = True
 
@@ -188,7 +187,7 @@ class RecruiterService:
             "team_role": "admin" if is_first_recruiter else "recruiter"
         }
         
-        supabase.table("recruiter_profiles").update(update_payload).eq("user_id", user_id).execute()
+        await supabase.table("recruiter_profiles").update(update_payload).eq("user_id", user_id).execute()
 
         return {
             "status": "ok", 
@@ -199,7 +198,7 @@ class RecruiterService:
 
     async def update_company_details(self, user_id: str, company_id: str, details: Dict):
         # Update company table
-        supabase.table("companies").update({
+        await supabase.table("companies").update({
             "name": details.get("name"),
             "website": details.get("website"),
             "location": details.get("location"),
@@ -212,7 +211,7 @@ class RecruiterService:
         }).eq("id", company_id).execute()
 
         # Advance recruiter step
-        supabase.table("recruiter_profiles").update({
+        await supabase.table("recruiter_profiles").update({
             "onboarding_step": "ASSESSMENT_PROMPT"
         }).eq("user_id", user_id).execute()
 
@@ -221,101 +220,183 @@ class RecruiterService:
 
         return {"status": "ok"}
 
-    async def get_applications_pipeline(self, recruiter_id: str):
+    # Joined columns for pipeline rows. Heavy resume fields (raw_text) are NOT part of the page;
+    # they are fetched per application via get_application_detail.
+    PIPELINE_SELECT = """
+        id,
+        status,
+        feedback,
+        created_at,
+        job_id,
+        candidate_id,
+        jobs!inner(id, title, status, company_id, skills_required, requirements, location, created_at),
+        candidate_profiles!inner(
+            user_id, full_name, current_role, years_of_experience, skills, 
+            phone_number, location, gender, birthdate, university, 
+            qualification_held, graduation_year, referral, bio, profile_photo_url,
+            resume_path,
+            users(email)
+        ),
+        interviews(*, interview_slots(*))
+    """
+
+    @staticmethod
+    def _encode_cursor(row: Dict) -> str:
+        raw = json.dumps({"created_at": row["created_at"], "id": row["id"]})
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Dict:
+        # Values are pasted into a PostgREST filter string: accept only a real timestamp and UUID
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+            return {
+                "created_at": datetime.fromisoformat(data["created_at"]).isoformat(),
+                "id": str(uuid.UUID(data["id"]))
+            }
+        except Exception:
+            raise ValueError("Invalid pipeline cursor")
+
+    async def get_applications_pipeline_page(
+        self,
+        recruiter_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        job_id: Optional[str] = None,
+        statuses: Optional[List[str]] = None,
+        include_raw_text: bool = False
+    ) -> Dict:
         """
-        Fetches all applications for jobs managed by the recruiter, 
-        grouped by job and including candidate scores.
+        Keyset-paginated pipeline: newest first, ordered by (created_at, id).
+        Job and status filters are applied in the query. Pass the returned `next_cursor`
+        back to fetch the following page.
         """
-        try:
-            # 1. Get company_id for the recruiter
-            prof = await self.get_or_create_profile(recruiter_id)
-            company_id = prof.get("company_id")
-            if not company_id:
-                return []
+        prof = await self.get_or_create_profile(recruiter_id)
+        company_id = prof.get("company_id")
+        if not company_id:
+            return {"items": [], "next_cursor": None, "has_more": False}
+
+        query = supabase.table("job_applications").select(self.PIPELINE_SELECT).eq("jobs.company_id", company_id)
+        if job_id:
+            query = query.eq("job_id", job_id)
+        if statuses:
+            query = query.in_("status", statuses)
+        if cursor:
+            c = self._decode_cursor(cursor)
+            # Rows strictly "after" the cursor in (created_at DESC, id DESC) order
+            query = query.or_(
+                f'created_at.lt."{c["created_at"]}",and(created_at.eq."{c["created_at"]}",id.lt.{c["id"]})'
+            )
+
+        # Fetch one extra row to know whether another page exists
+        res = await query.order("created_at", desc=True).order("id", desc=True).limit(limit + 1).execute()
+        rows = res.data or []
+        has_more = len(rows) > limit
+        apps = rows[:limit]
+
+        await self._enrich_pipeline_apps(apps, include_raw_text)
+        return {
+            "items": apps,
+            "next_cursor": self._encode_cursor(apps[-1]) if has_more else None,
+            "has_more": has_more
+        }
 
-            # 2. Fetch applications with joined data
-            # Note: We fetch candidate_profiles but skip resume_data here to avoid relationship errors
-            # PostgREST needs direct FKs for sibling joins which job_applications <-> resume_data lacks.
-            query = supabase.table("job_applications").select("""
-                id,
-                status,
-                feedback,
-                created_at,
-                job_id,
-                candidate_id,
-                jobs!inner(id, title, status, company_id, skills_required, requirements, location, created_at),
-                candidate_profiles!inner(
-                    user_id, full_name, current_role, years_of_experience, skills, 
-                    phone_number, location, gender, birthdate, university, 
-                    qualification_held, graduation_year, referral, bio, profile_photo_url,
-                    resume_path,
-                    users(email)
-                ),
-                interviews(*, interview_slots(*))
-            """).eq("jobs.company_id", company_id).order("created_at", desc=True)
+    async def _enrich_pipeline_apps(self, apps: List[Dict], include_raw_text: bool = False):
+        """Attaches scores, resume summary, signed resume URLs and skill match to pipeline rows in place."""
+        if not apps:
+            return
+
+        # Fetch Profile Scores & Resume Data separately to avoid join headaches
+        # Note: PostgREST needs direct FKs for sibling joins which job_applications <-> resume_data lacks.
+        candidate_ids = list(set([a["candidate_id"] for a in apps]))
+        resume_cols = "user_id, timeline, education, achievements, skills" + (", raw_text" if include_raw_text else "")
+        resume_paths = [a["candidate_profiles"]["resume_path"] for a in apps if a.get("candidate_profiles", {}).get("resume_path")]
+
+        # Signed URLs for resumes (Buckets are private by default) come from the shared cache
+        scores_res, resume_res, signed_urls = await asyncio.gather(
+            supabase.table("profile_scores").select("user_id, final_score, skills_score").in_("user_id", candidate_ids).execute(),
+            supabase.table("resume_data").select(resume_cols).in_("user_id", candidate_ids).execute(),
+            signed_url_cache.get_many("resumes", resume_paths)
+        )
+        scores_map = {s["user_id"]: s for s in (scores_res.data or [])}
+        resume_map = {r["user_id"]: r for r in (resume_res.data or [])}
+
+        # Process and categorise by Skill Match
+        for app in apps:
+            # Flatten email from joined users table
+            if "candidate_profiles" in app and "users" in app["candidate_profiles"]:
+                user_data = app["candidate_profiles"]["users"]
+                if isinstance(user_data, dict):
+                     app["candidate_profiles"]["email"] = user_data.get("email")
+                elif isinstance(user_data, list) and len(user_data) > 0:
+                     app["candidate_profiles"]["email"] = user_data[0].get("email")
+                del app["candidate_profiles"]["users"]
+
+            # Attach Resume Signed URL
+            r_path = app.get("candidate_profiles", {}).get("resume_path")
+            if r_path and r_path in signed_urls:
+                 app["candidate_profiles"]["resume_url"] = signed_urls[r_path]
+
+            # Attach scores
+            app["profile_scores"] = scores_map.get(app["candidate_id"])
             
-            res = query.execute()
-            apps = res.data or []
+            # Attach resume data
+            app["resume_data"] = resume_map.get(app["candidate_id"])
 
-            if apps:
-                # 3. Fetch Profile Scores & Resume Data separately to avoid join headaches
-                candidate_ids = list(set([a["candidate_id"] for a in apps]))
-                
-                # Fetch Scores
-                scores_res = supabase.table("profile_scores").select("user_id, final_score, skills_score").in_("user_id", candidate_ids).execute()
-                scores_map = {s["user_id"]: s for s in (scores_res.data or [])}
-
-                # Fetch Resume Data (Timeline/Education)
-                resume_res = supabase.table("resume_data").select("user_id, timeline, education, achievements, skills, raw_text").in_("user_id", candidate_ids).execute()
-                resume_map = {r["user_id"]: r for r in (resume_res.data or [])}
-
-                # 3.5 Generate Signed URLs for resumes (Buckets are private by default)
-                signed_urls = {}
-                resume_paths = [a["candidate_profiles"]["resume_path"] for a in apps if a.get("candidate_profiles", {}).get("resume_path")]
-                if resume_paths:
-                    try:
-                        # Fetch signed URLs for all paths in one go
-                        urls_res = supabase.storage.from_("resumes").create_signed_urls(resume_paths, 3600)
-                        for u in (urls_res or []):
-                             if "signedURL" in u:
-                                 signed_urls[u["path"]] = u["signedURL"]
-                    except Exception as e:
-                        print(f"Error generating signed URLs: {str(e)}")
-
-                # 4. Process and categorise by Skill Match
-                for app in apps:
-                    # Flatten email from joined users table
-                    if "candidate_profiles" in app and "users" in app["candidate_profiles"]:
-                        user_data = app["candidate_profiles"]["users"]
-                        if isinstance(user_data, dict):
-                             app["candidate_profiles"]["email"] = user_data.get("email")
-                        elif isinstance(user_data, list) and len(user_data) > 0:
-                             app["candidate_profiles"]["email"] = user_data[0].get("email")
-                        del app["candidate_profiles"]["users"]
-
-                    # Attach Resume Signed URL
-                    r_path = app.get("candidate_profiles", {}).get("resume_path")
-                    if r_path and r_path in signed_urls:
-                         app["candidate_profiles"]["resume_url"] = signed_urls[r_path]
-
-                    # Attach scores
-                    app["profile_scores"] = scores_map.get(app["candidate_id"])
-                    
-                    # Attach resume data
-                    app["resume_data"] = resume_map.get(app["candidate_id"])
+            recruiter_stats.remember_job(app["job_id"], app["jobs"].get("company_id"))
 
-                    job_skills = set([s.lower() for s in (app["jobs"].get("skills_required") or [])])
-                    cand_skills = set([s.lower() for s in (app["candidate_profiles"].get("skills") or [])])
-                    
-                    # Intersection of skills
-                    matching = job_skills.intersection(cand_skills)
-                    
-                    # If they share at least 2 key skills or 50% of JD skills, mark as high skill match
-                    is_skill_match = len(matching) >= 2 or (len(job_skills) > 0 and len(matching) / len(job_skills) >= 0.4)
-                    app["is_skill_match"] = is_skill_match
-                    app["matched_skills"] = list(matching)
+            # Intersection of skills via the interned bitsets
+            job_mask = skill_index.job_mask(app["job_id"], app["jobs"].get("skills_required"))
+            cand_mask = skill_index.candidate_mask(app["candidate_id"], app["candidate_profiles"].get("skills"))
+            
+            # If they share at least 2 key skills or 40% of JD skills, mark as high skill match
+            is_skill_match, matching = skill_index.match(job_mask, cand_mask)
+            app["is_skill_match"] = is_skill_match
+            app["matched_skills"] = matching
 
-            return apps
+    async def get_application_detail(self, recruiter_id: str, application_id: str):
+        """
+        Lazy detail for a single pipeline row: the heavy resume fields left out of the page.
+        Raises LookupError for an unknown application, PermissionError for another company's.
+        """
+        prof = await self.get_or_create_profile(recruiter_id)
+        app_res = await supabase.table("job_applications")\
+            .select("id, candidate_id, jobs!inner(company_id)")\
+            .eq("id", application_id)\
+            .execute()
+        if not app_res.data:
+            raise LookupError("Application not found")
+
+        app = app_res.data[0]
+        if not prof.get("company_id") or app["jobs"]["company_id"] != prof.get("company_id"):
+            raise PermissionError("Permission Denied: This application belongs to another company.")
+
+        resume_res = await supabase.table("resume_data")\
+            .select("user_id, timeline, education, achievements, skills, raw_text")\
+            .eq("user_id", app["candidate_id"])\
+            .execute()
+
+        return {
+            "application_id": application_id,
+            "candidate_id": app["candidate_id"],
+            "resume_data": resume_res.data[0] if resume_res.data else None
+        }
+
+    async def get_applications_pipeline(self, recruiter_id: str):
+        """
+        Fetches all applications for jobs managed by the recruiter, 
+        grouped by job and including candidate scores.
+        Compatibility wrapper: walks every page of get_applications_pipeline_page.
+        """
+        try:
+            apps = []
+            cursor = None
+            while True:
+                page = await self.get_applications_pipeline_page(recruiter_id, limit=500, cursor=cursor, include_raw_text=True)
+                apps.extend(page["items"])
+                if not page["has_more"]:
+                    return apps
+                cursor = page["next_cursor"]
         except Exception as e:
             print(f"PIPELINE DATA ERROR: {str(e)}")
             return []
@@ -331,8 +412,8 @@ class RecruiterService:
         try:
             # OWNERSHIP CHECK: Ensure recruiter owns the jobs associated with these applications
             # We also fetch candidate_id and current status for audit trails
-            apps_check = supabase.table("job_applications")\
-                .select("id, status, candidate_id, jobs(recruiter_id)")\
+            apps_check = await supabase.table("job_applications")\
+                .select("id, status, candidate_id, jobs(recruiter_id, company_id)")\
                 .in_("id", application_ids)\
                 .execute()
             
@@ -344,53 +425,53 @@ class RecruiterService:
                      raise Exception("Permission Denied: You can only update applications for jobs you posted.")
 
             # Perform the update
-            res = supabase.table("job_applications")\
+            res = await supabase.table("job_applications")\
                 .update({"status": status, "feedback": feedback, "updated_at": datetime.now().isoformat()})\
                 .in_("id", application_ids)\
                 .execute()
             
-            # AUDIT TRAIL: Log transitions manually
             if res.data:
-                from src.services.notification_service import NotificationService
-                for app in apps_check.data:
-                    # Log history using static method
-                    # This ensures the recruiter_id (user_id) is captured correctly
-                    await self.log_history(
-                        application_id=app["id"],
-                        new_status=status,
-                        old_status=app.get("status"),
-                        changed_by=recruiter_id,
-                        reason=feedback
-                    )
-
-                    # Notify Candidate
-                    candidate_id = app.get("candidate_id")
-                    if candidate_id:
-                        NotificationService.create_notification(
-                            user_id=candidate_id,
-                            type="APPLICATION_STATUS_UPDATE",
-                            title=f"Application Update: {status.capitalize()}",
-                            message=f"The status of your application has been updated to '{status}'. Check your dashboard for details.",
-                            metadata={"application_id": app["id"], "new_status": status, "feedback": feedback}
-                        )
-
-            # ELITE HUB AUTOMATION: Handle thread activation/deactivation
-            if status in ["shortlisted", "invited"] and res.data:
-                from src.services.chat_service import ChatService
-                for app in apps_check.data:
-                    candidate_id = app.get("candidate_id")
-                    if candidate_id:
-                        ChatService.get_or_create_thread(recruiter_id, candidate_id)
-            
-            # DEACTIVATION: If status is 'rejected', deactivate the communication thread
-            if status == "rejected" and res.data:
+                # Dashboard funnel for the affected company is now stale
                 for app in apps_check.data:
-                    candidate_id = app.get("candidate_id")
-                    if candidate_id:
-                        supabase.table("chat_threads").update({"is_active": False}).match({
-                            "recruiter_id": recruiter_id,
-                            "candidate_id": candidate_id
-                        }).execute()
+                    if app.get("jobs"):
+                        recruiter_stats.invalidate(app["jobs"].get("company_id"))
+
+                updated_ids = {r["id"] for r in res.data}
+                updated_apps = [a for a in apps_check.data if a["id"] in updated_ids]
+                candidate_ids = list({a["candidate_id"] for a in updated_apps if a.get("candidate_id")})
+
+                # SET-BASED SIDE EFFECTS: one statement each, regardless of selection size
+                side_effects = [
+                    # AUDIT TRAIL: Log all transitions in a single multi-row insert
+                    self.log_history_bulk([{
+                        "application_id": app["id"],
+                        "old_status": app.get("status"),
+                        "new_status": status,
+                        "changed_by": recruiter_id,
+                        "reason": feedback
+                    } for app in updated_apps])
+                ]
+
+                if candidate_ids:
+                    from src.services.chat_service import ChatService
+                    # ELITE HUB AUTOMATION: Handle thread activation/deactivation
+                    if status in ["shortlisted", "invited"]:
+                        side_effects.append(ChatService.activate_threads(recruiter_id, candidate_ids))
+                    # DEACTIVATION: If status is 'rejected', deactivate the communication threads
+                    elif status == "rejected":
+                        side_effects.append(ChatService.deactivate_threads(recruiter_id, candidate_ids))
+
+                await asyncio.gather(*side_effects)
+
+                # Notify Candidates (queued on the outbox, flushed as one batch)
+                from src.services.notification_service import NotificationService
+                await NotificationService.create_notifications([{
+                    "user_id": app["candidate_id"],
+                    "type": "APPLICATION_STATUS_UPDATE",
+                    "title": f"Application Update: {status.capitalize()}",
+                    "message": f"The status of your application has been updated to '{status}'. Check your dashboard for details.",
+                    "metadata": {"application_id": app["id"], "new_status": status, "feedback": feedback}
+                } for app in updated_apps if app.get("candidate_id")])
             
             return {"count": len(res.data) if res.data else 0}
         except Exception as e:
@@ -404,7 +485,7 @@ class RecruiterService:
         """
         Fetch the audit trail for a specific job application.
         """
-        res = supabase.table("job_application_status_history")\
+        res = await supabase.table("job_application_status_history")\
             .select("*, users!inner(email)")\
             .eq("application_id", application_id)\
             .order("created_at", desc=False)\
@@ -415,7 +496,7 @@ class RecruiterService:
     async def log_history(application_id: str, new_status: str, old_status: Optional[str], changed_by: str, reason: Optional[str] = None):
         """Manually log a status transition for the audit trail if DB trigger fails/skipped."""
         try:
-            supabase.table("job_application_status_history").insert({
+            await supabase.table("job_application_status_history").insert({
                 "application_id": application_id,
                 "old_status": old_status,
                 "new_status": new_status,
@@ -425,9 +506,19 @@ class RecruiterService:
         except Exception as e:
             print(f"AUDIT TRAIL LOGGING ERROR: {str(e)}")
 
+    @staticmethod
+    async def log_history_bulk(entries: List[Dict]):
+        """Log many status transitions for the audit trail in one multi-row insert."""
+        if not entries:
+            return
+        try:
+            await supabase.table("job_application_status_history").insert(entries).execute()
+        except Exception as e:
+            print(f"AUDIT TRAIL LOGGING ERROR: {str(e)}")
+
     async def sync_completion_score(self, user_id: str):
         """Helper to sync completion score for recruiter and company profile."""
-        res = supabase.table("recruiter_profiles").select("*, companies(*)").eq("user_id", user_id).execute()
+        res = await supabase.table("recruiter_profiles").select("*, companies(*)").eq("user_id", user_id).execute()
         if not res.data:
             return 0
         
@@ -437,7 +528,7 @@ class RecruiterService:
         new_score = self.calculate_completion_score(profile, company)
         
         # Update completion score for recruiter profile
-        supabase.table("recruiter_profiles").update({"completion_score": new_score}).eq("user_id", user_id).execute()
+        await supabase.table("recruiter_profiles").update({"completion_score": new_score}).eq("user_id", user_id).execute()
         
         # Note: Do NOT update companies.profile_score here. 
         # companies.profile_score is the QUALITY score from the assessment, 
@@ -497,7 +588,7 @@ class RecruiterService:
                 return []
 
             # 2. Fetch all assessed candidates
-            res = supabase.table("candidate_profiles").select(
+            res = await supabase.table("candidate_profiles").select(
                 "user_id, full_name, current_role, experience, years_of_experience, profile_strength, skills, assessment_status, profile_photo_url"
             ).eq("assessment_status", "completed").execute()
             
@@ -508,11 +599,11 @@ class RecruiterService:
             user_ids = [c["user_id"] for c in candidates]
             
             # 3. Fetch User Emails
-            users_res = supabase.table("users").select("id, email").in_("id", user_ids).execute()
+            users_res = await supabase.table("users").select("id, email").in_("id", user_ids).execute()
             email_map = {u["id"]: u["email"] for u in users_res.data} if users_res.data else {}
 
             # 4. Fetch scores
-            scores_res = supabase.table("profile_scores").select(
+            scores_res = await supabase.table("profile_scores").select(
                 "user_id, behavioral_score, psychometric_score"
             ).in_("user_id", user_ids).execute()
             
@@ -520,15 +611,7 @@ class RecruiterService:
             
             # 5. Handle signing for photos (bulk)
             paths_to_sign = [c["profile_photo_url"] for c in candidates if c.get("profile_photo_url") and not c["profile_photo_url"].startswith("http")]
-            signed_urls_map = {}
-            if paths_to_sign:
-                try:
-                    signed_res = supabase.storage.from_("avatars").create_signed_urls(paths_to_sign, 3600)
-                    if signed_res:
-                        for item in signed_res:
-                            signed_urls_map[item['path']] = item['signedURL']
-                except:
-                    pass
+            signed_urls_map = await signed_url_cache.get_many("avatars", paths_to_sign)
 
             recommended = []
             for c in candidates:
@@ -566,7 +649,7 @@ class RecruiterService:
         """Fetch all candidates with limited signals for recruiters."""
         try:
             # 1. Fetch Profile
-            res = supabase.table("candidate_profiles").select(
+            res = await supabase.table("candidate_profiles").select(
                 "user_id, full_name, current_role, experience, years_of_experience, profile_strength, identity_verified, assessment_status, skills, profile_photo_url, resume_path"
             ).execute()
             
@@ -577,24 +660,16 @@ class RecruiterService:
             user_ids = [c["user_id"] for c in candidates]
             
             # 2. Fetch User Emails
-            users_res = supabase.table("users").select("id, email").in_("id", user_ids).execute()
+            users_res = await supabase.table("users").select("id, email").in_("id", user_ids).execute()
             email_map = {u["id"]: u["email"] for u in users_res.data} if users_res.data else {}
             
             # 3. Fetch scores for trust signal
-            scores_res = supabase.table("profile_scores").select("user_id, behavioral_score, psychometric_score").in_("user_id", user_ids).execute()
+            scores_res = await supabase.table("profile_scores").select("user_id, behavioral_score, psychometric_score").in_("user_id", user_ids).execute()
             scores_map = {s["user_id"]: s for s in scores_res.data} if scores_res.data else {}
             
             # 4. Handle signing for photos (bulk)
             paths_to_sign = [c["profile_photo_url"] for c in candidates if c.get("profile_photo_url") and not c["profile_photo_url"].startswith("http")]
-            signed_urls_map = {}
-            if paths_to_sign:
-                try:
-                    signed_res = supabase.storage.from_("avatars").create_signed_urls(paths_to_sign, 3600)
-                    if signed_res:
-                        for item in signed_res:
-                            signed_urls_map[item['path']] = item['signedURL']
-                except:
-                    pass
+            signed_urls_map = await signed_url_cache.get_many("avatars", paths_to_sign)
 
             # Consolidated Data Enrichment
             for c in candidates:
@@ -620,14 +695,14 @@ class RecruiterService:
         """Fetch full details for a candidate viewable by recruiters."""
         try:
             # 1. Fetch Profile
-            res = supabase.table("candidate_profiles").select("*").eq("user_id", candidate_id).execute()
+            res = await supabase.table("candidate_profiles").select("*").eq("user_id", candidate_id).execute()
             if not res.data:
                 return None
             
             candidate = res.data[0]
             
             # 2. Fetch User Email explicitly from users table
-            user_res = supabase.table("users").select("email").eq("id", candidate_id).execute()
+            user_res = await supabase.table("users").select("email").eq("id", candidate_id).execute()
             if user_res.data:
                 candidate["email"] = user_res.data[0].get("email")
             else:
@@ -636,17 +711,12 @@ class RecruiterService:
 
             # 3. Handle Profile Photo signing (if bucket is private)
             if candidate.get("profile_photo_url") and not candidate["profile_photo_url"].startswith("http"):
-                try:
-                    signed_res = supabase.storage.from_("avatars").create_signed_url(candidate["profile_photo_url"], 3600)
-                    if signed_res and isinstance(signed_res, dict) and "signedURL" in signed_res:
-                        candidate["profile_photo_url"] = signed_res["signedURL"]
-                    elif signed_res and isinstance(signed_res, str):
-                        candidate["profile_photo_url"] = signed_res
-                except:
-                    pass
+                signed_photo = await signed_url_cache.get("avatars", candidate["profile_photo_url"])
+                if signed_photo:
+                    candidate["profile_photo_url"] = signed_photo
 
             # 4. Fetch Scores
-            scores_res = supabase.table("profile_scores").select("behavioral_score, psychometric_score, skills_score").eq("user_id", candidate_id).execute()
+            scores_res = await supabase.table("profile_scores").select("behavioral_score, psychometric_score, skills_score").eq("user_id", candidate_id).execute()
             
             if scores_res.data:
                 s = scores_res.data[0]
@@ -659,7 +729,7 @@ class RecruiterService:
                 candidate["skills_alignment"] = 0
                 
             # 3. Fetch Resume Data (Timeline/Education)
-            resume_res = supabase.table("resume_data").select("user_id, timeline, education, achievements, skills, raw_text").eq("user_id", candidate_id).execute()
+            resume_res = await supabase.table("resume_data").select("user_id, timeline, education, achievements, skills, raw_text").eq("user_id", candidate_id).execute()
             if resume_res.data:
                 candidate["resume_data"] = resume_res.data[0]
             else:
@@ -667,12 +737,9 @@ class RecruiterService:
 
             # 4. Generate Signed URL for resume from resumes bucket
             if candidate.get("resume_path"):
-                try:
-                    signed_url = supabase.storage.from_("resumes").create_signed_url(candidate["resume_path"], 3600)
-                    if "signedURL" in signed_url:
-                        candidate["resume_url"] = signed_url["signedURL"]
-                except Exception as e:
-                    print(f"Error generating signed URL for candidate {candidate_id}: {e}")
+                signed_resume = await signed_url_cache.get("resumes", candidate["resume_path"])
+                if signed_resume:
+                    candidate["resume_url"] = signed_resume
 
             # Ensure raw behavioral and psychometric scores are NOT returned
             if "profile_scores" in candidate: del candidate["profile_scores"]
@@ -687,7 +754,7 @@ class RecruiterService:
         Fetches operational stats for the recruiter dashboard.
         """
         # 1. Fetch Profile & Company (Safe fetch to avoid 404 from .single())
-        profile_res = supabase.table("recruiter_profiles").select("*, companies(*)").eq("user_id", user_id).execute()
+        profile_res = await supabase.table("recruiter_profiles").select("*, companies(*)").eq("user_id", user_id).execute()
         if not profile_res.data:
              return {
                 "active_jobs_count": 0,
@@ -718,55 +785,25 @@ class RecruiterService:
         if company_score > 0:
             assessment_status = "completed"
 
-        # 2. Query Aggregate Stats (Conversion Funnel)
+        # 2. Query Aggregate Stats (Conversion Funnel), grouped on the database side
         active_jobs = 0
         total_views = 0
         total_apps = 0
         shortlisted = 0
         hires = 0
+        funnel = {"applied": 0, "shortlisted": 0, "interviewed": 0, "offered": 0, "hired": 0}
 
         try:
             if company_id:
-                # Active Jobs
-                jobs_res = supabase.table("jobs").select("id", count="exact").eq("company_id", company_id).eq("status", "active").execute()
-                active_jobs = jobs_res.count or 0
-                
-                # Get all job IDs for this company
-                all_jobs = supabase.table("jobs").select("id").eq("company_id", company_id).execute()
-                job_ids = [j["id"] for j in all_jobs.data] if all_jobs.data else []
-
-                if job_ids:
-                    # Views Funnel
-                    views_res = supabase.table("job_views").select("id", count="exact").in_("job_id", job_ids).execute()
-                    total_views = views_res.count or 0
-
-                    # Applications Funnel
-                    apps_res = supabase.table("job_applications").select("id, status", count="exact").in_("job_id", job_ids).execute()
-                    total_apps = apps_res.count or 0
-                    
-                    # Detailed Funnel Counts (Cumulative)
-                    funnel = {
-                        "applied": total_apps,
-                        "shortlisted": 0,
-                        "interviewed": 0,
-                        "offered": 0,
-                        "hired": 0
-                    }
-                    
-                    for app in (apps_res.data or []):
-                        status = app["status"]
-                        if status in ["shortlisted", "interview_scheduled", "offered", "closed"]:
-                            funnel["shortlisted"] += 1
-                        if status in ["interview_scheduled", "offered", "closed"]:
-                            funnel["interviewed"] += 1
-                        if status in ["offered", "closed"]:
-                            funnel["offered"] += 1
-                        if status == "closed":
-                            funnel["hired"] += 1
-                    
-                    # Shortlisted & Hires (for aggregate stats)
-                    shortlisted = funnel["shortlisted"]
-                    hires = funnel["hired"]
+                company_stats = await recruiter_stats.company_funnel(company_id)
+                active_jobs = company_stats["active_jobs"]
+                total_views = company_stats["total_views"]
+                total_apps = company_stats["total_applications"]
+                funnel = company_stats["funnel"]
+
+                # Shortlisted & Hires (for aggregate stats)
+                shortlisted = funnel["shortlisted"]
+                hires = funnel["hired"]
         except Exception as e:
             print(f"Stats query error: {str(e)}")
         
@@ -777,9 +814,7 @@ class RecruiterService:
         return {
             "active_jobs_count": active_jobs,
             "total_hires_count": hires,
-            "funnel_data": funnel if 'funnel' in locals() else {
-                "applied": 0, "shortlisted": 0, "interviewed": 0, "offered": 0, "hired": 0
-            },
+            "funnel_data": funnel,
             "total_views": total_views,
             "total_applications": total_apps,
             "conversion_rate": round(conv_rate, 1),
@@ -802,7 +837,7 @@ class RecruiterService:
         # Clean up any previous incomplete or old assessment responses for this user
         # to ensure a fresh score calculation.
         try:
-            supabase.table("recruiter_assessment_responses").delete().eq("user_id", user_id).execute()
+            await supabase.table("recruiter_assessment_responses").delete().eq("user_id", user_id).execute()
         except Exception as e:
             print(f"Warning: Could not clear old responses: {e}")
 
@@ -817,7 +852,7 @@ class RecruiterService:
         questions = []
         try:
             for cat in categories:
-                res = supabase.table("recruiter_assessment_questions").select("*").eq("category", cat).execute()
+                res = await supabase.table("recruiter_assessment_questions").select("*").eq("category", cat).execute()
                 if res.data and len(res.data) > 0:
                     questions.append(random.choice(res.data))
             
@@ -830,7 +865,7 @@ class RecruiterService:
             print(f"Error fetching recruiter questions: {str(e)}")
             return None
 
-    async def evaluate_recruiter_answer(self, user_id: str, question_text: str, answer: str, category: str):
+    async def _score_recruiter_answer(self, question_text: str, answer: str, category: str) -> Dict[str, Any]:
         prompt = f"""
         Act as an unbiased Corporate Quality Auditor. Your goal is to evaluate a recruiter's answer to determine the "Company Profile Score".
         
@@ -867,26 +902,105 @@ class RecruiterService:
             "reasoning": "Provide a brief, objective justification (max 20 words)."
         }}
         """
+        return await self._call_ai_json(prompt, "You are an unbiased Corporate Quality Auditor.", site="recruiter.evaluate_answer")
+
+    @staticmethod
+    def _recruiter_score_fields(data: Dict[str, Any]) -> Dict[str, Any]:
+        relevance = data.get("relevance", 0)
+        specificity = data.get("specificity", 0)
+        clarity = data.get("clarity", 0)
+        ownership = data.get("ownership", 0)
+        return {
+            "relevance_score": relevance,
+            "specificity_score": specificity,
+            "clarity_score": clarity,
+            "ownership_score": ownership,
+            "average_score": (relevance + specificity + clarity + ownership) / 4
+        }
+
+    @staticmethod
+    def _valid_recruiter_scores(item: dict) -> Optional[dict]:
+        scores = {}
+        for dim in RECRUITER_DIMENSIONS:
+            value = item.get(dim)
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) or not 0 <= value <= 6:
+                return None
+            scores[dim] = value
+        return {**scores, "reasoning": str(item.get("reasoning") or "")}
+
+    async def _score_pending_answers(self, user_id: str) -> int:
+        """
+        Batch mode: scores every stored answer of `user_id` that has no score yet, several per
+        LLM request. Answers the batch could not score are re-scored one by one. Returns how
+        many rows were scored.
+        """
+        res = await supabase.table("recruiter_assessment_responses")\
+            .select("id, question_text, answer_text, category")\
+            .eq("user_id", user_id)\
+            .is_("average_score", "null")\
+            .execute()
+        rows = res.data or []
+        for i in range(0, len(rows), max(EVALUATION_BATCH_SIZE, 1)):
+            chunk = rows[i:i + max(EVALUATION_BATCH_SIZE, 1)]
+            results = await batch_evaluator.evaluate(
+                RECRUITER_BATCH_INSTRUCTIONS,
+                [f"CATEGORY: {r['category']}\nQUESTION: {r['question_text']}\nRECRUITER ANSWER: {r['answer_text']}" for r in chunk],
+                RECRUITER_BATCH_FIELDS,
+                self._valid_recruiter_scores,
+                "You are an unbiased Corporate Quality Auditor.",
+                site="recruiter.evaluate_answer_batch"
+            )
+            retry = [j for j, data in enumerate(results) if data is None]
+            retried = await asyncio.gather(*(
+                self._score_recruiter_answer(chunk[j]["question_text"], chunk[j]["answer_text"], chunk[j]["category"])
+                for j in retry
+            ), return_exceptions=True)
+            for j, data in zip(retry, retried):
+                results[j] = data if isinstance(data, dict) and data else None
+
+            updates = []
+            for row, data in zip(chunk, results):
+                if data is None:
+                    fields = {dim + "_score": 3 for dim in RECRUITER_DIMENSIONS}
+                    fields["average_score"] = 3.0
+                    meta = {"reasoning": "AI evaluation failed, using fallback score.", "evaluator": "FALLBACK"}
+                else:
+                    fields = self._recruiter_score_fields(data)
+                    meta = {"reasoning": data.get("reasoning"), "evaluator": "AI_GRADED_UNBIASED_RECRUITER"}
+                updates.append(supabase.table("recruiter_assessment_responses").update({
+                    **fields,
+                    "evaluation_metadata": meta
+                }).eq("id", row["id"]).is_("average_score", "null").execute())
+            await asyncio.gather(*updates, return_exceptions=True)
+        return len(rows)
+
+    async def evaluate_recruiter_answer(self, user_id: str, question_text: str, answer: str, category: str):
+        if EVALUATION_MODE == "batch":
+            # Stored unscored; complete_recruiter_assessment scores the whole set in one request
+            try:
+                await supabase.table("recruiter_assessment_responses").insert({
+                    "user_id": user_id,
+                    "question_text": question_text,
+                    "answer_text": answer,
+                    "category": category,
+                    "evaluation_metadata": {"evaluator": "PENDING_BATCH"}
+                }).execute()
+                return {"status": "ok", "score": None, "reasoning": "Evaluation pending."}
+            except Exception as e:
+                print(f"DEBUG: Pending answer insert failed for {user_id}, scoring now: {str(e)}")
+
         try:
-            data = await self._call_ai_json(prompt, "You are an unbiased Corporate Quality Auditor.")
-            
-            relevance = data.get("relevance", 0)
-            specificity = data.get("specificity", 0)
-            clarity = data.get("clarity", 0)
-            ownership = data.get("ownership", 0)
-            avg = (relevance + specificity + clarity + ownership) / 4
+            data = await self._score_recruiter_answer(question_text, answer, category)
+            fields = self._recruiter_score_fields(data)
+            avg = fields["average_score"]
 
             # Store response
-            store_res = supabase.table("recruiter_assessment_responses").insert({
+            store_res = await supabase.table("recruiter_assessment_responses").insert({
                 "user_id": user_id,
                 "question_text": question_text,
                 "answer_text": answer,
                 "category": category,
-                "relevance_score": relevance,
-                "specificity_score": specificity,
-                "clarity_score": clarity,
-                "ownership_score": ownership,
-                "average_score": avg,
+                **fields,
                 "evaluation_metadata": {
                     "reasoning": data.get("reasoning"),
                     "evaluator": "AI_GRADED_UNBIASED_RECRUITER"
@@ -901,7 +1015,7 @@ class RecruiterService:
             print(f"AI Eval Error: {str(e)}")
             # Fallback to store a neutral score so the assessment can continue
             try:
-                supabase.table("recruiter_assessment_responses").insert({
+                await supabase.table("recruiter_assessment_responses").insert({
                     "user_id": user_id,
                     "question_text": question_text,
                     "answer_text": answer,
@@ -917,36 +1031,44 @@ class RecruiterService:
             return {"status": "ok", "score": 3.0, "reasoning": "AI evaluation failed, using fallback score."}
 
     async def complete_recruiter_assessment(self, user_id: str):
+        # 0. Batch mode: answers were stored unscored; score them all now
+        if EVALUATION_MODE == "batch":
+            try:
+                await self._score_pending_answers(user_id)
+            except Exception as e:
+                print(f"DEBUG: Batch scoring error for {user_id}: {str(e)}")
+
         # 1. Calculate final score
-        res = supabase.table("recruiter_assessment_responses").select("average_score").eq("user_id", user_id).execute()
+        res = await supabase.table("recruiter_assessment_responses").select("average_score").eq("user_id", user_id).execute()
         if not res.data or len(res.data) == 0:
             print(f"DEBUG: No responses found for {user_id}")
             return {"status": "error", "message": "No responses found"}
         
-        scores = [float(r["average_score"]) for r in res.data]
+        # Anything still unscored (batch scoring failed outright) counts as neutral
+        scores = [float(r["average_score"]) if r.get("average_score") is not None else 3.0 for r in res.data]
         final_avg = sum(scores) / len(scores)
         # Normalize to 0-100
         normalized_score = int((final_avg / 6) * 100)
 
         # 2. Update company profile score (Competitive Progress Model)
         try:
-            profile_res = supabase.table("recruiter_profiles").select("company_id").eq("user_id", user_id).execute()
+            profile_res = await supabase.table("recruiter_profiles").select("company_id").eq("user_id", user_id).execute()
             if profile_res.data and len(profile_res.data) > 0:
                 company_id = profile_res.data[0]["company_id"]
                 if company_id:
                     # Get existing score
-                    comp_res = supabase.table("companies").select("profile_score").eq("id", company_id).execute()
+                    comp_res = await supabase.table("companies").select("profile_score").eq("id", company_id).execute()
                     current_score = comp_res.data[0].get("profile_score", 0) if comp_res.data else 0
                     
                     # Update ONLY if new score is higher
                     if normalized_score > current_score:
-                        supabase.table("companies").update({"profile_score": normalized_score}).eq("id", company_id).execute()
+                        await supabase.table("companies").update({"profile_score": normalized_score}).eq("id", company_id).execute()
         except Exception as e:
             print(f"DEBUG: Company score update error: {str(e)}")
 
         # 3. Update status
         try:
-            supabase.table("recruiter_profiles").update({
+            await supabase.table("recruiter_profiles").update({
                 "assessment_status": "completed",
                 "onboarding_step": "COMPLETED"
             }).eq("user_id", user_id).execute()
@@ -963,7 +1085,7 @@ class RecruiterService:
         if not company_id:
             return []
             
-        res = supabase.table("recruiter_profiles")\
+        res = await supabase.table("recruiter_profiles")\
             .select("user_id, full_name, job_title, team_role, assessment_status, created_at")\
             .eq("company_id", company_id)\
             .order("created_at", desc=False)\
@@ -973,39 +1095,9 @@ class RecruiterService:
     async def get_market_insights(self, user_id: str):
         """
         Calculate Career GPS insights based on platform-wide pool data.
+        Served from the incrementally maintained aggregates, not a pool scan.
         """
-        # 1. Skill Density (Top 5 skills available in pool)
-        # We'll approximate this by fetching all skills from candidate_profiles
-        candidate_res = supabase.table("candidate_profiles").select("skills").eq("assessment_status", "completed").execute()
-        
-        skill_counts = {}
-        total_candidates = len(candidate_res.data) if candidate_res.data else 0
-        
-        for cand in candidate_res.data:
-            skills = cand.get("skills", [])
-            for s in skills:
-                skill_counts[s] = skill_counts.get(s, 0) + 1
-        
-        top_skills = sorted(skill_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-        density_data = [{"skill": k, "count": v, "percentage": int((v/total_candidates)*100) if total_candidates > 0 else 0} for k, v in top_skills]
-
-        # 2. Competitive Index (How many active jobs per skill)
-        jobs_res = supabase.table("jobs").select("skills_required").eq("status", "active").execute()
-        job_skill_counts = {}
-        for job in jobs_res.data:
-            skills = job.get("skills_required", [])
-            for s in skills:
-                job_skill_counts[s] = job_skill_counts.get(s, 0) + 1
-        
-        top_job_skills = sorted(job_skill_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-        competition_data = [{"skill": k, "active_openings": v} for k, v in top_job_skills]
-
-        return {
-            "talent_density": density_data,
-            "competition_index": competition_data,
-            "pool_size": total_candidates,
-            "market_state": "High Demand" if total_candidates < (len(jobs_res.data) * 2) else "Balanced"
-        }
+        return await market_insights.snapshot()
 
     # --- JOB MANAGEMENT ---
 
@@ -1017,7 +1109,7 @@ class RecruiterService:
             return []
         
         # Fetch jobs with recruiter details to identify ownership
-        res = supabase.table("jobs")\
+        res = await supabase.table("jobs")\
             .select("*, recruiter_profiles(full_name, user_id)")\
             .eq("company_id", company_id)\
             .order("created_at", desc=True)\
@@ -1025,6 +1117,7 @@ class RecruiterService:
         
         # Mapping for schema compatibility
         for job in res.data:
+            recruiter_stats.remember_job(job["id"], company_id)
             if "skills" in job and "skills_required" not in job:
                 job["skills_required"] = job["skills"]
             if "requirements" not in job and "metadata" in job and isinstance(job["metadata"], dict):
@@ -1067,11 +1160,15 @@ class RecruiterService:
             db_payload["requirements"] = requirements
 
         try:
-            res = supabase.table("jobs").insert(db_payload).execute()
+            res = await supabase.table("jobs").insert(db_payload).execute()
             if res.data:
                 job = res.data[0]
                 if "skills_required" not in job and "skills" in job:
                     job["skills_required"] = job["skills"]
+                skill_index.update_job(job["id"], job.get("skills_required"))
+                recruiter_stats.remember_job(job["id"], job.get("company_id"))
+                recruiter_stats.invalidate(job.get("company_id"))
+                market_insights.job_changed(job["id"], job.get("skills_required"), job.get("status"))
                 return job
             return None
         except Exception as e:
@@ -1102,13 +1199,17 @@ class RecruiterService:
                         if "metadata" not in safe_payload: safe_payload["metadata"] = {}
                         safe_payload["metadata"]["requirements"] = val
                 
-                res = supabase.table("jobs").insert(safe_payload).execute()
+                res = await supabase.table("jobs").insert(safe_payload).execute()
                 if res.data:
                     job = res.data[0]
                     if "skills" in job and "skills_required" not in job:
                         job["skills_required"] = job["skills"]
                     if "requirements" not in job and "metadata" in job:
                         job["requirements"] = job["metadata"].get("requirements", [])
+                    skill_index.update_job(job["id"], job.get("skills_required"))
+                    recruiter_stats.remember_job(job["id"], job.get("company_id"))
+                    recruiter_stats.invalidate(job.get("company_id"))
+                    market_insights.job_changed(job["id"], job.get("skills_required"), job.get("status"))
                     return job
                 return None
             raise e
@@ -1116,7 +1217,7 @@ class RecruiterService:
     async def update_job(self, user_id: str, job_id: str, update_data: Dict):
         """Update an existing job posting with ownership check."""
         # Verify ownership
-        job_res = supabase.table("jobs").select("recruiter_id").eq("id", job_id).execute()
+        job_res = await supabase.table("jobs").select("recruiter_id").eq("id", job_id).execute()
         if not job_res.data:
             raise Exception("Job not found")
             
@@ -1129,11 +1230,15 @@ class RecruiterService:
         update_data["updated_at"] = datetime.now().isoformat()
         
         try:
-            res = supabase.table("jobs").update(update_data).eq("id", job_id).execute()
+            res = await supabase.table("jobs").update(update_data).eq("id", job_id).execute()
             if res.data:
                 job = res.data[0]
                 if "skills" in job and "skills_required" not in job:
                     job["skills_required"] = job["skills"]
+                skill_index.update_job(job_id, job.get("skills_required"))
+                recruiter_stats.remember_job(job_id, job.get("company_id"))
+                recruiter_stats.invalidate(job.get("company_id"))
+                market_insights.job_changed(job_id, job.get("skills_required"), job.get("status"))
                 return job
             return None
         except Exception as e:
@@ -1162,13 +1267,17 @@ class RecruiterService:
                         metadata["requirements"] = val
                         safe_data["metadata"] = metadata
                 
-                res = supabase.table("jobs").update(safe_data).eq("id", job_id).execute()
+                res = await supabase.table("jobs").update(safe_data).eq("id", job_id).execute()
                 if res.data:
                     job = res.data[0]
                     if "skills" in job and "skills_required" not in job:
                         job["skills_required"] = job["skills"]
                     if "requirements" not in job and "metadata" in job:
                         job["requirements"] = job["metadata"].get("requirements", [])
+                    skill_index.update_job(job_id, job.get("skills_required"))
+                    recruiter_stats.remember_job(job_id, job.get("company_id"))
+                    recruiter_stats.invalidate(job.get("company_id"))
+                    market_insights.job_changed(job_id, job.get("skills_required"), job.get("status"))
                     return job
                 return None
             raise e
@@ -1176,14 +1285,17 @@ class RecruiterService:
     async def delete_job(self, user_id: str, job_id: str):
         """Delete a job posting with ownership check."""
         # Verify ownership
-        job_res = supabase.table("jobs").select("recruiter_id").eq("id", job_id).execute()
+        job_res = await supabase.table("jobs").select("recruiter_id, company_id").eq("id", job_id).execute()
         if not job_res.data:
             raise Exception("Job not found")
             
         if job_res.data[0]["recruiter_id"] != user_id:
             raise Exception("Unauthorized: You can only delete jobs you personally posted.")
             
-        res = supabase.table("jobs").delete().eq("id", job_id).execute()
+        res = await supabase.table("jobs").delete().eq("id", job_id).execute()
+        skill_index.remove_job(job_id)
+        market_insights.job_removed(job_id)
+        recruiter_stats.invalidate(job_res.data[0].get("company_id"))
         return {"status": "success"}
 
     async def invite_candidate(self, user_id: str, candidate_id: str, job_id: str, message: Optional[str] = None, custom_role_title: Optional[str] = None):
@@ -1202,14 +1314,14 @@ class RecruiterService:
             
             # 2. Check if a private 'ghost' job with this title already exists for this company
             # This prevents duplicates for common custom titles like "Frontend Role"
-            existing_job = supabase.table("jobs").select("id, title").eq("company_id", company_id).eq("title", custom_role_title).eq("status", "paused").execute()
+            existing_job = await supabase.table("jobs").select("id, title").eq("company_id", company_id).eq("title", custom_role_title).eq("status", "paused").execute()
             
             if existing_job.data:
                 target_job_id = existing_job.data[0]["id"]
                 job_title = existing_job.data[0]["title"]
             else:
                 # Create a private/unlisted job post
-                new_job = supabase.table("jobs").insert({
+                new_job = await supabase.table("jobs").insert({
                     "recruiter_id": user_id,
                     "company_id": company_id,
                     "title": custom_role_title,
@@ -1227,7 +1339,7 @@ class RecruiterService:
                 job_title = new_job.data[0]["title"]
         else:
             # Standard Path: Verify recruiter owns this job
-            job_res = supabase.table("jobs").select("recruiter_id, company_id, title").eq("id", job_id).execute()
+            job_res = await supabase.table("jobs").select("recruiter_id, company_id, title").eq("id", job_id).execute()
             if not job_res.data:
                 raise Exception("Job not found")
                 
@@ -1239,18 +1351,22 @@ class RecruiterService:
             target_job_id = job_id
         
         # 3. Check if already applied/invited
-        existing = supabase.table("job_applications").select("id").eq("candidate_id", candidate_id).eq("job_id", target_job_id).execute()
+        existing = await supabase.table("job_applications").select("id").eq("candidate_id", candidate_id).eq("job_id", target_job_id).execute()
         if existing.data:
             return {"status": "exists", "id": existing.data[0]["id"]}
         
         # 4. Create 'invited' application
-        res = supabase.table("job_applications").insert({
+        res = await supabase.table("job_applications").insert({
             "candidate_id": candidate_id,
             "job_id": target_job_id,
             "status": "invited",
             "invitation_message": message
         }).execute()
 
+        # New application (and possibly a new active unlisted job): the dashboard funnel is stale
+        recruiter_stats.remember_job(target_job_id, company_id)
+        recruiter_stats.invalidate(company_id)
+
         # 5. Audit Trail
         if res.data:
             await self.log_history(
@@ -1263,7 +1379,7 @@ class RecruiterService:
 
         # 6. Notify Candidate
         from src.services.notification_service import NotificationService
-        NotificationService.create_notification(
+        await NotificationService.create_notification(
             user_id=candidate_id,
             type="JOB_INVITATION",
             title=f"New Invitation: {job_title}",
@@ -1273,21 +1389,21 @@ class RecruiterService:
         
         # 7. Elite Hub Activation
         from src.services.chat_service import ChatService
-        ChatService.get_or_create_thread(user_id, candidate_id)
+        await ChatService.get_or_create_thread(user_id, candidate_id)
         
         return {"status": "success", "application_id": res.data[0]["id"]}
-        thread = ChatService.get_or_create_thread(user_id, candidate_id)
+        thread = await ChatService.get_or_create_thread(user_id, candidate_id)
         if message:
             # We use a raw DB insert if we want to bypass the send_message gate for the INITIAL invite 
             # Or we ensure the recruiter can always send.
             # Actually, standard send_message now has a gate. 
             # Recruiter invites are 'INVITED' status which WE ARE ABOUT TO UNLOCK in the logic.
-            ChatService.send_message(thread["id"], user_id, f"[Elite Invite Initiation for {job_title}]: {message}")
+            await ChatService.send_message(thread["id"], user_id, f"[Elite Invite Initiation for {job_title}]: {message}")
 
         return {"status": "invited", "data": res.data[0] if res.data else None}
 
-    async def generate_job_description(self, prompt: str, experience_band: str, location: Optional[str] = None):
-        """Generate an elite IT Tech Sales job description using Gemini 3 Flash."""
+    async def generate_job_description(self, prompt: str, experience_band: str, location: Optional[str] = None, regenerate: bool = False):
+        """Generate an elite IT Tech Sales job description using Gemini 3 Flash. Cached by prompt unless `regenerate`."""
         
         # Enhanced location context for dynamic salary scaling and role demand
         location_context = f"LOCATION: {location or 'Global (Remote)'}"
@@ -1329,8 +1445,15 @@ class RecruiterService:
         """
         
         try:
-            # Uses unified AI caller with quota-aware fallback
-            return await self._call_ai_json(ai_prompt, "You are an Elite SaaS GTM Architect.")
+            # Uses unified AI caller with quota-aware fallback; identical briefs reuse the cached JD
+            system_message = "You are an Elite SaaS GTM Architect."
+            return await generation_cache.get_or_generate(
+                ai_prompt,
+                llm_gateway.route_id(self.AI_ROUTE),
+                lambda: self._call_ai_json(ai_prompt, system_message, site="recruiter.job_description"),
+                system=system_message,
+                bypass=regenerate
+            )
         except Exception as e:
             print(f"AI Generation/Parsing Error: {str(e)}")
             return {}
@@ -1349,7 +1472,7 @@ class RecruiterService:
         try:
             # We fetch all candidates who have completed their assessment
             # Backend uses service role, so this bypasses RLS
-            res = supabase.table("candidate_profiles")\
+            res = await supabase.table("candidate_profiles")\
                 .select("user_id, full_name, experience, years_of_experience, skills, location, expected_salary, target_role, current_role, location_tier")\
                 .eq("assessment_status", "completed")\
                 .execute()
@@ -1359,7 +1482,7 @@ class RecruiterService:
             print(f"SERVICE ERROR: get_talent_pool: {str(e)}")
             # If columns expected_salary or location_tier don't exist, we fallback
             if "expected_salary" in str(e) or "location_tier" in str(e):
-                res = supabase.table("candidate_profiles")\
+                res = await supabase.table("candidate_profiles")\
                     .select("user_id, full_name, experience, years_of_experience, skills, location, target_role, current_role")\
                     .eq("assessment_status", "completed")\
                     .execute()
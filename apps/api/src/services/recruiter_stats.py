@@ -0,0 +1,125 @@
+import asyncio
+from typing import Dict, Optional
+from cachetools import LRUCache, TTLCache
+from src.core.supabase import async_supabase as supabase
+from src.core.config import RECRUITER_STATS_CACHE_TTL, RECRUITER_STATS_CACHE_MAXSIZE
+
+# Statuses that count toward each (cumulative) funnel stage
+FUNNEL_STAGES = {
+    "shortlisted": ["shortlisted", "interview_scheduled", "offered", "closed"],
+    "interviewed": ["interview_scheduled", "offered", "closed"],
+    "offered": ["offered", "closed"],
+    "hired": ["closed"]
+}
+
+class RecruiterStatsEngine:
+    """
+    Company-wide dashboard funnel computed in the database.
+
+    Uses the `get_company_funnel` RPC (infra/scripts/recruiter_stats_rpc.sql) for a single
+    round-trip. If that function isn't installed yet, falls back to concurrent count-only
+    queries filtered through a `jobs!inner` join, so no request carries a list of job IDs.
+    Results are cached per company for a few seconds and dropped on application status changes.
+    """
+    def __init__(self, ttl: int = 30, maxsize: int = 5000):
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        # job_id -> company_id, so writers that only know the job can still invalidate
+        self._job_company: LRUCache = LRUCache(maxsize=maxsize * 10)
+        self._rpc_available = True
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def company_funnel(self, company_id: str) -> Dict:
+        """
+        Returns {"active_jobs", "total_views", "total_applications", "funnel"} for a company.
+        """
+        cached = self._cache.get(company_id)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+
+        raw = None
+        if self._rpc_available:
+            try:
+                res = await supabase.rpc("get_company_funnel", {"p_company_id": company_id}).execute()
+                raw = res.data
+            except Exception as e:
+                print(f"DEBUG: get_company_funnel RPC failed, using count queries: {str(e)}")
+                if "PGRST202" in str(e) or "Could not find the function" in str(e):
+                    # Migration not applied; stop trying for this process
+                    self._rpc_available = False
+        if raw is None:
+            raw = await self._count_concurrently(company_id)
+
+        result = self._build_funnel(raw)
+        self._cache[company_id] = result
+        return result
+
+    async def _count_concurrently(self, company_id: str) -> Dict:
+        def apps_count(status: Optional[str] = None):
+            q = supabase.table("job_applications").select("id, jobs!inner(company_id)", count="exact", head=True)\
+                .eq("jobs.company_id", company_id)
+            if status:
+                q = q.eq("status", status)
+            return q.execute()
+
+        tracked = FUNNEL_STAGES["shortlisted"]
+        results = await asyncio.gather(
+            supabase.table("jobs").select("id", count="exact", head=True).eq("company_id", company_id).eq("status", "active").execute(),
+            supabase.table("job_views").select("id, jobs!inner(company_id)", count="exact", head=True).eq("jobs.company_id", company_id).execute(),
+            apps_count(),
+            *(apps_count(s) for s in tracked)
+        )
+        jobs_res, views_res, total_res = results[:3]
+        status_counts = {s: r.count or 0 for s, r in zip(tracked, results[3:])}
+        # Everything not in a later stage is reported under "applied"
+        status_counts["applied"] = (total_res.count or 0) - sum(status_counts.values())
+        return {
+            "active_jobs": jobs_res.count or 0,
+            "total_views": views_res.count or 0,
+            "status_counts": status_counts
+        }
+
+    @staticmethod
+    def _build_funnel(raw: Dict) -> Dict:
+        counts = raw.get("status_counts") or {}
+        total_apps = sum(counts.values())
+        funnel = {"applied": total_apps}
+        for stage, statuses in FUNNEL_STAGES.items():
+            funnel[stage] = sum(counts.get(s, 0) for s in statuses)
+        return {
+            "active_jobs": raw.get("active_jobs") or 0,
+            "total_views": raw.get("total_views") or 0,
+            "total_applications": total_apps,
+            "funnel": funnel
+        }
+
+    # --- Invalidation ---
+
+    def remember_job(self, job_id: str, company_id: Optional[str]):
+        if job_id and company_id:
+            self._job_company[job_id] = company_id
+
+    def invalidate(self, company_id: Optional[str]):
+        if company_id and self._cache.pop(company_id, None) is not None:
+            self.invalidations += 1
+
+    def invalidate_job(self, job_id: Optional[str]):
+        """Best effort: jobs we have never seen fall back to the TTL."""
+        self.invalidate(self._job_company.get(job_id))
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._cache),
+            "ttl": self._cache.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "rpc_available": self._rpc_available
+        }
+
+recruiter_stats = RecruiterStatsEngine(ttl=RECRUITER_STATS_CACHE_TTL, maxsize=RECRUITER_STATS_CACHE_MAXSIZE)
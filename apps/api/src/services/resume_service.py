@@ -1,144 +1,52 @@
-import httpx
-from pypdf import PdfReader
-import io
-from src.core.supabase import supabase
-import json
-import os
-import google.generativeai as genai
+import hashlib
+from src.core.supabase import async_supabase as supabase
+from src.services.skill_index import skill_index
+from src.services.market_insights import market_insights
+from src.services.question_prefetch import question_prefetcher
+from src.services.assessment_state import assessment_state
+from src.services.assessment_service import question_pool
+from src.core.llm_gateway import llm_gateway, parse_json_response, LLMUnavailable
+from src.core.llm_metrics import llm_metrics
+from src.services.pdf_extractor import pdf_extractor
+from src.core.generation_cache import generation_cache
+from src.core.config import RESUME_TEXT_MAX_CHARS, RESUME_PARSE_CACHE_TTL
+
+# Bump whenever the parse prompt, models or extraction change; cached parses from older versions stop matching
+RESUME_PARSER_VERSION = "audit-v3"
+RESUME_ROUTE = ("groq", "openrouter", "gemini")
+RESUME_MODELS = {"openrouter": "meta-llama/llama-3.3-70b-instruct", "gemini": "gemini-1.5-flash"}
 
 class ResumeService:
     @staticmethod
     async def parse_resume(user_id: str, resume_path: str, google_key: str):
         # 1. Download file from Supabase Storage
         try:
-            file_res = supabase.storage.from_("resumes").download(resume_path)
+            file_res = await supabase.storage.from_("resumes").download(resume_path)
         except Exception as e:
             print(f"Error downloading resume: {str(e)}")
             return {"skills": [], "timeline": [], "error": "Storage download failed"}
-        
-        # 2. Extract text from PDF
-        try:
-            reader = PdfReader(io.BytesIO(file_res))
-            text = ""
-            for i, page in enumerate(reader.pages):
-                page_text = page.extract_text() or ""
-                text += page_text + "\n"
-                print(f"DEBUG: Page {i+1} extracted {len(page_text)} chars")
-            
-            text = text.strip()
-            print(f"DEBUG: TOTAL EXTRACTED: {len(text)} characters")
-            
-            if len(text) < 50:
-                print("WARNING: Very little text extracted. Is the PDF scanned/image-based?")
-        except Exception as e:
-            print(f"CRITICAL PDF ERROR: {str(e)}")
-            return {"skills": [], "timeline": [], "error": f"PDF extraction failed: {str(e)}"}
 
-        # Store raw text early so we have it even if AI fails
+        # 2. Extract + parse, deduplicated by content: re-uploading the same PDF skips both steps,
+        # and concurrent uploads of the same file share a single parse
+        digest = hashlib.sha256(file_res).hexdigest()
+        result = await generation_cache.get_or_generate(
+            f"resume_parse:{RESUME_PARSER_VERSION}:{digest}",
+            llm_gateway.route_id(RESUME_ROUTE, RESUME_MODELS),
+            lambda: ResumeService._extract_and_parse(file_res),
+            ttl=RESUME_PARSE_CACHE_TTL,
+            should_cache=lambda r: bool(r and r.get("parsed"))
+        )
+        if result.get("error"):
+            return {"skills": [], "timeline": [], "error": result["error"]}
+
+        text = result["text"]
+        if result.get("parsed"):
+            await ResumeService._store_data(user_id, text, result["parsed"])
+            return result["parsed"]
+
+        # Keep the raw text even though AI parsing failed
         await ResumeService._store_initial_text(user_id, text)
 
-        # 3. Call Groq or OpenRouter if available (for redundancy)
-        groq_key = os.getenv("GROQ_API_KEY")
-        openrouter_key = os.getenv("OPENROUTER_API_KEY")
-        
-        # Prefer Groq -> OpenRouter -> Gemini (Direct)
-        if (groq_key and len(groq_key) > 5) or (openrouter_key and len(openrouter_key) > 5):
-            try:
-                if groq_key:
-                    from groq import Groq
-                    client = Groq(api_key=groq_key)
-                    model_choice = "llama-3.3-70b-versatile"
-                else:
-                    client = httpx.AsyncClient(timeout=30.0) # We'll use direct HTTP for OpenRouter
-                    model_choice = "meta-llama/llama-3.3-70b-instruct"
-
-                prompt_content = f"Extract structured data from this resume. Keys: location, professional_summary, current_role, years_of_experience, current_company, timeline (list with role, company, start, end), achievements (list), skills (list), education (degree, institution, year). Resume: {text[:10000]}"
-                
-                if groq_key:
-                    completion = client.chat.completions.create(
-                        model=model_choice,
-                        messages=[
-                            {"role": "system", "content": "You are a resume parser. Output ONLY valid JSON."},
-                            {"role": "user", "content": prompt_content}
-                        ],
-                        response_format={"type": "json_object"}
-                    )
-                    parsed_data = json.loads(completion.choices[0].message.content)
-                else:
-                    # OpenRouter Call
-                    response = await client.post(
-                        "https://openrouter.ai/api/v1/chat/completions",
-                        headers={"Authorization": f"Bearer {openrouter_key}"},
-                        json={
-                            "model": model_choice,
-                            "messages": [{"role": "user", "content": f"{prompt_content}. Output ONLY valid JSON."}]
-                        }
-                    )
-                    res_json = response.json()
-                    content = res_json['choices'][0]['message']['content']
-                    # Clean markdown if any
-                    content = content.replace("```json", "").replace("```", "").strip()
-                    parsed_data = json.loads(content)
-                
-                await ResumeService._store_data(user_id, text, parsed_data)
-                return parsed_data
-            except Exception as e:
-                print(f"Third-party parsing failed (Groq/OpenRouter): {str(e)}")
-
-        # 4. Call High-Fidelity AI Auditor (Gemini 3 Flash)
-        if google_key:
-            try:
-                genai.configure(api_key=google_key)
-                # Ensure model fallback if 'gemini-3-flash-preview' fails
-                try:
-                    model = genai.GenerativeModel('gemini-1.5-flash')
-                except:
-                    model = genai.GenerativeModel('gemini-pro')
-                
-                # Today's date for gap calculation logic
-                today = "February 24, 2026"
-                
-                prompt = f"""
-                Act as an Elite AI Talent Auditor and Data Architect for TalentFlow.
-                MISSION: Perform a high-fidelity 'Structural Audit' of the following resume text.
-
-                EXTRACTION REQUIREMENTS (JSON ONLY):
-                - location: string (City, Country)
-                - professional_summary: string (2-3 concise sentences)
-                - education_history: list of objects {{institute, degree, year_passing, gpa_score, is_completed (boolean)}}
-                - experience_history: list of objects {{role, company, tenure_years, achievements (list), start_date, end_date}}
-                - projects: list of objects {{title, description, tech_stack (list), link}}
-                - certifications: list of strings (e.g., "Salesforce Certified Administrator")
-                - skills: list of technical and soft skills (Salesforce, MEDDPICC, B2B SaaS, etc.)
-                - core_metadata: {{
-                    "current_role": string,
-                    "total_years_experience": float,
-                    "current_company": string,
-                    "is_fresher": boolean
-                  }}
-
-                CAREER GAP AUDIT LOGIC (Relative to Today: {today}):
-                1. Experienced Candidates: Flag any gap between jobs > 6 months.
-                2. Freshers: Flag if Graduation Year is > 12 months from today with 0 industry experience.
-                3. career_gap_report: object {{ "has_gap": bool, "months_total": int, "details": string }}
-
-                Resume Text:
-                {text[:12000]}
-                """
-
-                response = model.generate_content(
-                    prompt,
-                    generation_config=genai.GenerationConfig(
-                        response_mime_type="application/json"
-                    )
-                )
-                
-                parsed_data = json.loads(response.text)
-                await ResumeService._store_data(user_id, text, parsed_data)
-                return parsed_data
-            except Exception as e:
-                print(f"Gemini High-Fidelity parsing failed: {str(e)}")
-
         # Final fallback - Mock High-Fidelity Data
         mock_data = {
             "location": "Unknown",
@@ -160,10 +68,78 @@ class ResumeService:
         await ResumeService._store_data(user_id, text, mock_data)
         return mock_data
 
+    @staticmethod
+    async def _extract_and_parse(pdf_bytes: bytes) -> dict:
+        """
+        PDF bytes -> {"text", "parsed"} ("parsed" is None if every provider failed),
+        or {"error"} if the PDF couldn't be read. Not tied to a user, so results can be shared.
+        """
+        # Extract text from PDF (process pool; stops once the prompt's character budget is filled)
+        try:
+            text = await pdf_extractor.extract(pdf_bytes)
+            
+            if len(text) < 50:
+                print("WARNING: Very little text extracted. Is the PDF scanned/image-based?")
+        except Exception as e:
+            print(f"CRITICAL PDF ERROR: {str(e)}")
+            return {"error": f"PDF extraction failed: {str(e)}"}
+
+        # High-Fidelity AI Auditor via the shared LLM gateway
+        # Prefer Groq -> OpenRouter -> Gemini; a slow provider is hedged onto the next one
+        # Today's date for gap calculation logic
+        today = "February 24, 2026"
+        
+        prompt = f"""
+        Act as an Elite AI Talent Auditor and Data Architect for TalentFlow.
+        MISSION: Perform a high-fidelity 'Structural Audit' of the following resume text.
+
+        EXTRACTION REQUIREMENTS (JSON ONLY):
+        - location: string (City, Country)
+        - professional_summary: string (2-3 concise sentences)
+        - education_history: list of objects {{institute, degree, year_passing, gpa_score, is_completed (boolean)}}
+        - experience_history: list of objects {{role, company, tenure_years, achievements (list), start_date, end_date}}
+        - projects: list of objects {{title, description, tech_stack (list), link}}
+        - certifications: list of strings (e.g., "Salesforce Certified Administrator")
+        - skills: list of technical and soft skills (Salesforce, MEDDPICC, B2B SaaS, etc.)
+        - core_metadata: {{
+            "current_role": string,
+            "total_years_experience": float,
+            "current_company": string,
+            "is_fresher": boolean
+          }}
+
+        CAREER GAP AUDIT LOGIC (Relative to Today: {today}):
+        1. Experienced Candidates: Flag any gap between jobs > 6 months.
+        2. Freshers: Flag if Graduation Year is > 12 months from today with 0 industry experience.
+        3. career_gap_report: object {{ "has_gap": bool, "months_total": int, "details": string }}
+
+        Resume Text:
+        {text[:RESUME_TEXT_MAX_CHARS]}
+        """
+
+        try:
+            result = await llm_gateway.generate(
+                prompt,
+                "You are a resume parser. Output ONLY valid JSON.",
+                route=RESUME_ROUTE,
+                models=RESUME_MODELS,
+                json_mode=True,
+                site="resume.parse"
+            )
+            parsed_data = parse_json_response(result.text)
+            print(f"DEBUG: Resume parsed by {result.provider} in {result.latency_ms}ms")
+            return {"text": text, "parsed": parsed_data}
+        except LLMUnavailable as e:
+            print(f"AI resume parsing failed on every provider: {str(e)}")
+        except ValueError as e:
+            llm_metrics.record_json_failure("resume.parse", result.provider)
+            print(f"AI resume parsing returned invalid JSON: {str(e)}")
+        return {"text": text, "parsed": None}
+
     @staticmethod
     async def _store_initial_text(user_id: str, text: str):
         try:
-            supabase.table("resume_data").upsert({
+            await supabase.table("resume_data").upsert({
                 "user_id": user_id,
                 "raw_text": text[:10000]
             }).execute()
@@ -174,7 +150,7 @@ class ResumeService:
     async def _store_data(user_id: str, text: str, parsed_data: dict):
         try:
             # 1. Update resume_data audit table (The Forensic Log)
-            supabase.table("resume_data").upsert({
+            await supabase.table("resume_data").upsert({
                 "user_id": user_id,
                 "raw_text": text[:12000],
                 "raw_education": parsed_data.get("education_history"),
@@ -234,7 +210,12 @@ class ResumeService:
                 profile_updates["experience"] = "leadership"
 
             # 3. Final Profile Sync
-            supabase.table("candidate_profiles").update(profile_updates).eq("user_id", user_id).execute()
+            await supabase.table("candidate_profiles").update(profile_updates).eq("user_id", user_id).execute()
+            skill_index.update_candidate(user_id, profile_updates["skills"])
+            market_insights.candidate_skills_changed(user_id, profile_updates["skills"])
+            question_prefetcher.invalidate(user_id)
+            assessment_state.invalidate(user_id)
+            question_pool.schedule(user_id) # Generate resume/skill questions before the assessment starts
 
         except Exception as e:
             print(f"CRITICAL: High-Fidelity Store failed: {str(e)}")
@@ -0,0 +1,148 @@
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Spelling variants that should count as the same skill. Keys and values are already normalized.
+SKILL_SYNONYMS = {
+    "sfdc": "salesforce",
+    "salesforce.com": "salesforce",
+    "salesforce crm": "salesforce",
+    "hubspot crm": "hubspot",
+    "ms excel": "excel",
+    "microsoft excel": "excel",
+    "saas sales": "saas",
+    "software as a service": "saas",
+    "b2b sales": "b2b",
+    "business to business": "b2b",
+    "lead gen": "lead generation",
+    "leadgen": "lead generation",
+    "cold-calling": "cold calling",
+    "outbound prospecting": "prospecting",
+    "key account management": "account management",
+    "kam": "account management",
+    "crm software": "crm",
+    "customer relationship management": "crm",
+    "negotiations": "negotiation",
+    "meddic": "meddpicc",
+    "meddicc": "meddpicc",
+    "js": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "k8s": "kubernetes",
+    "ml": "machine learning",
+    "ai": "artificial intelligence",
+}
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_skill(skill: str) -> str:
+    """Case-folds, trims and collapses whitespace, then maps known synonyms to one spelling."""
+    s = _WHITESPACE.sub(" ", str(skill).strip().casefold()).strip(" .,;")
+    return SKILL_SYNONYMS.get(s, s)
+
+class SkillIndex:
+    """
+    Interns normalized skill strings to small integer IDs and keeps every candidate and job
+    as a bitset (a Python int with bit N set for skill ID N). Matching a job against a
+    candidate is then a single `&` plus a popcount instead of building string sets per row.
+
+    Entries remember the raw skill list they were built from, so a row whose skills changed
+    somewhere we didn't hear about (another worker, a manual DB edit) is re-encoded on read.
+    """
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._labels: List[str] = [] # First spelling seen, for display
+        # key -> (raw skills tuple, bitset)
+        self._candidates: Dict[str, Tuple[tuple, int]] = {}
+        self._jobs: Dict[str, Tuple[tuple, int]] = {}
+        self._encoded: Dict[tuple, int] = {}
+
+    def intern(self, skill: str) -> Optional[int]:
+        name = normalize_skill(skill)
+        if not name:
+            return None
+        skill_id = self._ids.get(name)
+        if skill_id is None:
+            skill_id = len(self._names)
+            self._ids[name] = skill_id
+            self._names.append(name)
+            self._labels.append(str(skill).strip())
+        return skill_id
+
+    def encode(self, skills: Optional[Iterable[str]]) -> int:
+        key = tuple(skills or ())
+        mask = self._encoded.get(key)
+        if mask is None:
+            mask = 0
+            for s in key:
+                skill_id = self.intern(s)
+                if skill_id is not None:
+                    mask |= 1 << skill_id
+            # Skill lists repeat a lot (same job on every application), keep the memo bounded
+            if len(self._encoded) >= 50000:
+                self._encoded.clear()
+            self._encoded[key] = mask
+        return mask
+
+    @staticmethod
+    def ids(mask: int) -> Iterator[int]:
+        """Yields the skill IDs set in a bitset, lowest first."""
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+    def decode(self, mask: int) -> List[str]:
+        return [self._names[i] for i in self.ids(mask)]
+
+    def label(self, skill_id: int) -> str:
+        return self._labels[skill_id]
+
+    def _lookup(self, table: Dict[str, Tuple[tuple, int]], key: Optional[str], skills: Optional[Iterable[str]]) -> int:
+        raw = tuple(skills or ())
+        entry = table.get(key) if key else None
+        if entry and entry[0] == raw:
+            return entry[1]
+        mask = self.encode(raw)
+        if key:
+            table[key] = (raw, mask)
+        return mask
+
+    # --- Incremental updates ---
+
+    def update_candidate(self, user_id: str, skills: Optional[Iterable[str]]):
+        self._lookup(self._candidates, user_id, skills)
+
+    def update_job(self, job_id: str, skills: Optional[Iterable[str]]):
+        self._lookup(self._jobs, job_id, skills)
+
+    def remove_job(self, job_id: str):
+        self._jobs.pop(job_id, None)
+
+    # --- Matching ---
+
+    def candidate_mask(self, user_id: Optional[str], skills: Optional[Iterable[str]] = None) -> int:
+        return self._lookup(self._candidates, user_id, skills)
+
+    def job_mask(self, job_id: Optional[str], skills: Optional[Iterable[str]] = None) -> int:
+        return self._lookup(self._jobs, job_id, skills)
+
+    def match(self, job_mask: int, candidate_mask: int) -> Tuple[bool, List[str]]:
+        """
+        Returns (is_skill_match, matched skill names).
+        A match means at least 2 shared skills or 40% of the job's skills.
+        """
+        shared = job_mask & candidate_mask
+        matched = shared.bit_count()
+        required = job_mask.bit_count()
+        is_match = matched >= 2 or (required > 0 and matched / required >= 0.4)
+        return is_match, self.decode(shared)
+
+    def stats(self) -> dict:
+        return {
+            "skills": len(self._names),
+            "candidates": len(self._candidates),
+            "jobs": len(self._jobs)
+        }
+
+skill_index = SkillIndex()
@@ -0,0 +1,160 @@
+import time
+import codecs
+import httpx
+from typing import Optional
+from urllib.parse import urlparse
+from cachetools import TTLCache
+from src.utils.html_text import HtmlTextExtractor
+from src.core.config import (
+    WEBSITE_FETCH_MAX_BYTES,
+    WEBSITE_TEXT_MAX_CHARS,
+    WEBSITE_FETCH_TIMEOUT_S,
+    WEBSITE_CACHE_FRESH_S,
+    WEBSITE_CACHE_TTL,
+    WEBSITE_CACHE_MAXSIZE
+)
+
+CHUNK_SIZE = 16 * 1024
+
+def normalize_url(url: str) -> str:
+    """Cache key for a page: host without www., port, path without trailing slash, query. Scheme is ignored."""
+    parsed = urlparse(url if "://" in url else f"https://{url}")
+    host = (parsed.hostname or "").lower().removeprefix("www.")
+    if parsed.port:
+        host = f"{host}:{parsed.port}"
+    key = host + (parsed.path.rstrip("/") or "")
+    return f"{key}?{parsed.query}" if parsed.query else key
+
+class WebsiteTextFetcher:
+    """
+    Fetches the visible text of a company website for bio generation.
+
+    The body is streamed through an incremental HTML text extractor and the connection is
+    dropped as soon as `max_chars` of text is collected or `max_bytes` has been read, so a
+    multi-megabyte landing page costs no more than its first few chunks.
+
+    Extracted text is cached per normalized page URL (so http/https and trailing-slash variants
+    share an entry, and different pages of one site don't evict each other). Within `fresh_ttl` it is served without a
+    request; after that the page is revalidated with If-None-Match / If-Modified-Since and a
+    304 reuses the cached text.
+    """
+    def __init__(self, max_bytes: int = 512 * 1024, max_chars: int = 2000, timeout: float = 10.0,
+                 fresh_ttl: int = 3600, ttl: int = 604800, maxsize: int = 2000):
+        self.max_bytes = max_bytes
+        self.max_chars = max_chars
+        self.timeout = timeout
+        self.fresh_ttl = fresh_ttl
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._client: Optional[httpx.AsyncClient] = None
+        self.metrics = {
+            "fetches": 0,
+            "fresh_hits": 0,
+            "revalidated": 0, # 304 Not Modified
+            "early_stops": 0, # Enough text before the end of the body
+            "truncated": 0, # Byte budget reached
+            "bytes_read": 0,
+            "failed": 0
+        }
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=True,
+                headers={"User-Agent": "TalentFlowBot/1.0 (+company bio generation)"},
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=5)
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def fetch_text(self, url: str, revalidate: bool = False) -> str:
+        """Visible page text (at most max_chars). `revalidate` skips the fresh window but still sends validators."""
+        if "://" not in url:
+            url = f"https://{url}"
+        key = normalize_url(url)
+        entry = self._cache.get(key)
+
+        if entry and not revalidate and time.time() - entry["checked_at"] < self.fresh_ttl:
+            self.metrics["fresh_hits"] += 1
+            return entry["text"]
+
+        headers = {}
+        if entry and entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            async with self.client.stream("GET", url, headers=headers) as response:
+                if response.status_code == 304 and entry:
+                    self.metrics["revalidated"] += 1
+                    entry["checked_at"] = time.time()
+                    self._cache[key] = entry # Re-insert to restart the TTL
+                    return entry["text"]
+                response.raise_for_status()
+
+                content_type = response.headers.get("content-type", "")
+                if content_type and "html" not in content_type and not content_type.startswith("text/"):
+                    raise ValueError(f"Unsupported content type: {content_type}")
+
+                text = await self._read_text(response)
+                self.metrics["fetches"] += 1
+                self._cache[key] = {
+                    "url": url,
+                    "text": text,
+                    "etag": response.headers.get("etag"),
+                    "last_modified": response.headers.get("last-modified"),
+                    "checked_at": time.time()
+                }
+                return text
+        except Exception:
+            self.metrics["failed"] += 1
+            raise
+
+    async def _read_text(self, response: httpx.Response) -> str:
+        try:
+            decoder = codecs.getincrementaldecoder(response.charset_encoding or "utf-8")(errors="replace")
+        except LookupError:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+        parser = HtmlTextExtractor(self.max_chars)
+        read = 0
+        async for chunk in response.aiter_bytes(CHUNK_SIZE):
+            read += len(chunk)
+            parser.feed(decoder.decode(chunk))
+            if parser.done:
+                self.metrics["early_stops"] += 1
+                break
+            if read >= self.max_bytes:
+                self.metrics["truncated"] += 1
+                break
+        else:
+            parser.feed(decoder.decode(b"", final=True))
+        parser.close()
+
+        self.metrics["bytes_read"] += read
+        print(f"DEBUG: Website fetch read {read} bytes -> {len(parser.text)} chars from {response.url}")
+        return parser.text
+
+    def invalidate(self, url: str):
+        self._cache.pop(normalize_url(url), None)
+
+    def stats(self) -> dict:
+        return {
+            **self.metrics,
+            "cached_pages": len(self._cache)
+        }
+
+website_fetcher = WebsiteTextFetcher(
+    max_bytes=WEBSITE_FETCH_MAX_BYTES,
+    max_chars=WEBSITE_TEXT_MAX_CHARS,
+    timeout=WEBSITE_FETCH_TIMEOUT_S,
+    fresh_ttl=WEBSITE_CACHE_FRESH_S,
+    ttl=WEBSITE_CACHE_TTL,
+    maxsize=WEBSITE_CACHE_MAXSIZE
+)
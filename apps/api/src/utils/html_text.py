@@ -0,0 +1,64 @@
+from html.parser import HTMLParser
+
+# Elements whose content is never visible page text
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "iframe", "head"}
+DESCRIPTION_META = {"description", "og:description"}
+
+class HtmlTextExtractor(HTMLParser):
+    """
+    Incremental visible-text extractor. Feed it chunks as they arrive; once `max_chars` of text
+    has been collected `done` turns True and the caller can stop reading the body.
+
+    Unlike BeautifulSoup no tree is built: text nodes are whitespace-collapsed and appended as
+    they stream past. The page's meta description (the best one-line summary most sites have)
+    is kept even though it lives in <head>.
+    """
+    def __init__(self, max_chars: int = 2000):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.parts = []
+        self.size = 0
+        self.done = False
+        self._skip_depth = 0
+
+    def _add(self, text: str):
+        text = " ".join(text.split())
+        if not text:
+            return
+        self.parts.append(text)
+        self.size += len(text) + 1
+        if self.size >= self.max_chars:
+            self.done = True
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "meta":
+            attrs = dict(attrs)
+            if (attrs.get("name") or attrs.get("property") or "").lower() in DESCRIPTION_META and attrs.get("content"):
+                self._add(attrs["content"])
+        elif tag == "body":
+            self._skip_depth = 0 # Pages often leave </head> (or a stray <svg>) unclosed
+        elif tag in SKIP_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self._skip_depth and not self.done:
+            self._add(data)
+
+    def feed(self, data: str):
+        if not self.done:
+            super().feed(data)
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.parts)[:self.max_chars]
+
+def extract_text(html: str, max_chars: int = 2000) -> str:
+    """One-shot helper for HTML that is already in memory."""
+    parser = HtmlTextExtractor(max_chars)
+    parser.feed(html)
+    parser.close()
+    return parser.text
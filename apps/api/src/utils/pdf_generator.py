@@ -1,33 +1,56 @@
 from xhtml2pdf import pisa
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache, TemplateNotFound
+from typing import Optional
 import io
 import os
 
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates", "resumes")
+
+# One Environment per process: templates are compiled once and reused for every render
+_env: Optional[Environment] = None
+
+def init_templates(bytecode_dir: Optional[str] = None) -> Environment:
+    """
+    Builds the shared Jinja2 environment and compiles every resume template up front.
+    With `bytecode_dir`, compiled templates are also cached on disk so new worker processes skip compilation.
+    """
+    global _env
+    kwargs = {}
+    if bytecode_dir:
+        os.makedirs(bytecode_dir, exist_ok=True)
+        kwargs["bytecode_cache"] = FileSystemBytecodeCache(bytecode_dir)
+    env = Environment(loader=FileSystemLoader(TEMPLATE_DIR), **kwargs)
+    for name in env.list_templates(extensions=["html"]):
+        env.get_template(name)
+    _env = env
+    return env
+
+def render_resume_pdf(data: dict, template_name: str = "professional") -> bytes:
+    """
+    Renders a resume template to PDF bytes. Top-level so the render pool can call it.
+    """
+    env = _env or init_templates()
+    try:
+        template = env.get_template(f"{template_name}.html")
+    except TemplateNotFound:
+        # Fallback to professional
+        template = env.get_template("professional.html")
+
+    html_content = template.render(**data)
+
+    pdf_buffer = io.BytesIO()
+    pisa_status = pisa.CreatePDF(io.StringIO(html_content), dest=pdf_buffer)
+
+    if pisa_status.err:
+        raise Exception("Failed to generate PDF")
+
+    return pdf_buffer.getvalue()
+
 class PDFGenerator:
     @staticmethod
     def generate_resume_pdf(data: dict, template_name: str = "professional") -> bytes:
         """
         Generates a PDF from a resume template and data.
-        Returns the PDF as bytes.
+        Returns the PDF as bytes. Blocking - async code should use pdf_renderer.render().
         """
-        # 1. Setup Jinja2 environment
-        template_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates", "resumes")
-        env = Environment(loader=FileSystemLoader(template_dir))
-        
-        try:
-            template = env.get_template(f"{template_name}.html")
-        except:
-            # Fallback to professional
-            template = env.get_template("professional.html")
-        
-        # 2. Render HTML
-        html_content = template.render(**data)
-        
-        # 3. Create PDF
-        pdf_buffer = io.BytesIO()
-        pisa_status = pisa.CreatePDF(io.StringIO(html_content), dest=pdf_buffer)
-        
-        if pisa_status.err:
-            raise Exception("Failed to generate PDF")
-            
-        return pdf_buffer.getvalue()
+        return render_resume_pdf(data, template_name)
@@ -0,0 +1,26 @@
+import io
+from pypdf import PdfReader
+
+def extract_pdf_text(pdf_bytes: bytes, max_chars: int = 12000) -> dict:
+    """
+    Extracts text page by page and stops as soon as `max_chars` have been collected.
+    Runs inside the extraction process pool, so it only depends on pypdf.
+    """
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    total_pages = len(reader.pages)
+    parts = []
+    collected = 0
+    pages_read = 0
+    for page in reader.pages:
+        page_text = page.extract_text() or ""
+        parts.append(page_text)
+        collected += len(page_text) + 1
+        pages_read += 1
+        if collected >= max_chars:
+            break
+
+    return {
+        "text": "\n".join(parts).strip()[:max_chars],
+        "pages_read": pages_read,
+        "pages_total": total_pages
+    }
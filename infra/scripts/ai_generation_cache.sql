@@ -0,0 +1,41 @@
+-- Migration: Content-addressed AI generation cache
+-- Rows are keyed by sha256(normalized prompt + model route); the API reads/writes them
+-- with the service role and prunes expired / excess rows via prune_ai_generation_cache().
+
+CREATE TABLE IF NOT EXISTS ai_generation_cache (
+    key TEXT PRIMARY KEY,
+    model_id TEXT NOT NULL,
+    response JSONB NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT now(),
+    expires_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_ai_generation_cache_expires ON ai_generation_cache(expires_at);
+CREATE INDEX IF NOT EXISTS idx_ai_generation_cache_created ON ai_generation_cache(created_at);
+
+-- Service role only
+ALTER TABLE ai_generation_cache ENABLE ROW LEVEL SECURITY;
+
+-- Drops expired rows, then the oldest rows beyond p_max_rows. Returns rows removed.
+CREATE OR REPLACE FUNCTION prune_ai_generation_cache(p_max_rows INT)
+RETURNS INT AS $$
+DECLARE
+  removed INT := 0;
+  n INT;
+BEGIN
+  DELETE FROM ai_generation_cache WHERE expires_at < now();
+  GET DIAGNOSTICS n = ROW_COUNT;
+  removed := removed + n;
+
+  DELETE FROM ai_generation_cache
+  WHERE key IN (
+    SELECT key FROM ai_generation_cache
+    ORDER BY created_at DESC
+    OFFSET p_max_rows
+  );
+  GET DIAGNOSTICS n = ROW_COUNT;
+  removed := removed + n;
+
+  RETURN removed;
+END;
+$$ LANGUAGE plpgsql;
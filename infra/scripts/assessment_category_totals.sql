@@ -0,0 +1,79 @@
+-- Migration: Running per-category score totals on assessment sessions
+-- Every scored response adds its score to assessment_sessions.category_totals
+-- ({category: {sum, count}}) as it lands, so complete_assessment() reads one session row
+-- instead of re-reading every answer. rebuild_assessment_category_totals() recomputes the
+-- totals from response history when they disagree with the session's step counter.
+
+-- 1. Column
+ALTER TABLE assessment_sessions ADD COLUMN IF NOT EXISTS category_totals JSONB DEFAULT '{}';
+
+-- 2. Maintain totals as scores land (insert with a score, or NULL -> score write-back)
+CREATE OR REPLACE FUNCTION apply_assessment_score()
+RETURNS TRIGGER AS $$
+DECLARE
+  delta_sum NUMERIC;
+  delta_count INT;
+BEGIN
+  IF NEW.score IS NULL THEN
+    RETURN NEW;
+  ELSIF TG_OP = 'INSERT' OR OLD.score IS NULL THEN
+    delta_sum := NEW.score;
+    delta_count := 1;
+  ELSIF OLD.score IS DISTINCT FROM NEW.score THEN
+    delta_sum := NEW.score - OLD.score; -- Re-scored answer
+    delta_count := 0;
+  ELSE
+    RETURN NEW;
+  END IF;
+
+  -- The row lock on the session serializes concurrent write-backs for one candidate
+  UPDATE assessment_sessions
+  SET category_totals = jsonb_set(
+    COALESCE(category_totals, '{}'::jsonb),
+    ARRAY[NEW.category],
+    jsonb_build_object(
+      'sum', COALESCE((category_totals -> NEW.category ->> 'sum')::numeric, 0) + delta_sum,
+      'count', COALESCE((category_totals -> NEW.category ->> 'count')::int, 0) + delta_count
+    )
+  )
+  WHERE candidate_id = NEW.candidate_id;
+
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER trg_apply_assessment_score
+AFTER INSERT OR UPDATE OF score ON assessment_responses
+FOR EACH ROW
+EXECUTE FUNCTION apply_assessment_score();
+
+-- 3. Reconciliation: rebuild a candidate's totals from history
+-- Stores {category: {sum, count}} over scored rows and returns the same object with
+-- 'unscored' per category, so the caller can apply its neutral fallback to those.
+CREATE OR REPLACE FUNCTION rebuild_assessment_category_totals(p_candidate_id UUID)
+RETURNS JSONB AS $$
+DECLARE
+  totals JSONB;
+  result JSONB;
+BEGIN
+  SELECT
+    COALESCE(jsonb_object_agg(category, jsonb_build_object('sum', s, 'count', c)), '{}'::jsonb),
+    COALESCE(jsonb_object_agg(category, jsonb_build_object('sum', s, 'count', c, 'unscored', u)), '{}'::jsonb)
+  INTO totals, result
+  FROM (
+    SELECT category,
+           COALESCE(sum(score), 0) AS s,
+           count(score) AS c,
+           count(*) - count(score) AS u
+    FROM assessment_responses
+    WHERE candidate_id = p_candidate_id
+    GROUP BY category
+  ) t;
+
+  UPDATE assessment_sessions SET category_totals = totals WHERE candidate_id = p_candidate_id;
+  RETURN result;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 4. Backfill sessions still in progress
+SELECT rebuild_assessment_category_totals(candidate_id) FROM assessment_sessions WHERE status = 'started';
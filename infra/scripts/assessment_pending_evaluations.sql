@@ -0,0 +1,7 @@
+-- Migration: Background answer evaluation
+-- /assessment/submit stores answers with score = NULL until the evaluation queue scores them.
+-- complete_assessment() looks up a candidate's still-unscored answers before final scoring.
+
+CREATE INDEX IF NOT EXISTS idx_assessment_responses_pending
+ON public.assessment_responses(candidate_id)
+WHERE score IS NULL AND is_skipped = false;
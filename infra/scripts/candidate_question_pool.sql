@@ -0,0 +1,14 @@
+-- Migration: Pre-generated per-candidate assessment questions
+-- Built in the background after a resume parse or skills update; /assessment/next draws
+-- resume and skill questions from here instead of calling the LLM mid-assessment.
+-- source_hash fingerprints the inputs (band, skills, resume summary) so unchanged inputs skip a rebuild.
+
+CREATE TABLE IF NOT EXISTS candidate_question_pool (
+    candidate_id UUID PRIMARY KEY REFERENCES auth.users(id) ON DELETE CASCADE,
+    questions JSONB NOT NULL DEFAULT '[]', -- [{text, category, driver, difficulty}]
+    source_hash TEXT NOT NULL,
+    built_at TIMESTAMPTZ DEFAULT now()
+);
+
+-- Service role only
+ALTER TABLE candidate_question_pool ENABLE ROW LEVEL SECURITY;
@@ -0,0 +1,32 @@
+-- Migration: Server-side recruiter dashboard funnel
+-- One RPC call returns active jobs, job views and application counts grouped by status
+-- for a whole company, instead of shipping every application row to the API.
+
+-- 1. Index for the company -> jobs join
+CREATE INDEX IF NOT EXISTS idx_jobs_company_id ON jobs(company_id);
+CREATE INDEX IF NOT EXISTS idx_job_applications_job_status ON job_applications(job_id, status);
+
+-- 2. Funnel aggregate
+CREATE OR REPLACE FUNCTION get_company_funnel(p_company_id UUID)
+RETURNS JSON AS $$
+  SELECT json_build_object(
+    'active_jobs', (
+      SELECT count(*) FROM jobs
+      WHERE company_id = p_company_id AND status = 'active'
+    ),
+    'total_views', (
+      SELECT count(*) FROM job_views v
+      JOIN jobs j ON j.id = v.job_id
+      WHERE j.company_id = p_company_id
+    ),
+    'status_counts', COALESCE((
+      SELECT json_object_agg(s.status, s.n) FROM (
+        SELECT a.status, count(*) AS n
+        FROM job_applications a
+        JOIN jobs j ON j.id = a.job_id
+        WHERE j.company_id = p_company_id
+        GROUP BY a.status
+      ) s
+    ), '{}'::json)
+  );
+$$ LANGUAGE sql STABLE;